@@ -1,5 +1,7 @@
+import base64
+import json
 from datetime import datetime
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Union, Dict, Any, Tuple
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -15,11 +17,81 @@ from ..models.backtest import (
     BacktestExecution
     )
 from ..utils.mongo_helpers import PyObjectId
+from ..database.user_ids import canonical_user_id
+from .strategy import resolve_strategy
 
 # Collection Names
 BACKTEST_COLLECTION = "backtest"
+BACKTEST_EXECUTIONS_COLLECTION = "backtest_executions"
 STRATEGY_COLLECTION = "strategy"
 
+# Fields needed for BacktestSummary; the result series stay in the series store
+BACKTEST_SUMMARY_PROJECTION = {
+    "id": 1,
+    "strategy_id": 1,
+    "strategy_name": 1,
+    "status": 1,
+    "start_time": 1,
+    "params.start_date": 1,
+    "params.end_date": 1,
+    "result.total_return": 1,
+    "result.sharpe_ratio": 1,
+    "result.max_drawdown": 1,
+    "result.total_trades": 1,
+}
+
+def encode_backtest_cursor(doc: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after ``doc``"""
+    payload = {"start_time": doc["start_time"].isoformat(), "id": str(doc["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+def decode_backtest_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Inverse of encode_backtest_cursor; raises ValueError on a malformed cursor"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["start_time"]), ObjectId(payload["id"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+async def list_backtest_summaries(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a user's backtest executions, newest first.
+    
+    Every run backend_services accepted is listed, whatever its status.
+    Uses keyset pagination on (start_time, _id) so every page is a bounded
+    index range scan, and projects summary fields only.
+    
+    Returns:
+        The page of execution documents and the cursor of the next page, if any
+    """
+    # backend_services stores user ids as strings
+    query: Dict[str, Any] = {"user_id": str(canonical_user_id(user_id))}
+    if cursor:
+        start_time, last_id = decode_backtest_cursor(cursor)
+        query["$or"] = [
+            {"start_time": {"$lt": start_time}},
+            {"start_time": start_time, "_id": {"$lt": last_id}},
+        ]
+    
+    docs = await (
+        db[BACKTEST_EXECUTIONS_COLLECTION]
+        .find(query, BACKTEST_SUMMARY_PROJECTION)
+        .sort([("start_time", -1), ("_id", -1)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+    
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_backtest_cursor(docs[-1])
+    return docs, next_cursor
+
 async def create_backtest(
     db: AsyncIOMotorDatabase, 
     user_id: Union[str, PyObjectId], 
@@ -329,50 +401,8 @@ async def get_strategy_for_backtest(
     strategy_id_str: str, 
     user_id: ObjectId
 ) -> Optional[Dict[str, Any]]:
-    # Add debug logging to see exactly what we're searching for
-    print(f"\n[DEBUG] Searching for strategy with ID: {strategy_id_str}")
-    print(f"[DEBUG] Collection names: {await db.list_collection_names()}\n")
-    
-    try:
-        strategy_obj_id = ObjectId(strategy_id_str)
-    except Exception:
-        print(f"[DEBUG] Invalid ObjectId format: {strategy_id_str}")
-        return None
-
-    # Check the 'strategy' collection (singular)
-    user_strategy = await db.strategy.find_one({
-        "_id": strategy_obj_id,
-        "$or": [
-            {"user_id": user_id},
-            {"user_id": str(user_id)}
-        ]
-    })
-    
-    if user_strategy:
-        print(f"[DEBUG] Found in 'strategy' collection: {user_strategy['name']}")
-        return user_strategy
-
-    # If not found in 'strategy', try 'strategies' (plural) as fallback
-    user_strategy_plural = await db.strategies.find_one({
-        "_id": strategy_obj_id,
-        "$or": [
-            {"user_id": user_id},
-            {"user_id": str(user_id)}
-        ]
-    })
-    
-    if user_strategy_plural:
-        print(f"[DEBUG] Found in 'strategies' collection: {user_strategy_plural['name']}")
-        return user_strategy_plural
-
-    # Try default strategies collection
-    default_strategy = await db.default_strategies.find_one(
-        {"_id": strategy_obj_id}
-    )
-    
-    if default_strategy:
-        print(f"[DEBUG] Found in 'default_strategies' collection: {default_strategy['name']}")
-        return default_strategy
-
-    print(f"[DEBUG] No strategy found with ID: {strategy_id_str}")
-    return None
+    """Find the user's strategy or a default template in one query"""
+    strategy = await resolve_strategy(db, strategy_id_str, user_id)
+    if not strategy:
+        print(f"[DEBUG] No strategy found with ID: {strategy_id_str}")
+    return strategy
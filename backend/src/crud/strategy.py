@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from bson import ObjectId
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from gridfs.errors import NoFile
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
 
 from ..models.strategy import (
     Strategy, 
@@ -12,6 +13,7 @@ from ..models.strategy import (
     BacktestParams
 )
 from ..utils.mongo_helpers import PyObjectId
+from ..database.user_ids import canonical_user_id
 from ..services.default_strategies import get_default_strategies_from_db
 from ..utils.redis_client import redis_client
 import json
@@ -19,25 +21,45 @@ import json
 # Strategy Collection Name
 STRATEGY_COLLECTION = "strategy"
 BACKTEST_COLLECTION = "backtest_result"
+# Written by backend_services, one document per run with its result summary
+EXECUTION_COLLECTION = "backtest_executions"
+# GridFS bucket holding the Parquet series an execution's result.series references
+SERIES_BUCKET = "backtest_series"
+
+# Execution fields behind a strategy's backtest results; trades and the
+# equity curve live in the series store and are served by /api/backtest/results
+BACKTEST_RESULT_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "strategy_id": 1,
+    "start_time": 1,
+    "result.total_return": 1,
+    "result.sharpe_ratio": 1,
+    "result.max_drawdown": 1,
+    "result.win_rate": 1,
+    "result.total_trades": 1,
+    "result.profit_factor": 1,
+    "result.initial_capital": 1,
+    "result.final_capital": 1,
+    "result.start_date": 1,
+    "result.end_date": 1,
+    "result.timeframe": 1,
+}
 
 # backend/app/crud/strategy.py
 async def get_strategies_by_user_id(db: AsyncIOMotorDatabase, user_id: Union[str, PyObjectId]) -> List[Strategy]:
-    """Get all strategies for a specific user (match both ObjectId and str user_id fields)"""
+    """Get all strategies for a specific user"""
     print(f"DEBUG CRUD: Searching for strategies with user_id: {user_id}")
     print(f"DEBUG CRUD: user_id type: {type(user_id)}")
     
     strategies_collection = db.strategy
-    # Match both ObjectId and string user_id
-    user_id_str = str(user_id)
-    query = {"$or": [
-        {"user_id": user_id},
-        {"user_id": user_id_str}
-    ]}
+    # user_id is stored as an ObjectId (see database/user_ids.py)
+    query = {"user_id": canonical_user_id(user_id)}
     cursor = strategies_collection.find(query)
     
     # Count total documents
     total_count = await strategies_collection.count_documents(query)
-    print(f"DEBUG CRUD: Found {total_count} documents matching user_id (any type)")
+    print(f"DEBUG CRUD: Found {total_count} documents matching user_id")
     
     strategies = []
     async for strategy_doc in cursor:
@@ -138,20 +160,49 @@ def fix_strategy_document(doc: dict) -> dict:
         print(f"DEBUG CRUD: Error fixing document: {str(e)}")
         return None
     
-async def get_strategy_by_id(db: AsyncIOMotorDatabase, strategy_id: PyObjectId, user_id: PyObjectId) -> Optional[Strategy]:
+async def resolve_strategy(
+    db: AsyncIOMotorDatabase,
+    strategy_id: Union[str, ObjectId],
+    user_id: Union[str, ObjectId]
+) -> Optional[dict]:
+    """
+    Find a strategy the user can run, among their own strategies and the
+    default templates, in a single query.
+    
+    Both branches are _id lookups; the user's own strategy wins if an id
+    somehow exists in both collections.
+    """
+    try:
+        strategy_obj_id = ObjectId(strategy_id) if not isinstance(strategy_id, ObjectId) else strategy_id
+        user_obj_id = canonical_user_id(user_id)
+    except Exception:
+        return None
+    
+    pipeline = [
+        {"$match": {"_id": strategy_obj_id, "user_id": user_obj_id}},
+        {"$unionWith": {
+            "coll": "default_strategies",
+            "pipeline": [{"$match": {"_id": strategy_obj_id}}]
+        }},
+        {"$limit": 1}
+    ]
+    strategies = await db[STRATEGY_COLLECTION].aggregate(pipeline).to_list(length=1)
+    return strategies[0] if strategies else None
+
+async def get_strategy_by_id(db: AsyncIOMotorDatabase, strategy_id: PyObjectId, user_id: Union[str, PyObjectId]) -> Optional[Strategy]:
     """Get a strategy by ID (ensuring it belongs to the user)"""
     strategy_data = await db[STRATEGY_COLLECTION].find_one({
         "_id": strategy_id,
-        "user_id": user_id
+        "user_id": canonical_user_id(user_id)
     })
     if strategy_data:
         return Strategy(**strategy_data)
     return None
 
-async def create_strategy(db: AsyncIOMotorDatabase, strategy_data: StrategyCreate, user_id: PyObjectId) -> Strategy:
+async def create_strategy(db: AsyncIOMotorDatabase, strategy_data: StrategyCreate, user_id: Union[str, PyObjectId]) -> Strategy:
     """Create a new strategy"""
     strategy = Strategy(
-        user_id=user_id,
+        user_id=canonical_user_id(user_id),
         name=strategy_data.name,
         description=strategy_data.description,
         config=strategy_data.config,
@@ -170,7 +221,7 @@ async def update_strategy(
     db: AsyncIOMotorDatabase, 
     strategy_id: PyObjectId, 
     strategy_update: StrategyUpdate, 
-    user_id: PyObjectId
+    user_id: Union[str, PyObjectId]
 ) -> Optional[Strategy]:
     """Update an existing strategy"""
     # Build update data
@@ -189,7 +240,7 @@ async def update_strategy(
     update_data["updated_at"] = datetime.utcnow()
     
     result = await db[STRATEGY_COLLECTION].update_one(
-        {"_id": strategy_id, "user_id": user_id},
+        {"_id": strategy_id, "user_id": canonical_user_id(user_id)},
         {"$set": update_data}
     )
     
@@ -197,23 +248,23 @@ async def update_strategy(
         return await get_strategy_by_id(db, strategy_id, user_id)
     return None
 
-async def delete_strategy(db: AsyncIOMotorDatabase, strategy_id: PyObjectId, user_id: PyObjectId) -> bool:
+async def delete_strategy(db: AsyncIOMotorDatabase, strategy_id: PyObjectId, user_id: Union[str, PyObjectId]) -> bool:
     """Delete a strategy"""
     result = await db[STRATEGY_COLLECTION].delete_one({
         "_id": strategy_id,
-        "user_id": user_id
+        "user_id": canonical_user_id(user_id)
     })
     return result.deleted_count > 0
 
 async def toggle_strategy_status(
     db: AsyncIOMotorDatabase, 
     strategy_id: PyObjectId, 
-    user_id: PyObjectId, 
+    user_id: Union[str, PyObjectId], 
     is_active: bool
 ) -> Optional[Strategy]:
     """Toggle strategy active status"""
     result = await db[STRATEGY_COLLECTION].update_one(
-        {"_id": strategy_id, "user_id": user_id},
+        {"_id": strategy_id, "user_id": canonical_user_id(user_id)},
         {"$set": {"is_active": is_active, "updated_at": datetime.utcnow()}}
     )
     
@@ -237,32 +288,58 @@ async def save_backtest_result(
     backtest_result.id = result.inserted_id
     return backtest_result
 
+def _completed_runs(strategy_id: Union[str, PyObjectId], user_id: Union[str, PyObjectId]) -> Dict[str, Any]:
+    # backend_services stores both ids as strings
+    return {"strategy_id": str(strategy_id), "user_id": str(user_id), "status": "completed"}
+
 async def get_backtest_results_by_strategy(
     db: AsyncIOMotorDatabase, 
-    strategy_id: PyObjectId
-) -> List[BacktestResult]:
-    """Get all backtest results for a strategy"""
-    results = []
-    async for result_data in db[BACKTEST_COLLECTION].find({"strategy_id": strategy_id}).sort("created_at", -1):
-        results.append(BacktestResult(**result_data))
-    return results
+    strategy_id: Union[str, PyObjectId],
+    user_id: Union[str, PyObjectId]
+) -> List[Dict[str, Any]]:
+    """Completed backtest executions of a user's strategy, newest first"""
+    cursor = (
+        db[EXECUTION_COLLECTION]
+        .find(_completed_runs(strategy_id, user_id), BACKTEST_RESULT_PROJECTION)
+        .sort("start_time", -1)
+    )
+    return await cursor.to_list(length=None)
 
 async def get_backtest_result_by_id(
     db: AsyncIOMotorDatabase, 
-    backtest_id: PyObjectId
-) -> Optional[BacktestResult]:
-    """Get a specific backtest result by ID"""
-    result_data = await db[BACKTEST_COLLECTION].find_one({"_id": backtest_id})
-    if result_data:
-        return BacktestResult(**result_data)
-    return None
+    backtest_id: str,
+    strategy_id: Union[str, PyObjectId],
+    user_id: Union[str, PyObjectId]
+) -> Optional[Dict[str, Any]]:
+    """A completed backtest execution of a user's strategy by execution id"""
+    return await db[EXECUTION_COLLECTION].find_one(
+        {"id": backtest_id, **_completed_runs(strategy_id, user_id)}, BACKTEST_RESULT_PROJECTION
+    )
+
+def _series_file_ids(execution: Dict[str, Any]) -> List[ObjectId]:
+    """GridFS files referenced by an execution's series, zoom levels included"""
+    file_ids = []
+    for ref in ((execution.get("result") or {}).get("series") or {}).values():
+        for stored in [ref, *(ref.get("zoom") or {}).values()]:
+            if stored.get("file_id"):
+                file_ids.append(ObjectId(stored["file_id"]))
+    return file_ids
 
 async def delete_backtest_results_by_strategy(
     db: AsyncIOMotorDatabase, 
-    strategy_id: PyObjectId
+    strategy_id: Union[str, PyObjectId],
+    bucket: Optional[AsyncIOMotorGridFSBucket] = None
 ) -> bool:
-    """Delete all backtest results for a strategy (when strategy is deleted)"""
-    result = await db[BACKTEST_COLLECTION].delete_many({"strategy_id": strategy_id})
+    """Delete all backtest executions of a strategy and their stored series (when strategy is deleted)"""
+    query = {"strategy_id": str(strategy_id)}
+    bucket = bucket or AsyncIOMotorGridFSBucket(db, bucket_name=SERIES_BUCKET)
+    async for execution in db[EXECUTION_COLLECTION].find(query, {"result.series": 1}):
+        for file_id in _series_file_ids(execution):
+            try:
+                await bucket.delete(file_id)
+            except NoFile:
+                pass
+    result = await db[EXECUTION_COLLECTION].delete_many(query)
     return result.deleted_count > 0
 
 async def get_default_strategies_from_db(db: AsyncIOMotorDatabase) -> List[dict]:
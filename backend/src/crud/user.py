@@ -3,6 +3,7 @@ from bson import ObjectId
 from typing import Optional
 from ..models.user import UserInDB, UserCreate
 from ..utils.security import get_password_hash
+from ..services.user_cache import user_cache
 
 async def get_user_by_mongodb_id(db: AsyncIOMotorDatabase, user_id: str) -> Optional[UserInDB]:
     """Get user by MongoDB ObjectId"""
@@ -68,6 +69,7 @@ async def update_user(db: AsyncIOMotorDatabase, user_id: str, update_data: dict)
             {"_id": ObjectId(user_id)},
             {"$set": filtered_data}
         )
+        await user_cache.invalidate(user_id)
         
         if result.modified_count > 0:
             return await get_user_by_mongodb_id(db, user_id)
@@ -76,4 +78,4 @@ async def update_user(db: AsyncIOMotorDatabase, user_id: str, update_data: dict)
             
     except Exception as e:
         print(f"Error updating user: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -1,67 +1,215 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from fastapi import HTTPException, status
+from pymongo import monitoring
 from dotenv import load_dotenv
 from pathlib import Path
+from typing import Any, Dict
+import asyncio
+import logging
+import threading
 import os
 
 # Load environment variables from .env file in backend directory
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
+logger = logging.getLogger(__name__)
+
+# Connection pool settings, tunable per deployment
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', '10'))
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', '300000'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+
+
+def get_mongo_url() -> str:
+    """Get MongoDB connection URL based on environment"""
+    if os.getenv('LOCAL_DB', 'false').lower() == 'true':
+        # Docker sets MONGO_URL to the mongo service
+        return os.getenv('MONGO_URL', 'mongodb://localhost:27017/bot_club_db')
+
+    # MongoDB Atlas
+    connection_string = os.getenv('MONGO_CONNECTION_STRING')
+    if connection_string:
+        return connection_string
+
+    username = os.getenv('MONGO_USERNAME', 'fred-bot-club')
+    password = os.getenv('MONGO_PASSWORD')
+    cluster = os.getenv('MONGO_CLUSTER', 'bot-club-cluster.b9yda9w.mongodb.net')
+    if not password:
+        raise ValueError("MONGO_PASSWORD environment variable is required for Atlas connection")
+
+    return f"mongodb+srv://{username}:{password}@{cluster}/bot_club_db?retryWrites=true&w=majority"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Tracks connection pool utilization from pymongo pool events.
+    Events arrive on driver threads, so counters are guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_wait_seconds = 0.0
+        self.max_checkout_wait_seconds = 0.0
+        self.pool_clears = 0
+
+    def _checkout_finished(self) -> None:
+        """Must be called with the lock held"""
+        self.waiting = max(self.waiting - 1, 0)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(self.open_connections - 1, 0)
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._checkout_finished()
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        wait = getattr(event, 'duration', None) or 0.0
+        with self._lock:
+            self._checkout_finished()
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+            self.checkouts += 1
+            self.checkout_wait_seconds += wait
+            self.max_checkout_wait_seconds = max(self.max_checkout_wait_seconds, wait)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current pool utilization"""
+        with self._lock:
+            return {
+                "min_pool_size": MONGO_MIN_POOL_SIZE,
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "wait_queue_timeout_ms": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "available": max(self.open_connections - self.checked_out, 0),
+                "utilization": round(self.checked_out / MONGO_MAX_POOL_SIZE, 4) if MONGO_MAX_POOL_SIZE else None,
+                "waiting": self.waiting,
+                "max_waiting": self.max_waiting,
+                "max_checked_out": self.max_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_checkout_wait_ms": round(self.checkout_wait_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_checkout_wait_seconds * 1000, 3),
+                "pool_clears": self.pool_clears,
+            }
+
+
 class DatabaseClient:
+    """
+    Owner of the process-wide Motor client. The FastAPI lifespan connects
+    and disconnects it; every request shares its connection pool.
+    """
+
     def __init__(self):
         self.client = None
         self.database = None
         self._connected = False
-        
+        self._connect_lock = asyncio.Lock()
+        self.pool_metrics = PoolMetricsListener()
+
     async def connect(self) -> AsyncIOMotorDatabase:
         """Connect to MongoDB using Motor (async)"""
         # Return existing database if already connected
         if self._connected and self.database is not None:
             return self.database
-            
+
+        async with self._connect_lock:
+            if self._connected and self.database is not None:
+                return self.database
+            return await self._connect()
+
+    async def _connect(self) -> AsyncIOMotorDatabase:
         try:
-            # Check if we should use local MongoDB
-            use_local = os.getenv('LOCAL_DB', 'false').lower() == 'true'
-            
-            if use_local:
-                # Check if we're running in Docker (use service name) or local development
-                mongo_url = os.getenv('MONGO_URL', 'mongodb://localhost:27017/bot_club_db')
-                print(f"Connecting to local MongoDB: {mongo_url}")
-                self.client = AsyncIOMotorClient(mongo_url)
-            else:
-                # Use MongoDB Atlas
-                connection_string = os.getenv('MONGO_CONNECTION_STRING')
-                if not connection_string:
-                    # Build connection string from components
-                    username = os.getenv('MONGO_USERNAME')
-                    password = os.getenv('MONGO_PASSWORD')
-                    cluster = os.getenv('MONGO_CLUSTER')
-                    connection_string = f"mongodb+srv://{username}:{password}@{cluster}/"
-                
-                print(f"Connecting to MongoDB Atlas")
-                self.client = AsyncIOMotorClient(connection_string)
-            
+            mongo_url = get_mongo_url()
+            logger.info("Connecting to MongoDB with pooled client "
+                        f"(min={MONGO_MIN_POOL_SIZE}, max={MONGO_MAX_POOL_SIZE})")
+            self.client = AsyncIOMotorClient(
+                mongo_url,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                event_listeners=[self.pool_metrics]
+            )
+
             # Get database name
             db_name = os.getenv('MONGO_DB_NAME', 'bot_club_db')
             self.database = self.client[db_name]
-            
+
             # Test the connection
             await self.client.admin.command('ping')
-            print(f"Successfully connected to MongoDB database: {db_name}")
+            logger.info(f"Successfully connected to MongoDB database: {db_name}")
             self._connected = True
             return self.database
-            
+
         except Exception as e:
-            print(f"Failed to connect to MongoDB: {e}")
+            logger.error(f"Failed to connect to MongoDB: {e}")
+            if self.client:
+                self.client.close()
             self._connected = False
+            self.client = None
+            self.database = None
             raise
-    
+
+    def get_database(self) -> AsyncIOMotorDatabase:
+        """Database of the connected client"""
+        if self.database is None:
+            raise RuntimeError("Database client is not connected")
+        return self.database
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection pool utilization for monitoring"""
+        return {"connected": self._connected, **self.pool_metrics.snapshot()}
+
     async def disconnect(self):
         """Disconnect from MongoDB"""
         if self.client:
             self.client.close()
-            print("Disconnected from MongoDB")
+            logger.info("Disconnected from MongoDB")
         self._connected = False
         self.client = None
         self.database = None
@@ -71,6 +219,14 @@ db_client = DatabaseClient()
 
 async def get_db() -> AsyncIOMotorDatabase:
     """
-    FastAPI dependency to get database connection
+    FastAPI dependency to get database connection.
+    Returns the shared pooled database; all routers depend on this.
     """
-    return await db_client.connect()
\ No newline at end of file
+    try:
+        return await db_client.connect()
+    except Exception as e:
+        logger.error(f"Database connection error in get_db: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database connection error"
+        )
@@ -0,0 +1,69 @@
+"""
+Re-encryption of stored user config secrets after a key rotation: once a
+new key is prepended to CONFIG_ENCRYPTION_KEY, every secret is rewritten
+under it so the old key can be dropped from the setting.
+"""
+from typing import Any, Dict, Iterable
+import logging
+
+from cryptography.fernet import InvalidToken
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from ..models.user_config import SECRET_FIELDS, ConfigEncryption
+
+logger = logging.getLogger(__name__)
+
+USER_CONFIG_COLLECTION = "user_config"
+
+
+async def rotate_config_secrets(
+    db: AsyncIOMotorDatabase,
+    fields: Iterable[str] = SECRET_FIELDS,
+    batch_size: int = 500
+) -> Dict[str, int]:
+    """
+    Re-encrypt the secret fields of every user config under the primary key.
+
+    Runs online in batches. Each update only matches while the document still
+    holds the values it was read with, so concurrent writes are never
+    overwritten. Values no configured key can decrypt are left alone and
+    counted. Idempotent, and a no-op while CONFIG_ENCRYPTION_KEY holds a
+    single key.
+    """
+    fields = tuple(fields)
+    rotated = skipped = 0
+    if not ConfigEncryption.has_old_keys():
+        return {"rotated": rotated, "skipped": skipped}
+    last_id = None
+    while True:
+        query: Dict[str, Any] = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        projection = {field: 1 for field in fields}
+        docs = await db[USER_CONFIG_COLLECTION].find(query, projection).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        operations = []
+        for doc in docs:
+            current = {field: doc[field] for field in fields if doc.get(field)}
+            updates = {}
+            for field, value in current.items():
+                try:
+                    rotated_value = ConfigEncryption.rotate_value(value)
+                except InvalidToken:
+                    skipped += 1
+                    continue
+                if rotated_value != value:
+                    updates[field] = rotated_value
+            if updates:
+                operations.append(UpdateOne({"_id": doc["_id"], **current}, {"$set": updates}))
+        if operations:
+            result = await db[USER_CONFIG_COLLECTION].bulk_write(operations, ordered=False)
+            rotated += result.modified_count
+
+    if rotated or skipped:
+        logger.info(f"config secret rotation: {rotated} configs re-encrypted, {skipped} values skipped")
+    return {"rotated": rotated, "skipped": skipped}
@@ -0,0 +1,154 @@
+"""
+Index bootstrap and query-plan audit for the collections behind hot queries
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Indexes every collection needs, created idempotently at startup and by init_db
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "backtest_executions": [
+        IndexModel([("id", ASCENDING)], name="id", unique=True),
+        IndexModel(
+            [("user_id", ASCENDING), ("start_time", DESCENDING), ("_id", DESCENDING)],
+            name="user_id_start_time_id"
+        ),
+        IndexModel([("strategy_id", ASCENDING), ("start_time", DESCENDING)], name="strategy_id_start_time"),
+    ],
+    "trades": [
+        IndexModel([("backtest_id", ASCENDING)], name="backtest_id"),
+    ],
+    "strategy": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "user_config": [
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "default_strategies": [
+        IndexModel([("key", ASCENDING)], name="key"),
+    ],
+    "user": [
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("userName", ASCENDING)], name="userName"),
+    ],
+}
+
+PROBE_ID = ObjectId("000000000000000000000000")
+
+# Representative shapes of the hot queries; values are placeholders, only the plan matters
+HOT_QUERIES: List[Dict[str, Any]] = [
+    {"name": "execution_by_id", "collection": "backtest_executions", "filter": {"id": "probe"}},
+    {"name": "trades_by_backtest", "collection": "trades", "filter": {"backtest_id": "probe"}},
+    {"name": "strategies_by_user", "collection": "strategy", "filter": {"user_id": PROBE_ID}},
+    {"name": "user_config_by_user", "collection": "user_config", "filter": {"user_id": PROBE_ID}},
+    {"name": "default_strategy_by_key", "collection": "default_strategies", "filter": {"key": "probe"}},
+    {
+        "name": "executions_by_user",
+        "collection": "backtest_executions",
+        "filter": {"user_id": "probe"},
+        "sort": {"start_time": -1, "_id": -1},
+    },
+    {
+        "name": "executions_by_strategy",
+        "collection": "backtest_executions",
+        "filter": {"strategy_id": "probe", "user_id": "probe", "status": "completed"},
+        "sort": {"start_time": -1},
+    },
+    {"name": "user_by_email", "collection": "user", "filter": {"email": "probe"}},
+]
+
+
+def _plan_stages(plan: Any, stages: Optional[Set[str]] = None) -> Set[str]:
+    """Every stage name in an explain plan, whichever engine produced it"""
+    if stages is None:
+        stages = set()
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.add(plan["stage"])
+        for value in plan.values():
+            _plan_stages(value, stages)
+    elif isinstance(plan, list):
+        for value in plan:
+            _plan_stages(value, stages)
+    return stages
+
+
+class IndexManager:
+    """
+    Creates the declared indexes and checks, with ``explain``, that the hot
+    queries are served by them. The last audit is kept for the diagnostics
+    endpoint.
+    """
+
+    def __init__(
+        self,
+        required_indexes: Dict[str, List[IndexModel]] = REQUIRED_INDEXES,
+        hot_queries: List[Dict[str, Any]] = HOT_QUERIES
+    ):
+        self.required_indexes = required_indexes
+        self.hot_queries = hot_queries
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        """
+        Create the declared indexes. Existing identical indexes are left
+        alone; a conflict on one collection does not stop the others.
+
+        Returns:
+            Index names per collection, and the error of any collection that failed
+        """
+        created: Dict[str, List[str]] = {}
+        errors: Dict[str, str] = {}
+        for collection, indexes in self.required_indexes.items():
+            try:
+                created[collection] = await db[collection].create_indexes(indexes)
+            except Exception as e:
+                errors[collection] = str(e)
+                logger.error(f"Could not create indexes on {collection}: {e}")
+        return {"indexes": created, "errors": errors}
+
+    async def explain(self, db: AsyncIOMotorDatabase, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Winning plan of one hot query"""
+        command: Dict[str, Any] = {"find": query["collection"], "filter": query["filter"], "limit": 1}
+        if query.get("sort"):
+            command["sort"] = query["sort"]
+
+        result = {"name": query["name"], "collection": query["collection"]}
+        try:
+            explained = await db.command("explain", command, verbosity="queryPlanner")
+        except Exception as e:
+            return {**result, "error": str(e), "collscan": None}
+
+        stages = _plan_stages(explained.get("queryPlanner", {}).get("winningPlan", {}))
+        return {**result, "stages": sorted(stages), "collscan": "COLLSCAN" in stages}
+
+    async def audit(self, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        """Explain every hot query and warn about the ones scanning a whole collection"""
+        plans = [await self.explain(db, query) for query in self.hot_queries]
+        collscans = [plan["name"] for plan in plans if plan["collscan"]]
+        for plan in plans:
+            if plan["collscan"]:
+                logger.warning(f"Hot query {plan['name']} on {plan['collection']} uses a COLLSCAN")
+
+        self.last_report = {
+            "checked_at": datetime.utcnow(),
+            "collscans": collscans,
+            "queries": plans,
+        }
+        return self.last_report
+
+    async def bootstrap(self, db: AsyncIOMotorDatabase) -> Dict[str, Any]:
+        """Create indexes, then audit the hot queries against them"""
+        indexes = await self.ensure_indexes(db)
+        report = await self.audit(db)
+        return {**indexes, **report}
+
+
+# Global index manager instance
+index_manager = IndexManager()
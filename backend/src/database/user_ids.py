@@ -0,0 +1,77 @@
+"""
+Canonical ``user_id`` storage: every user-owned document references its
+owner by ObjectId, the type of ``user._id``, so lookups are a single
+index-backed equality instead of an ``$or`` over both forms.
+"""
+from typing import Any, Dict, Iterable, Union
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Collections whose user_id is migrated to ObjectId
+USER_ID_COLLECTIONS = ("strategy", "backtest", "backtest_results", "user_config")
+
+
+def canonical_user_id(user_id: Union[str, ObjectId]) -> ObjectId:
+    """The stored form of a user id; raises ValueError for anything that is not an ObjectId"""
+    if isinstance(user_id, ObjectId):
+        return user_id
+    if isinstance(user_id, str) and ObjectId.is_valid(user_id):
+        return ObjectId(user_id)
+    raise ValueError(f"Invalid user id: {user_id!r}")
+
+
+async def migrate_collection_user_ids(db: AsyncIOMotorDatabase, collection: str, batch_size: int = 500) -> Dict[str, int]:
+    """
+    Rewrite string user_ids of one collection as ObjectIds.
+
+    Runs online in batches. Each update only matches while the document still
+    holds the string it was read with, so concurrent writes are never
+    overwritten. Strings that are not ObjectIds are left alone and counted.
+    """
+    migrated = skipped = 0
+    last_id = None
+    while True:
+        query: Dict[str, Any] = {"user_id": {"$type": "string"}}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+        docs = await db[collection].find(query, {"user_id": 1}).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+        last_id = docs[-1]["_id"]
+
+        operations = []
+        for doc in docs:
+            if ObjectId.is_valid(doc["user_id"]):
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"], "user_id": doc["user_id"]},
+                    {"$set": {"user_id": ObjectId(doc["user_id"])}}
+                ))
+            else:
+                skipped += 1
+        if operations:
+            result = await db[collection].bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+
+    return {"migrated": migrated, "skipped": skipped}
+
+
+async def migrate_user_ids(
+    db: AsyncIOMotorDatabase,
+    collections: Iterable[str] = USER_ID_COLLECTIONS,
+    batch_size: int = 500
+) -> Dict[str, Dict[str, int]]:
+    """
+    Canonicalize user_id across the user-owned collections.
+    Idempotent; once done, each run is one empty query per collection.
+    """
+    report = {}
+    for collection in collections:
+        report[collection] = await migrate_collection_user_ids(db, collection, batch_size)
+        if report[collection]["migrated"] or report[collection]["skipped"]:
+            logger.info(f"user_id migration on {collection}: {report[collection]}")
+    return report
@@ -10,27 +10,25 @@ load_dotenv(dotenv_path=env_path)
 # Alternative: Load from current directory and parent directories
 # load_dotenv()
 
-from pymongo import MongoClient
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 from jose import JWTError, jwt
 from typing import Optional, AsyncGenerator
 import logging
+import secrets
 
 # Ensure correct relative imports based on your project structure
-from .models.user import UserInDB
-from .database.client import db_client
+from .models.user import User
+from .database.client import db_client, get_db
 from .crud.user import get_user_by_mongodb_id
+from .services.user_cache import user_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# MongoDB connection globals - initialized in startup
-client: Optional[MongoClient] = None
-
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
@@ -38,71 +36,14 @@ ALGORITHM = "HS256"
 # Security
 security = HTTPBearer()
 
-def get_mongo_url():
-    """Get MongoDB connection URL based on environment"""
-    local = os.getenv("LOCAL_DB", "false").lower() == "true"
-    
-    if local:
-        return os.getenv("MONGO_URL", "mongodb://mongo:27017/")  # Use docker service name
-    else:
-        # For MongoDB Atlas
-        username = os.getenv("MONGO_USERNAME", "fred-bot-club")
-        password = os.getenv("MONGO_PASSWORD")  # This should be set in environment
-        cluster = os.getenv("MONGO_CLUSTER", "bot-club-cluster.b9yda9w.mongodb.net")
-        
-        if not password:
-            raise ValueError("MONGO_PASSWORD environment variable is required for Atlas connection")
-        
-        return f"mongodb+srv://{username}:{password}@{cluster}/bot_club_db?retryWrites=true&w=majority"
-
-async def connect_to_mongo():
-    """Initialize MongoDB connection - called during startup"""
-    global client
-    
-    try:
-        mongo_url = get_mongo_url()
-        client = MongoClient(mongo_url)
-        
-        # Test the connection
-        client.admin.command('ping')
-        logger.info("Successfully connected to MongoDB")
-        
-    except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
-        raise
-
-async def close_mongo_connection():
-    """Close MongoDB connection - called during shutdown"""
-    global client
-    if client:
-        client.close()
-        logger.info("MongoDB connection closed")
-
-async def get_db():
-    """Dependency to get database instance"""
-    try:
-        # Make sure to get a client first if it's not already created
-        client = await get_mongodb_client()
-        # Then get the database from the client
-        db = client[os.getenv("MONGO_DB", "bot_club_db")]
-        return db
-    except Exception as e:
-        logger.error(f"Database connection error in get_db: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Database connection error"
-        )
-
-async def get_mongodb_client():
-    """Get MongoDB client instance"""
-    mongo_url = get_mongo_url()
-    client = AsyncIOMotorClient(mongo_url)
-    return client
+# Bearer token for the internal /metrics endpoints; unset disables them
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+metrics_security = HTTPBearer(auto_error=False)
 
 async def get_current_user_from_token(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncIOMotorDatabase = Depends(get_db)
-) -> UserInDB:
+) -> User:
     """Get current user from JWT token"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -119,9 +60,29 @@ async def get_current_user_from_token(
     except JWTError:
         raise credentials_exception
     
-    # Get user from database
-    user = await get_user_by_mongodb_id(db, user_id)
+    # Get user from the cache, falling back to the database
+    user = await user_cache.get(user_id)
     if user is None:
+        user = await get_user_by_mongodb_id(db, user_id)
+        if user is None:
+            raise credentials_exception
+        user = await user_cache.set(user_id, user)
+    
+    # Deactivated accounts keep no access with tokens issued before
+    if not user.isActive:
         raise credentials_exception
     
-    return user
\ No newline at end of file
+    return user
+
+async def require_metrics_token(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(metrics_security)
+) -> None:
+    """Restrict internal diagnostics to scrapers holding METRICS_TOKEN"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(credentials.credentials, METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
@@ -8,19 +8,21 @@ from pathlib import Path
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(dotenv_path=env_path)
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from motor.motor_asyncio import AsyncIOMotorClient
 
-from .routes import auth, user, user_config, strategy, backtest_routes
+from .routes import auth, user, user_config, strategy, backtest_routes, market
 from .database.client import db_client
 from .utils.redis_client import redis_client
+from .utils.rate_limit import RateLimitMiddleware
+from .services.backtest.services_client import backtest_services_client
+from .services.progress_stream import progress_broker
 from .services.default_strategies import initialize_default_strategies
-
-# Global database client
-motor_client = None
-database = None
+from .database.indexes import index_manager
+from .dependencies import require_metrics_token
+from .database.user_ids import migrate_user_ids
+from .database.config_secrets import rotate_config_secrets
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,17 +31,40 @@ async def lifespan(app: FastAPI):
     This ensures proper initialization and cleanup of resources.
     """
     # Startup
-    global motor_client, database
-    
     print("Starting up application...")
     
-    # Initialize MongoDB connection
-    motor_client = AsyncIOMotorClient(os.getenv("MONGO_URL", "mongodb://mongo:27017/"))
-    database = motor_client[os.getenv("MONGO_DB_NAME", "bot_club_db")]
+    # Open the shared, pooled MongoDB client used by every request
+    database = None
+    try:
+        database = await db_client.connect()
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        # Don't fail startup; get_db reconnects on the next request
     
     # Store database in app state for dependency injection
     app.state.db = database
     
+    if database is not None:
+        # Store every user_id as an ObjectId; a no-op once migrated
+        try:
+            await migrate_user_ids(database)
+        except Exception as e:
+            print(f"Error migrating user ids: {e}")
+        
+        # Re-encrypt config secrets under the primary key after a key rotation
+        try:
+            await rotate_config_secrets(database)
+        except Exception as e:
+            print(f"Error re-encrypting config secrets: {e}")
+        
+        # Create the indexes behind the hot queries and warn about any COLLSCAN
+        try:
+            report = await index_manager.bootstrap(database)
+            if report["collscans"]:
+                print(f"WARNING: hot queries without an index: {', '.join(report['collscans'])}")
+        except Exception as e:
+            print(f"Error bootstrapping database indexes: {e}")
+    
     # Initialize Redis connection
     try:
         await redis_client.connect()
@@ -49,6 +74,12 @@ async def lifespan(app: FastAPI):
         print(f"Error initializing Redis: {e}")
         # Don't fail startup if Redis can't be initialized
     
+    # One progress subscription for every streaming client of this process
+    await progress_broker.start()
+    
+    # Pooled HTTP client for dispatching backtests to backend_services
+    await backtest_services_client.start()
+    
     # Initialize default strategies (only creates if they don't exist)
     try:
         await initialize_default_strategies(database)
@@ -62,15 +93,19 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("Shutting down application...")
     
+    await progress_broker.stop()
+    
     # Disconnect from Redis
     try:
         await redis_client.disconnect()
     except Exception as e:
         print(f"Error disconnecting Redis: {e}")
     
+    # Close the backend_services client
+    await backtest_services_client.close()
+    
     # Disconnect from MongoDB
-    if motor_client:
-        motor_client.close()
+    await db_client.disconnect()
 
 
 # Create FastAPI app with lifespan events
@@ -88,6 +123,10 @@ origins = [
     "http://127.0.0.1:3001",
 ]
 
+# Limit backtest submission, result reads and quotes per user; added first so
+# CORS headers still wrap its 429 responses
+app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -102,6 +141,7 @@ app.include_router(user.router, prefix="/api/users", tags=["users"])
 app.include_router(user_config.router, prefix="/api/user-config", tags=["user-config"])
 app.include_router(strategy.router, prefix="/api/strategy", tags=["strategies"])
 app.include_router(backtest_routes.router, prefix="/api/backtest", tags=["backtests"])
+app.include_router(market.router, prefix="/api/market", tags=["market"])
 
 @app.get("/")
 async def root():
@@ -112,7 +152,21 @@ async def health_check():
     """Health check endpoint for container monitoring"""
     try:
         # Test database connection
+        database = await db_client.connect()
         await database.command("ping")
         return {"status": "healthy", "database": "connected"}
     except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
\ No newline at end of file
+        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+
+@app.get("/metrics/db-pool", dependencies=[Depends(require_metrics_token)])
+async def db_pool_metrics():
+    """MongoDB connection pool utilization"""
+    return db_client.pool_stats()
+
+@app.get("/metrics/db-indexes", dependencies=[Depends(require_metrics_token)])
+async def db_index_diagnostics(refresh: bool = False):
+    """Query plans of the hot queries; refresh=true re-runs the audit"""
+    if refresh or index_manager.last_report is None:
+        database = await db_client.connect()
+        return await index_manager.audit(database)
+    return index_manager.last_report
\ No newline at end of file
@@ -119,6 +119,7 @@ class BacktestSummary(BaseModel):
     id: str = Field(..., description="Backtest ID")
     strategy_id: str = Field(..., description="Strategy ID")
     strategy_name: str = Field(..., description="Strategy name")
+    status: str = Field("completed", description="Execution status")
     total_return: float = Field(..., description="Total return percentage")
     sharpe_ratio: float = Field(..., description="Sharpe ratio")
     max_drawdown: float = Field(..., description="Max drawdown percentage")
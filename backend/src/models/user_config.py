@@ -1,9 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional
 from datetime import datetime
 import hashlib
 import os
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,28 +49,50 @@ class UserConfigResponse(UserConfigBase):
             self.polygon_secret_key = "***"
         return self
 
+# Encrypted fields of a user config document
+SECRET_FIELDS = ("alpaca_paper_secret_key", "alpaca_live_secret_key", "polygon_secret_key")
+
 # Encryption utilities
 class ConfigEncryption:
+    """
+    Fernet encryption of user config secrets. CONFIG_ENCRYPTION_KEY holds
+    one key, or several separated by commas to rotate keys: the first
+    encrypts, and any of them decrypts. The cipher is built once per key
+    setting rather than per value.
+    """
+    _cipher: Optional[MultiFernet] = None
+    _cipher_setting: Optional[str] = None
+    
     @staticmethod
-    def get_encryption_key():
-        """Get encryption key from environment"""
-        key = os.getenv('CONFIG_ENCRYPTION_KEY')
-        if not key:
+    def _keys(setting: Optional[str]) -> List[bytes]:
+        if not setting:
             logger.error("CONFIG_ENCRYPTION_KEY not found in environment variables!")
             logger.error("Please generate a key with: python generate_encryption_key.py")
             raise ValueError("CONFIG_ENCRYPTION_KEY environment variable is required")
+        return [key.strip().encode() for key in setting.split(",") if key.strip()]
+    
+    @staticmethod
+    def get_encryption_key():
+        """Get the primary encryption key from environment"""
+        # Validates every configured key
+        ConfigEncryption.get_cipher()
+        return ConfigEncryption._keys(ConfigEncryption._cipher_setting)[0]
+    
+    @classmethod
+    def get_cipher(cls) -> MultiFernet:
+        """The cipher for the current CONFIG_ENCRYPTION_KEY, validated once"""
+        setting = os.getenv('CONFIG_ENCRYPTION_KEY')
+        if cls._cipher is not None and setting == cls._cipher_setting:
+            return cls._cipher
         
+        keys = cls._keys(setting)
         try:
-            # Ensure the key is properly formatted
-            if isinstance(key, str):
-                key = key.encode()
-            
-            # Validate the key by trying to create a Fernet instance
-            Fernet(key)
-            return key
+            cipher = MultiFernet([Fernet(key) for key in keys])
         except Exception as e:
             logger.error(f"Invalid CONFIG_ENCRYPTION_KEY format: {e}")
             raise ValueError("CONFIG_ENCRYPTION_KEY must be a valid Fernet key")
+        cls._cipher, cls._cipher_setting = cipher, setting
+        return cipher
     
     @staticmethod
     def encrypt_value(value: str) -> str:
@@ -79,8 +101,7 @@ class ConfigEncryption:
             return value
         
         try:
-            fernet = Fernet(ConfigEncryption.get_encryption_key())
-            encrypted_value = fernet.encrypt(value.encode())
+            encrypted_value = ConfigEncryption.get_cipher().encrypt(value.encode())
             return encrypted_value.decode()
         except Exception as e:
             logger.error(f"Encryption error: {e}")
@@ -93,10 +114,45 @@ class ConfigEncryption:
             return encrypted_value
             
         try:
-            fernet = Fernet(ConfigEncryption.get_encryption_key())
-            decrypted_value = fernet.decrypt(encrypted_value.encode())
+            decrypted_value = ConfigEncryption.get_cipher().decrypt(encrypted_value.encode())
             return decrypted_value.decode()
         except Exception as e:
             logger.error(f"Decryption error: {e}")
             # Return empty string on decryption failure to avoid exposing encrypted data
-            return ""
\ No newline at end of file
+            return ""
+    
+    @staticmethod
+    def decrypt_fields(config_doc: Dict[str, Any], fields: Iterable[str] = SECRET_FIELDS) -> Dict[str, Any]:
+        """
+        Copy of a config document with its secret fields decrypted
+        
+        Args:
+            config_doc: Stored user config
+            fields: Encrypted fields; absent or empty ones are left as they are
+        """
+        decrypted = dict(config_doc)
+        for field in fields:
+            if decrypted.get(field):
+                decrypted[field] = ConfigEncryption.decrypt_value(decrypted[field])
+        return decrypted
+    
+    @staticmethod
+    def has_old_keys() -> bool:
+        """Whether CONFIG_ENCRYPTION_KEY lists keys besides the primary one"""
+        ConfigEncryption.get_cipher()
+        return len(ConfigEncryption._keys(ConfigEncryption._cipher_setting)) > 1
+    
+    @staticmethod
+    def rotate_value(encrypted_value: str) -> str:
+        """
+        Re-encrypt a value under the primary key, e.g. after adding a new key.
+        Values already under the primary key are returned unchanged.
+        """
+        if not encrypted_value:
+            return encrypted_value
+        cipher = ConfigEncryption.get_cipher()
+        try:
+            Fernet(ConfigEncryption.get_encryption_key()).decrypt(encrypted_value.encode())
+            return encrypted_value
+        except InvalidToken:
+            return cipher.rotate(encrypted_value.encode()).decode()
@@ -1,23 +1,62 @@
 # backend/src/routes/backtest_routes.py
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uuid
 import asyncio
+import math
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from bson import ObjectId
 
-from ..database.client import get_db
+from ..dependencies import get_db
 from ..models.backtest import BacktestParams, BacktestResponse, BacktestSummary
 from ..models.strategy import Strategy
-from ..models.user import UserInDB
+from ..models.user import User
 from ..dependencies import get_current_user_from_token
-from ..utils.redis_client import redis_client
+from ..utils.redis_client import BACKTEST_KEY_TTL, redis_client
+from ..utils.fast_json import stream_object
 from ..services.default_strategies import get_default_strategies_from_db
+from ..services.provider_credentials import provider_credentials
+from ..crud.backtest import list_backtest_summaries
+from ..crud.strategy import resolve_strategy
+from ..database.user_ids import canonical_user_id
+from ..services.backtest.services_client import BacktestServicesUnavailable, backtest_services_client
+from ..services.progress_stream import (
+    TERMINAL_STATUSES, execution_snapshot_key, format_sse, progress_broker
+)
 
 router = APIRouter(tags=["backtest"])
 
+# Most ids accepted by one bulk status request
+MAX_STATUS_BATCH = 200
+
+# Most jobs accepted by one batch backtest request
+MAX_BATCH_JOBS = 50
+
+# Progress streaming
+STREAM_HEARTBEAT_SECONDS = 15.0
+STREAM_DISPATCH_TIMEOUT_SECONDS = 10.0
+STREAM_POLL_SECONDS = 2.0
+
+# Trades per page when streaming results; matches the series row group size
+RESULT_STREAM_PAGE_SIZE = 8192
+
+# Columnar media types /results negotiates, and the backend_services format serving each
+COLUMNAR_MEDIA_TYPES = {
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+}
+
+# Bar columns that are not indicators in trade details
+TRADE_BAR_FIELDS = {"timestamp", "open", "high", "low", "close", "volume"}
+
+# Backtest listing page sizes
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
 # Pydantic models for request/response
 class BacktestRunRequest(BaseModel):
     strategy_id: str
@@ -89,6 +128,22 @@ class TradeDetailsResponse(BaseModel):
     entry_data: List[TradeDetailsData]
     exit_data: Optional[List[TradeDetailsData]] = None
 
+class BacktestBatchRequest(BaseModel):
+    jobs: List[BacktestRunRequest] = Field(..., min_length=1, max_length=MAX_BATCH_JOBS)
+
+class BacktestBatchResponse(BaseModel):
+    group_id: str
+    backtest_ids: List[str]
+    message: str
+
+class BacktestGroupStatus(BaseModel):
+    group_id: str
+    status: str  # 'running', 'completed', 'partially_failed', 'failed'
+    progress: int  # 0-100, finished backtests count as done
+    total: int
+    counts: Dict[str, int]  # backtests per status
+    backtests: Dict[str, BacktestStatus]
+
 class DeployRequest(BaseModel):
     strategy_id: str
     strategy_type: str
@@ -112,180 +167,103 @@ async def run_backtest_async(
     data_provider: str,
     db: AsyncIOMotorDatabase
 ):
-    """Run backtest asynchronously and update progress in Redis"""
+    """Dispatch a backtest to backend_services and record it in Redis"""
     try:
         # Update status to running
         await redis_client.hset(f"backtest:{backtest_id}", mapping={
             "status": "running",
             "progress": 0,
             "user_id": user_id
-        })
+        }, ttl=BACKTEST_KEY_TTL)
         
-        # Call backend services to run the backtest
-        try:
-            import requests
-            
-            backend_services_url = "http://backend_services:8001"  # Docker service name
-            backtest_payload = {
-                "strategy_id": str(strategy_config.get('_id', strategy_config.get('id', ''))),
-                "user_id": user_id,
-                "initial_capital": initial_capital,
-                "start_date": start_date,
-                "end_date": end_date,
-                "timeframe": timeframe,
-                "data_provider": data_provider
-            }
-            
-            print(f"Calling backend_services with payload: {backtest_payload}")
-            
-            response = requests.post(
-                f"{backend_services_url}/backtest/run",
-                json=backtest_payload
-            )
-            
-            if response.status_code == 200:
-                # Backend services will handle the execution
-                results = response.json()
-                print(f"Backend services response: {results}")
-                
-                # Update status to completed
-                await redis_client.hset(f"backtest:{backtest_id}", mapping={
-                    "status": "completed",
-                    "progress": 100
-                })
-            else:
-                raise Exception(f"Backend services error: {response.text}")
-                
-        except ImportError:
-            # Fallback to mock implementation if requests is not available
-            print("Warning: requests module not available, using mock implementation")
-            
-            # Simulate backtest execution
-            await asyncio.sleep(1)  # Simulate processing time
-            
-            # Create mock results
-            results = {
-                "metrics": {
-                    "final_equity": initial_capital * 1.1,  # 10% return
-                    "total_return": 0.1,
-                    "max_drawdown": -0.05,
-                    "sharpe_ratio": 1.2,
-                    "win_rate": 0.6,
-                    "profit_factor": 1.5,
-                    "total_trades": 10
-                },
-                "equity_curve": {
-                    "dates": [start_date, end_date],
-                    "total_equity": [initial_capital, initial_capital * 1.1],
-                    "cash_balance": [initial_capital * 0.1, initial_capital * 0.2],
-                    "invested_capital": [initial_capital * 0.9, initial_capital * 0.9]
-                }
-            }
-            
-            # Update status to completed
-            await redis_client.hset(f"backtest:{backtest_id}", mapping={
-                "status": "completed",
-                "progress": 100
-            })
-        
-        # Save results to database
-        backtest_result_data = {
-            "id": backtest_id,
+        backtest_payload = {
+            "strategy_id": str(strategy_config.get('_id', strategy_config.get('id', ''))),
             "user_id": user_id,
-            "strategy_id": strategy_config['id'],
             "initial_capital": initial_capital,
-            "final_equity": results['metrics']['final_equity'],
-            "total_return": results['metrics']['total_return'],
-            "max_drawdown": results['metrics']['max_drawdown'],
-            "sharpe_ratio": results['metrics']['sharpe_ratio'],
-            "win_rate": results['metrics']['win_rate'],
-            "profit_factor": results['metrics']['profit_factor'],
-            "total_trades": results['metrics']['total_trades'],
-            "equity_curve": results['equity_curve'],
-            "created_at": datetime.utcnow()
+            "start_date": start_date,
+            "end_date": end_date,
+            "timeframe": timeframe,
+            "data_provider": data_provider
         }
-        await db.backtest_results.insert_one(backtest_result_data)
         
-        # Save trades
-        if results['trades']:
-            trades_to_insert = []
-            for trade_data in results['trades']:
-                trade = {
-                    "backtest_id": backtest_id,
-                    "symbol": trade_data['symbol'],
-                    "side": trade_data['side'],
-                    "entry_date": trade_data['entry_date'],
-                    "entry_price": trade_data['entry_price'],
-                    "exit_date": trade_data.get('exit_date'),
-                    "exit_price": trade_data.get('exit_price'),
-                    "quantity": trade_data['quantity'],
-                    "pnl": trade_data['pnl'],
-                    "return_pct": trade_data['return_pct']
-                }
-                trades_to_insert.append(trade)
-            await db.trades.insert_many(trades_to_insert)
+        print(f"Calling backend_services with payload: {backtest_payload}")
         
-        # Update status to completed
-        await redis_client.hset(f"backtest:{backtest_id}", mapping={
-            "status": "completed",
-            "progress": 100
-        })
+        # Non-blocking dispatch through the shared, pooled client; backend_services
+        # runs the backtest and reports results back on its own
+        execution_id = await backtest_services_client.start_backtest(backtest_payload)
+        print(f"Backend services started execution {execution_id} for backtest {backtest_id}")
         
-        # Set expiry for Redis data (24 hours)
-        await redis_client.expire(f"backtest:{backtest_id}", 86400)
+        # Refresh the 24 hour expiry in the same round trip
+        await redis_client.hset(f"backtest:{backtest_id}", mapping={
+            "execution_id": execution_id
+        }, ttl=BACKTEST_KEY_TTL)
         
     except Exception as e:
         # Update status to failed
         await redis_client.hset(f"backtest:{backtest_id}", mapping={
             "status": "failed",
             "error": str(e)
-        })
+        }, ttl=BACKTEST_KEY_TTL)
         # Log error
         print(f"Backtest {backtest_id} failed: {str(e)}")
 
+def _group_key(group_id: str) -> str:
+    return f"backtest_group:{group_id}"
+
+async def run_backtest_batch_async(group_id: str, backtest_ids: List[str], user_id: str, jobs: List[Dict[str, Any]]):
+    """Dispatch a batch to backend_services and record each execution in Redis"""
+    try:
+        batch = await backtest_services_client.start_batch(user_id, jobs)
+        print(f"Backend services started batch {batch['group_id']} for group {group_id}")
+        await redis_client.hset_many({
+            f"backtest:{backtest_id}": {"execution_id": execution_id}
+            for backtest_id, execution_id in zip(backtest_ids, batch["backtest_ids"])
+        }, ttl=BACKTEST_KEY_TTL)
+    except Exception as e:
+        await redis_client.hset_many({
+            f"backtest:{backtest_id}": {"status": "failed", "error": str(e)}
+            for backtest_id in backtest_ids
+        }, ttl=BACKTEST_KEY_TTL)
+        print(f"Backtest group {group_id} failed: {str(e)}")
+
+def _validate_dates(request: BacktestRunRequest) -> None:
+    """Reject a run whose dates are malformed or out of order"""
+    try:
+        start = datetime.strptime(request.start_date, '%Y-%m-%d')
+        end = datetime.strptime(request.end_date, '%Y-%m-%d')
+        if start >= end:
+            raise ValueError("Start date must be before end date")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def _load_strategy_config(
+    request: BacktestRunRequest,
+    current_user: User,
+    db: AsyncIOMotorDatabase
+) -> Dict[str, Any]:
+    """The user's own strategy or default template a run refers to"""
+    strategy_config = await resolve_strategy(db, request.strategy_id, current_user.id)
+    if not strategy_config:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    return strategy_config
+
 @router.post("/run", response_model=BacktestRunResponse)
 async def run_backtest(
     request: BacktestRunRequest,
     background_tasks: BackgroundTasks,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Start a new backtest"""
     # Validate dates
-    try:
-        start = datetime.strptime(request.start_date, '%Y-%m-%d')
-        end = datetime.strptime(request.end_date, '%Y-%m-%d')
-        if start >= end:
-            raise ValueError("Start date must be before end date")
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    _validate_dates(request)
     
     # Load strategy configuration
-    if request.strategy_type == 'default':
-        default_strategies = await get_default_strategies_from_db(db)
-        strategy_config = next((s for s in default_strategies if str(s["_id"]) == request.strategy_id), None)
-        if not strategy_config:
-            raise HTTPException(status_code=404, detail="Default strategy not found")
-    else:
-        # Load user strategy from database
-        print(
-        "current_user: ", current_user.userName, '\n',
-        "type: ", type(current_user), '\n',
-        "current_user_id", current_user.id, '\n',
-        "strategy_id: ", request.strategy_id, '\n',
-        "type_strategy_id", type(request.strategy_id)
-        )
-
-        strategy = await db.strategy.find_one({
-            "_id": ObjectId(str(request.strategy_id))
-        })
-
-        if not strategy:
-            raise HTTPException(status_code=404, detail="Strategy not found")
-        strategy_config = strategy
+    strategy_config = await _load_strategy_config(request, current_user, db)
     
-    if not strategy_config:
-        raise HTTPException(status_code=404, detail="Strategy configuration not found")
+    # Fail fast instead of queueing work while backend_services is down
+    if backtest_services_client.circuits["dispatch"].is_open:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
     
     # Generate backtest ID
     backtest_id = str(uuid.uuid4())
@@ -309,10 +287,84 @@ async def run_backtest(
         message="Backtest started successfully"
     )
 
+@router.post("/batch", response_model=BacktestBatchResponse)
+async def run_backtest_batch(
+    request: BacktestBatchRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user_from_token),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Start several backtests as one group. backend_services fetches the
+    market data for the union of their symbols once per date range and
+    shares the cached bars and indicators between them. Each backtest gets
+    its own id for status and results; the group id gives their aggregate
+    progress.
+    """
+    for job in request.jobs:
+        _validate_dates(job)
+    
+    strategy_configs = [await _load_strategy_config(job, current_user, db) for job in request.jobs]
+    
+    if backtest_services_client.circuits["dispatch"].is_open:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
+    
+    user_id = str(current_user.id)
+    group_id = str(uuid.uuid4())
+    backtest_ids = [str(uuid.uuid4()) for _ in request.jobs]
+    
+    # Recorded before dispatch so the group can be polled straight away
+    records = {
+        f"backtest:{backtest_id}": {
+            "status": "running",
+            "progress": 0,
+            "user_id": user_id,
+            "group_id": group_id
+        }
+        for backtest_id in backtest_ids
+    }
+    records[_group_key(group_id)] = {"user_id": user_id, "backtest_ids": ",".join(backtest_ids)}
+    await redis_client.hset_many(records, ttl=BACKTEST_KEY_TTL)
+    
+    jobs = [
+        {
+            "strategy_id": str(strategy_config.get('_id', strategy_config.get('id', ''))),
+            "initial_capital": job.initial_capital,
+            "start_date": job.start_date,
+            "end_date": job.end_date,
+            "timeframe": job.timeframe,
+            "data_provider": job.data_provider
+        }
+        for job, strategy_config in zip(request.jobs, strategy_configs)
+    ]
+    background_tasks.add_task(run_backtest_batch_async, group_id, backtest_ids, user_id, jobs)
+    
+    return BacktestBatchResponse(
+        group_id=group_id,
+        backtest_ids=backtest_ids,
+        message=f"{len(backtest_ids)} backtests started successfully"
+    )
+
+def _merge_snapshot(data: Dict[str, Any], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Overlay the latest progress published by backend_services"""
+    if not snapshot:
+        return data
+    data = {**data, **snapshot}
+    if snapshot.get('status') == 'failed':
+        data['error'] = snapshot.get('message')
+    return data
+
+def _backtest_status(data: Dict[str, Any]) -> BacktestStatus:
+    return BacktestStatus(
+        status=data.get('status', 'unknown'),
+        progress=int(float(data.get('progress', 0))),
+        error=data.get('error')
+    )
+
 @router.get("/status/{backtest_id}", response_model=BacktestStatus)
 async def get_backtest_status(
     backtest_id: str,
-    current_user: UserInDB = Depends(get_current_user_from_token)
+    current_user: User = Depends(get_current_user_from_token)
 ):
     """Get the status of a running backtest"""
     # Get status from Redis
@@ -325,160 +377,474 @@ async def get_backtest_status(
     if data.get('user_id') != str(current_user.id):
         raise HTTPException(status_code=403, detail="Access denied")
     
-    return BacktestStatus(
-        status=data.get('status', 'unknown'),
-        progress=int(data.get('progress', 0)),
-        error=data.get('error')
+    # Merge the latest progress published by backend_services
+    if data.get('execution_id'):
+        snapshot = await redis_client.hgetall(execution_snapshot_key(data['execution_id']))
+        data = _merge_snapshot(data, snapshot)
+    
+    return _backtest_status(data)
+
+@router.get("/statuses", response_model=Dict[str, Optional[BacktestStatus]])
+async def get_backtest_statuses(
+    ids: List[str] = Query(..., max_length=MAX_STATUS_BATCH),
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Statuses of many backtests for dashboards, in two pipelined Redis round
+    trips however many ids are asked for. Unknown ids and backtests of
+    other users map to null.
+    """
+    return await _owned_statuses(ids, str(current_user.id))
+
+async def _owned_statuses(ids: List[str], user_id: str) -> Dict[str, Optional[BacktestStatus]]:
+    """Statuses of the given backtests that belong to the user, with their latest progress"""
+    rows = await redis_client.hgetall_many([f"backtest:{backtest_id}" for backtest_id in ids])
+    owned = {
+        backtest_id: data for backtest_id, data in zip(ids, rows)
+        if data and data.get('user_id') == user_id
+    }
+    
+    with_execution = [backtest_id for backtest_id, data in owned.items() if data.get('execution_id')]
+    snapshots = await redis_client.hgetall_many(
+        [execution_snapshot_key(owned[backtest_id]['execution_id']) for backtest_id in with_execution]
     )
+    for backtest_id, snapshot in zip(with_execution, snapshots):
+        owned[backtest_id] = _merge_snapshot(owned[backtest_id], snapshot)
+    
+    return {backtest_id: _backtest_status(owned[backtest_id]) if backtest_id in owned else None for backtest_id in ids}
 
-@router.get("/results/{backtest_id}", response_model=BacktestResultResponse)
-async def get_backtest_results(
+@router.get("/group/{group_id}", response_model=BacktestGroupStatus)
+async def get_backtest_group_status(
+    group_id: str,
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """Aggregate progress of a batch, with the status of each of its backtests"""
+    group = await redis_client.hgetall(_group_key(group_id))
+    if not group:
+        raise HTTPException(status_code=404, detail="Backtest group not found")
+    if group.get('user_id') != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    ids = group['backtest_ids'].split(',')
+    # A backtest whose record expired is reported as failed
+    statuses = {
+        backtest_id: status or BacktestStatus(status='failed', progress=0, error='Backtest not found')
+        for backtest_id, status in (await _owned_statuses(ids, str(current_user.id))).items()
+    }
+    
+    counts: Dict[str, int] = {}
+    for status in statuses.values():
+        counts[status.status] = counts.get(status.status, 0) + 1
+    finished = [status for status in statuses.values() if status.status in TERMINAL_STATUSES]
+    
+    if len(finished) < len(ids):
+        group_status = 'running'
+    elif counts.get('completed', 0) == len(ids):
+        group_status = 'completed'
+    elif counts.get('completed', 0):
+        group_status = 'partially_failed'
+    else:
+        group_status = 'failed'
+    
+    return BacktestGroupStatus(
+        group_id=group_id,
+        status=group_status,
+        progress=sum(100 if status.status in TERMINAL_STATUSES else status.progress for status in statuses.values()) // len(ids),
+        total=len(ids),
+        counts=counts,
+        backtests=statuses
+    )
+
+def _progress_event(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a Redis progress snapshot into a stream event"""
+    return {
+        "status": state.get('status', 'unknown'),
+        "progress": int(float(state.get('progress', 0))),
+        "stage": state.get('stage'),
+        "message": state.get('message') or state.get('error'),
+    }
+
+async def _progress_events(request: Request, backtest_id: str, data: Dict[str, Any]):
+    """Server-Sent Events for one backtest until it reaches a terminal status"""
+    # Dispatch runs after the /run response, so the execution id may lag
+    execution_id = data.get('execution_id')
+    waited = 0.0
+    while not execution_id and data.get('status') not in TERMINAL_STATUSES \
+            and waited < STREAM_DISPATCH_TIMEOUT_SECONDS:
+        await asyncio.sleep(0.5)
+        waited += 0.5
+        data = await redis_client.hgetall(f"backtest:{backtest_id}")
+        execution_id = data.get('execution_id')
+        
+    if not execution_id:
+        yield format_sse(_progress_event(data))
+        return
+    
+    if progress_broker.available:
+        # Register before reading the snapshot so no event falls in between
+        with progress_broker.watch(execution_id) as queue:
+            snapshot = await redis_client.hgetall(execution_snapshot_key(execution_id))
+            if snapshot:
+                yield format_sse(_progress_event(snapshot))
+                if snapshot.get('status') in TERMINAL_STATUSES:
+                    return
+                    
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                event.pop('execution_id', None)
+                yield format_sse(event)
+                if event.get('status') in TERMINAL_STATUSES:
+                    return
+    else:
+        # Without Redis pub/sub, poll backend_services for this stream only
+        last_event = None
+        while not await request.is_disconnected():
+            execution = await backtest_services_client.get_status(execution_id)
+            if execution is None:
+                yield format_sse({"status": "unknown", "progress": 0, "message": "Execution not found"})
+                return
+            event = _progress_event(execution)
+            if event != last_event:
+                yield format_sse(event)
+                last_event = event
+            if event['status'] in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+
+@router.get("/stream/{backtest_id}")
+async def stream_backtest_progress(
     backtest_id: str,
-    current_user: UserInDB = Depends(get_current_user_from_token),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    request: Request,
+    current_user: User = Depends(get_current_user_from_token)
 ):
-    """Get the results of a completed backtest"""
-    # Fetch backtest from database
-    backtest = await db.backtest_results.find_one({
-        "id": backtest_id,
-        "user_id": current_user.id
-    })
-    
-    if not backtest:
+    """
+    Stream progress, stage changes and partial equity curve points of a
+    backtest as Server-Sent Events
+    """
+    data = await redis_client.hgetall(f"backtest:{backtest_id}")
+    
+    if not data:
+        raise HTTPException(status_code=404, detail="Backtest not found")
+    
+    # Verify user owns this backtest
+    if data.get('user_id') != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return StreamingResponse(
+        _progress_events(request, backtest_id, data),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _completed_execution(backtest_id: str, current_user: User) -> Dict[str, Any]:
+    """
+    The backend_services execution behind a backtest id, checked for
+    ownership and completion. Accepts either the id returned by /run or the
+    execution id itself.
+    """
+    data = await redis_client.hgetall(f"backtest:{backtest_id}")
+    if data and data.get('user_id') != str(current_user.id):
+        raise HTTPException(status_code=403, detail="Access denied")
+    execution_id = data.get('execution_id') or backtest_id
+    
+    try:
+        execution = await backtest_services_client.get_status(execution_id)
+    except BacktestServicesUnavailable:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
+    
+    if not execution or str(execution.get('user_id')) != str(current_user.id):
         raise HTTPException(status_code=404, detail="Backtest results not found")
+    if execution.get('status') != 'completed' or not execution.get('result'):
+        raise HTTPException(status_code=409, detail=f"Backtest is {execution.get('status', 'unknown')}")
+    return execution
+
+async def _series_rows(execution_id: str, kind: str, **params) -> List[Dict[str, Any]]:
+    try:
+        series = await backtest_services_client.get_series(execution_id, kind, **params)
+    except BacktestServicesUnavailable:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
+    return series["rows"] if series else []
+
+def _trade_detail(trade_id: int, trade: Dict[str, Any]) -> Dict[str, Any]:
+    """A stored trade in the TradeDetail shape, without building the model"""
+    return {
+        "id": trade_id,
+        "symbol": trade['symbol'],
+        "side": 'long',
+        "entry_date": trade['entry_time'],
+        "entry_price": trade['entry_price'],
+        "exit_date": trade.get('exit_time'),
+        "exit_price": trade.get('exit_price'),
+        "quantity": trade['shares'],
+        "pnl": trade['pnl'],
+        "return_pct": trade['pnl_pct']
+    }
+
+async def _fast_backtest_results(backtest_id: str, execution: Dict[str, Any], max_points: Optional[int]) -> StreamingResponse:
+    """
+    The BacktestResultResponse payload built from plain dicts and encoded
+    with orjson. Rows come from our own series store, so they are not
+    validated again; trades are fetched and written a page at a time.
+    """
+    result = execution['result']
+    # Fetch before responding so a failure still yields a proper status code
+    equity = await _series_rows(execution['id'], "equity_curve", max_points=max_points)
+    first_page = await _series_rows(execution['id'], "trades", offset=0, limit=RESULT_STREAM_PAGE_SIZE)
+    winning = [0, 0]
+    
+    async def trade_pages():
+        page, offset = first_page, 0
+        while page:
+            wins = sum(1 for trade in page if trade['pnl'] > 0)
+            winning[0] += wins
+            winning[1] += len(page) - wins
+            yield [_trade_detail(offset + i, trade) for i, trade in enumerate(page)]
+            if len(page) < RESULT_STREAM_PAGE_SIZE:
+                return
+            offset += len(page)
+            page = await _series_rows(execution['id'], "trades", offset=offset, limit=RESULT_STREAM_PAGE_SIZE)
     
-    # Fetch trades
-    trades_cursor = db.trades.find({"backtest_id": backtest_id})
-    trades = await trades_cursor.to_list(length=None)
+    def metrics():
+        return {
+            "initial_capital": result['initial_capital'],
+            "final_equity": result['final_capital'],
+            "total_return": result['total_return'],
+            "total_trades": result['total_trades'],
+            "winning_trades": winning[0],
+            "losing_trades": winning[1],
+            "win_rate": result['win_rate'],
+            "max_drawdown": result['max_drawdown'],
+            "sharpe_ratio": result['sharpe_ratio'],
+            "profit_factor": result['profit_factor']
+        }
     
-    # Get strategy name
-    strategy = await db.strategies.find_one({"id": backtest["strategy_id"]})
-    strategy_name = strategy["name"] if strategy else "Unknown Strategy"
+    return StreamingResponse(stream_object([
+        ("backtest_id", backtest_id),
+        ("strategy_name", execution.get('strategy_name') or "Unknown Strategy"),
+        ("equity_curve", {
+            "dates": [point['timestamp'] for point in equity],
+            "total_equity": [point['value'] for point in equity],
+            "cash_balance": [point['cash'] for point in equity],
+            "invested_capital": [point['value'] - point['cash'] for point in equity]
+        }),
+        ("trades", trade_pages()),
+        # Counted while the trades stream out
+        ("metrics", metrics)
+    ]), media_type="application/json")
+
+def _columnar_format(accept: str) -> Optional[str]:
+    """The columnar format an Accept header prefers over JSON, if any"""
+    ranges = []
+    for i, part in enumerate(accept.split(",")):
+        media, *params = [piece.strip() for piece in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    pass
+        ranges.append((-q, i, media.lower()))
+    for _, _, media in sorted(ranges):
+        if media in COLUMNAR_MEDIA_TYPES:
+            return COLUMNAR_MEDIA_TYPES[media]
+        if media in ("application/json", "application/*", "*/*"):
+            return None
+    return None
+
+async def _columnar_results(
+    backtest_id: str, execution: Dict[str, Any], fmt: str, series: str, symbol: Optional[str]
+) -> StreamingResponse:
+    """One result series streamed from storage as Arrow IPC or Parquet"""
+    if series == "bars" and not symbol:
+        raise HTTPException(status_code=400, detail="symbol is required to export bars")
+    try:
+        upstream = await backtest_services_client.open_export(execution['id'], series, fmt, symbol)
+    except BacktestServicesUnavailable:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
+    if upstream is None:
+        raise HTTPException(status_code=404, detail=f"No {series} data for this backtest")
+    
+    name = f"{backtest_id}-{series}" + (f"-{symbol.upper()}" if series == "bars" else "")
+    media_type = next(media for media, value in COLUMNAR_MEDIA_TYPES.items() if value == fmt)
+    return StreamingResponse(
+        upstream.aiter_raw(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"', "Vary": "Accept"},
+        background=BackgroundTask(upstream.aclose)
+    )
+
+@router.get("/results/{backtest_id}", response_model=BacktestResultResponse)
+async def get_backtest_results(
+    backtest_id: str,
+    request: Request,
+    max_points: Optional[int] = Query(
+        None, ge=3, description="Downsample the equity curve to at most this many points (LTTB)"
+    ),
+    fast: bool = Query(
+        False, description="Skip response models and stream orjson-encoded JSON; timestamps keep their stored ISO form"
+    ),
+    series: str = Query(
+        "trades", pattern="^(trades|equity_curve|bars)$",
+        description="Series to export when Arrow or Parquet is negotiated"
+    ),
+    symbol: Optional[str] = Query(None, description="Symbol whose bars to export with series=bars"),
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """
+    Get the results of a completed backtest
+
+    JSON by default. With Accept: application/vnd.apache.arrow.stream or
+    application/vnd.apache.parquet, one series (trades, equity_curve, or the
+    bars, indicators and entry/exit signals of one symbol) is streamed as
+    columnar data instead.
+    """
+    execution = await _completed_execution(backtest_id, current_user)
+    fmt = _columnar_format(request.headers.get("accept", ""))
+    if fmt:
+        return await _columnar_results(backtest_id, execution, fmt, series, symbol)
+    if fast:
+        return await _fast_backtest_results(backtest_id, execution, max_points)
+    result = execution['result']
+    
+    # Trades and the equity curve are stored apart from the result document
+    equity = await _series_rows(execution['id'], "equity_curve", max_points=max_points)
+    trades = await _series_rows(execution['id'], "trades")
     
     # Format response
     return BacktestResultResponse(
         backtest_id=backtest_id,
-        strategy_name=strategy_name,
+        strategy_name=execution.get('strategy_name') or "Unknown Strategy",
         equity_curve=EquityCurve(
-            dates=backtest.equity_curve['dates'],
-            total_equity=backtest.equity_curve['total_equity'],
-            cash_balance=backtest.equity_curve['cash_balance'],
-            invested_capital=backtest.equity_curve['invested_capital']
+            dates=[point['timestamp'] for point in equity],
+            total_equity=[point['value'] for point in equity],
+            cash_balance=[point['cash'] for point in equity],
+            invested_capital=[point['value'] - point['cash'] for point in equity]
         ),
         trades=[
             TradeDetail(
-                id=trade.id,
-                symbol=trade.symbol,
-                side=trade.side,
-                entry_date=trade.entry_date,
-                entry_price=trade.entry_price,
-                exit_date=trade.exit_date,
-                exit_price=trade.exit_price,
-                quantity=trade.quantity,
-                pnl=trade.pnl,
-                return_pct=trade.return_pct
-            ) for trade in trades
+                id=i,
+                symbol=trade['symbol'],
+                side='long',
+                entry_date=trade['entry_time'],
+                entry_price=trade['entry_price'],
+                exit_date=trade.get('exit_time'),
+                exit_price=trade.get('exit_price'),
+                quantity=trade['shares'],
+                pnl=trade['pnl'],
+                return_pct=trade['pnl_pct']
+            ) for i, trade in enumerate(trades)
         ],
         metrics=BacktestMetrics(
-            initial_capital=backtest.initial_capital,
-            final_equity=backtest.final_equity,
-            total_return=backtest.total_return,
-            total_trades=backtest.total_trades,
-            winning_trades=len([t for t in trades if t.pnl > 0]),
-            losing_trades=len([t for t in trades if t.pnl <= 0]),
-            win_rate=backtest.win_rate,
-            max_drawdown=backtest.max_drawdown,
-            sharpe_ratio=backtest.sharpe_ratio,
-            profit_factor=backtest.profit_factor
+            initial_capital=result['initial_capital'],
+            final_equity=result['final_capital'],
+            total_return=result['total_return'],
+            total_trades=result['total_trades'],
+            winning_trades=len([t for t in trades if t['pnl'] > 0]),
+            losing_trades=len([t for t in trades if t['pnl'] <= 0]),
+            win_rate=result['win_rate'],
+            max_drawdown=result['max_drawdown'],
+            sharpe_ratio=result['sharpe_ratio'],
+            profit_factor=result['profit_factor']
         )
     )
 
+@router.get("/results/{backtest_id}/series/{kind}")
+async def get_backtest_series(
+    backtest_id: str,
+    kind: str,
+    start: Optional[datetime] = Query(None, description="Inclusive lower bound on the series time"),
+    end: Optional[datetime] = Query(None, description="Inclusive upper bound on the series time"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    max_points: Optional[int] = Query(None, ge=3, description="LTTB-downsample the equity curve"),
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """Range read of a result series (trades or equity_curve)"""
+    if kind not in ("trades", "equity_curve"):
+        raise HTTPException(status_code=404, detail=f"Unknown series: {kind}")
+    execution = await _completed_execution(backtest_id, current_user)
+    try:
+        series = await backtest_services_client.get_series(
+            execution['id'], kind,
+            start=start.isoformat() if start else None,
+            end=end.isoformat() if end else None,
+            offset=offset,
+            limit=limit,
+            max_points=max_points
+        )
+    except BacktestServicesUnavailable:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
+    if series is None:
+        raise HTTPException(status_code=404, detail="Series not found")
+    return {**series, "backtest_id": backtest_id}
+
+def _trade_bars(rows: List[Dict[str, Any]], signal_time: Optional[str]) -> List[TradeDetailsData]:
+    """Cached bars as response rows; the bar of the fill is flagged as the signal"""
+    signal = datetime.fromisoformat(signal_time) if signal_time else None
+    return [
+        TradeDetailsData(
+            date=row['timestamp'],
+            open=row['open'],
+            high=row['high'],
+            low=row['low'],
+            close=row['close'],
+            volume=int(row.get('volume') or 0),
+            indicators={
+                name: value for name, value in row.items()
+                if name not in TRADE_BAR_FIELDS and value is not None and not math.isnan(value)
+            },
+            is_signal=datetime.fromisoformat(row['timestamp']) == signal
+        ) for row in rows
+    ]
+
 @router.get("/trade-details/{backtest_id}/{trade_id}", response_model=TradeDetailsResponse)
 async def get_trade_details(
     backtest_id: str,
     trade_id: int,
-    current_user: UserInDB = Depends(get_current_user_from_token),
-    db: AsyncIOMotorDatabase = Depends(get_db)
+    bars: int = Query(20, ge=1, le=500, description="Bars to include either side of entry and exit"),
+    current_user: User = Depends(get_current_user_from_token)
 ):
     """Get detailed OHLCV and indicator data for a specific trade"""
-    # Verify backtest ownership
-    backtest = await db.backtest_results.find_one({
-        "id": backtest_id,
-        "user_id": current_user.id
-    })
-    
-    if not backtest:
-        raise HTTPException(status_code=404, detail="Backtest not found")
+    execution = await _completed_execution(backtest_id, current_user)
     
-    # Get trade
-    trade = await db.trades.find_one({
-        "id": trade_id,
-        "backtest_id": backtest_id
-    })
+    # Bars come from the bar cache backend_services kept for this run
+    try:
+        context = await backtest_services_client.get_trade_context(execution['id'], trade_id, bars)
+    except BacktestServicesUnavailable:
+        raise HTTPException(status_code=503, detail="Backtest service is temporarily unavailable")
     
-    if not trade:
+    if not context:
         raise HTTPException(status_code=404, detail="Trade not found")
+    if context['entry_bars'] is None:
+        raise HTTPException(status_code=404, detail="Market data for this backtest is no longer cached")
     
-    # Get strategy configuration
-    strategy = await db.strategies.find_one({"id": backtest["strategy_id"]})
-    if not strategy:
-        raise HTTPException(status_code=404, detail="Strategy not found")
-    
-    # Initialize mock data provider for now (replace with actual implementation later)
-    # This is a placeholder - in a real implementation you'd fetch actual market data
-    
-    # For now, return mock trade details since data provider isn't implemented
-    # TODO: Implement actual market data fetching and indicator calculations
-    
-    entry_data = [
-        TradeDetailsData(
-            date=trade.entry_date,
-            open=trade.entry_price * 0.99,
-            high=trade.entry_price * 1.01,
-            low=trade.entry_price * 0.98,
-            close=trade.entry_price,
-            volume=1000000,
-            indicators={"RSI": 50.0, "SMA": trade.entry_price},
-            is_signal=True
-        )
-    ]
-    
-    exit_data = None
-    if trade.exit_date and trade.exit_price:
-        exit_data = [
-            TradeDetailsData(
-                date=trade.exit_date,
-                open=trade.exit_price * 0.99,
-                high=trade.exit_price * 1.01,
-                low=trade.exit_price * 0.98,
-                close=trade.exit_price,
-                volume=1000000,
-                indicators={"RSI": 60.0, "SMA": trade.exit_price},
-                is_signal=True
-            )
-        ]
-    
+    trade = context['trade']
     return TradeDetailsResponse(
         trade=TradeDetail(
-            id=trade.id,
-            symbol=trade.symbol,
-            side=trade.side,
-            entry_date=trade.entry_date,
-            entry_price=trade.entry_price,
-            exit_date=trade.exit_date,
-            exit_price=trade.exit_price,
-            quantity=trade.quantity,
-            pnl=trade.pnl,
-            return_pct=trade.return_pct
+            id=trade_id,
+            symbol=trade['symbol'],
+            side='long',
+            entry_date=trade['entry_time'],
+            entry_price=trade['entry_price'],
+            exit_date=trade.get('exit_time'),
+            exit_price=trade.get('exit_price'),
+            quantity=trade['shares'],
+            pnl=trade['pnl'],
+            return_pct=trade['pnl_pct']
         ),
-        entry_data=entry_data,
-        exit_data=exit_data
+        entry_data=_trade_bars(context['entry_bars'], trade['entry_time']),
+        exit_data=_trade_bars(context['exit_bars'], trade.get('exit_time')) if context['exit_bars'] is not None else None
     )
 
 @router.post("/deploy", response_model=DeployResponse)
 async def deploy_strategy(
     request: DeployRequest,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Deploy a strategy to live or paper trading"""
@@ -493,7 +859,7 @@ async def deploy_strategy(
         # Load user strategy
         strategy = await db.strategies.find_one({
             "id": request.strategy_id.replace('user_', ''),
-            "user_id": current_user.id
+            "user_id": canonical_user_id(current_user.id)
         })
         if not strategy:
             raise HTTPException(status_code=404, detail="Strategy not found")
@@ -536,70 +902,84 @@ async def deploy_strategy(
 # Additional routes for data providers
 @router.get("/user/data-providers")
 async def get_user_data_providers(
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Get available data providers for the current user"""
     providers = ['yahoo']  # Yahoo is always available
     
-    # Check for configured API keys
-    user_config = await db.user_configs.find_one({
-        "user_id": current_user.id
-    })
+    # Check for configured API keys; an undecryptable secret counts as missing
+    credentials = await provider_credentials.get(db, current_user.id)
     
-    if user_config:
-        if user_config.get("alpaca_api_key") and user_config.get("alpaca_secret_key"):
-            providers.append('alpaca')
-        if user_config.get("polygon_api_key"):
-            providers.append('polygon')
+    if any(credentials.get(f"alpaca_{mode}_api_key") and credentials.get(f"alpaca_{mode}_secret_key") for mode in ("paper", "live")):
+        providers.append('alpaca')
+    if credentials.get("polygon_secret_key"):
+        providers.append('polygon')
     
     return {"providers": providers}
 
 # This should be the primary endpoint for fetching all backtests for the logged-in user
+async def _backtest_summary_page(
+    request: Request,
+    response: Response,
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    limit: int,
+    cursor: Optional[str]
+) -> List[BacktestSummary]:
+    """
+    One page of the user's backtests. The body stays a plain list; the next
+    page is advertised in the X-Next-Cursor and Link headers.
+    """
+    try:
+        backtests, next_cursor = await list_backtest_summaries(db, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    
+    summaries = []
+    for backtest in backtests:
+        # Runs that have not completed have no result yet
+        result = backtest.get("result") or {}
+        params = backtest.get("params") or {}
+        summaries.append(BacktestSummary(
+            id=backtest["id"],
+            strategy_id=str(backtest.get("strategy_id", "")),
+            strategy_name=backtest.get("strategy_name", ""),
+            status=backtest.get("status", "unknown"),
+            total_return=result.get("total_return", 0),
+            sharpe_ratio=result.get("sharpe_ratio", 0),
+            max_drawdown=result.get("max_drawdown", 0),
+            total_trades=result.get("total_trades", 0),
+            start_date=params.get("start_date", ""),
+            end_date=params.get("end_date", ""),
+            created_at=backtest["start_time"]
+        ))
+    return summaries
+
 @router.get("/", response_model=List[BacktestSummary])
 async def get_user_backtests_root(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
     db: AsyncIOMotorDatabase = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user_from_token)
+    current_user: User = Depends(get_current_user_from_token)
 ):
     """Get backtests for the current user (root endpoint)"""
-    backtests_cursor = db.backtest_results.find({"user_id": current_user.id})
-    backtests = await backtests_cursor.to_list(length=None)
-    
-    return [
-        BacktestSummary(
-            id=str(backtest["_id"]),
-            strategy_id=str(backtest.get("strategy_id", "")),
-            strategy_name=backtest.get("strategy_name", ""),
-            total_return=backtest.get("total_return", 0),
-            sharpe_ratio=backtest.get("sharpe_ratio", 0),
-            max_drawdown=backtest.get("max_drawdown", 0),
-            total_trades=backtest.get("total_trades", 0),
-            start_date=backtest.get("start_date", ""),
-            end_date=backtest.get("end_date", ""),
-            created_at=backtest.get("created_at", datetime.utcnow())
-        ) for backtest in backtests
-    ]
+    return await _backtest_summary_page(request, response, db, current_user.id, limit, cursor)
 
 @router.get("/user", response_model=List[BacktestSummary])
 async def get_user_backtests(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value of the previous page"),
     db: AsyncIOMotorDatabase = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user_from_token)
+    current_user: User = Depends(get_current_user_from_token)
 ):
     """Get backtests for the current user (user endpoint for frontend compatibility)"""
-    backtests_cursor = db.backtest_results.find({"user_id": current_user.id})
-    backtests = await backtests_cursor.to_list(length=None)
-    
-    return [
-        BacktestSummary(
-            id=str(backtest["_id"]),
-            strategy_id=str(backtest.get("strategy_id", "")),
-            strategy_name=backtest.get("strategy_name", ""),
-            total_return=backtest.get("total_return", 0),
-            sharpe_ratio=backtest.get("sharpe_ratio", 0),
-            max_drawdown=backtest.get("max_drawdown", 0),
-            total_trades=backtest.get("total_trades", 0),
-            start_date=backtest.get("start_date", ""),
-            end_date=backtest.get("end_date", ""),
-            created_at=backtest.get("created_at", datetime.utcnow())
-        ) for backtest in backtests
-    ]
\ No newline at end of file
+    return await _backtest_summary_page(request, response, db, current_user.id, limit, cursor)
\ No newline at end of file
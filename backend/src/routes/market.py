@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from ..dependencies import get_current_user_from_token
+from ..models.user import User
+from ..services.backtest.services_client import BacktestServicesRejected, BacktestServicesUnavailable
+from ..services.quote_cache import quote_cache
+
+router = APIRouter()
+
+# Most symbols accepted by one batch quote request
+MAX_QUOTE_SYMBOLS = 100
+
+
+@router.get("/quote/{symbol}")
+async def get_quote(
+    symbol: str,
+    provider: str = "yahoo",
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """Latest quote for a symbol, served from the shared quote cache"""
+    try:
+        quote = await quote_cache.get(symbol, provider)
+    except BacktestServicesRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except BacktestServicesUnavailable:
+        raise HTTPException(status_code=503, detail="Market data is temporarily unavailable")
+    if not quote:
+        raise HTTPException(status_code=404, detail="Quote not found")
+    return quote
+
+
+@router.get("/quotes", response_model=Dict[str, Optional[Dict[str, Any]]])
+async def get_quotes(
+    symbols: List[str] = Query(..., max_length=MAX_QUOTE_SYMBOLS),
+    provider: str = "yahoo",
+    current_user: User = Depends(get_current_user_from_token)
+):
+    """Latest quotes for many symbols; symbols that could not be quoted map to null"""
+    symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    quotes = await asyncio.gather(*(quote_cache.get(symbol, provider) for symbol in symbols), return_exceptions=True)
+    return {
+        symbol: None if isinstance(quote, Exception) else quote
+        for symbol, quote in zip(symbols, quotes)
+    }
@@ -1,18 +1,18 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, BackgroundTasks
+from fastapi.encoders import jsonable_encoder
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
 
 from ..dependencies import get_db, get_current_user_from_token
-from ..models.user import UserInDB
+from ..models.user import User
 from ..models.strategy import (
     Strategy,
     StrategyCreate,
     StrategyUpdate,
     StrategyResponse,
     BacktestParams,
-    BacktestResponse,
-    BacktestResult
+    BacktestResponse
 )
 from ..crud.strategy import (
     get_strategies_by_user_id,
@@ -27,8 +27,9 @@ from ..crud.strategy import (
     delete_backtest_results_by_strategy,
     get_default_strategies_from_db
 )
-from ..services.default_strategies import get_default_strategies_from_db
+from ..services.default_strategies import default_strategies_cache, get_default_strategies_from_db
 from ..utils.mongo_helpers import PyObjectId
+from ..database.user_ids import canonical_user_id
 
 router = APIRouter()
 
@@ -47,30 +48,34 @@ def strategy_to_response(strategy: Strategy) -> StrategyResponse:
         updated_at=strategy.updated_at
     )
 
-def backtest_result_to_response(backtest_result: BacktestResult) -> BacktestResponse:
-    """Convert BacktestResult model to response model"""
+def backtest_result_to_response(execution: Dict[str, Any]) -> BacktestResponse:
+    """
+    Convert a completed backtest execution to the response model. Trades
+    and the equity curve are left empty; /api/backtest/results serves them.
+    """
+    result = execution["result"]
     return BacktestResponse(
-        id=str(backtest_result.id),
-        strategy_id=str(backtest_result.strategy_id),
-        total_return=backtest_result.total_return,
-        sharpe_ratio=backtest_result.sharpe_ratio,
-        max_drawdown=backtest_result.max_drawdown,
-        win_rate=backtest_result.win_rate,
-        total_trades=backtest_result.total_trades,
-        profit_factor=backtest_result.profit_factor,
-        initial_capital=backtest_result.initial_capital,
-        final_capital=backtest_result.final_capital,
-        start_date=backtest_result.start_date,
-        end_date=backtest_result.end_date,
-        timeframe=backtest_result.timeframe,
-        trades=backtest_result.trades,
-        equity_curve=backtest_result.equity_curve,
-        created_at=backtest_result.created_at
+        id=execution["id"],
+        strategy_id=execution["strategy_id"],
+        total_return=result["total_return"],
+        sharpe_ratio=result["sharpe_ratio"],
+        max_drawdown=result["max_drawdown"],
+        win_rate=result["win_rate"],
+        total_trades=result["total_trades"],
+        profit_factor=result["profit_factor"],
+        initial_capital=result["initial_capital"],
+        final_capital=result["final_capital"],
+        start_date=result["start_date"],
+        end_date=result["end_date"],
+        timeframe=result["timeframe"],
+        trades=[],
+        equity_curve=[],
+        created_at=execution["start_time"]
     )
 
 @router.get("/user_strategies", response_model=List[StrategyResponse])
 async def get_user_strategies(
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Get all strategies for the current user"""
@@ -78,10 +83,7 @@ async def get_user_strategies(
         print(f"DEBUG: Fetching strategies for user_id: {current_user.id}")
         print(f"DEBUG: User email: {current_user.email}")
         
-        if type(current_user.id) == str:
-            strategies = await get_strategies_by_user_id(db, ObjectId(current_user.id))
-        else:
-            strategies = await get_strategies_by_user_id(db, current_user.id)
+        strategies = await get_strategies_by_user_id(db, current_user.id)
         print(f"DEBUG: Found {len(strategies)} strategies in database for user {current_user.id}")
         for strategy in strategies:
             print(f"DEBUG: Strategy - ID: {strategy.id}, Name: {strategy.name}, User ID: {strategy.user_id}")
@@ -97,10 +99,25 @@ async def get_user_strategies(
             detail=f"Failed to fetch strategies: {str(e)}"
         )
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match compares weakly, and * matches any current representation"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+async def _cached_defaults(request: Request, name: str, build: Callable[[], Awaitable[Any]]) -> Response:
+    """A cached default strategies response, or 304 if the client's copy is current"""
+    etag, body = await default_strategies_cache.get(name, build)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/default", response_model=List[StrategyCreate])
-async def get_default_strategies_endpoint(db: AsyncIOMotorDatabase = Depends(get_db)):
+async def get_default_strategies_endpoint(request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get default strategies from database collection"""
-    try:
+    async def build():
         strategy_docs = await get_default_strategies_from_db(db)
         
         # Convert raw documents to StrategyCreate format for response
@@ -129,7 +146,10 @@ async def get_default_strategies_endpoint(db: AsyncIOMotorDatabase = Depends(get
                 description=doc.get("description", ""),
                 config=config_data
             ))
-        return strategy_creates
+        return jsonable_encoder(strategy_creates)
+    
+    try:
+        return await _cached_defaults(request, "default", build)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -139,9 +159,9 @@ async def get_default_strategies_endpoint(db: AsyncIOMotorDatabase = Depends(get
 # ...existing code...
 
 @router.get("/defaults/with-ids", response_model=List[dict])
-async def get_default_strategies_with_ids(db: AsyncIOMotorDatabase = Depends(get_db)):
+async def get_default_strategies_with_ids(request: Request, db: AsyncIOMotorDatabase = Depends(get_db)):
     """Get default strategies with IDs for backtest selection"""
-    try:
+    async def build():
         default_strategies_collection = db["default_strategies"]
         strategies = []
         
@@ -155,6 +175,9 @@ async def get_default_strategies_with_ids(db: AsyncIOMotorDatabase = Depends(get
             })
         
         return strategies
+    
+    try:
+        return await _cached_defaults(request, "defaults_with_ids", build)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -164,7 +187,7 @@ async def get_default_strategies_with_ids(db: AsyncIOMotorDatabase = Depends(get
 @router.get("/{strategy_id}", response_model=StrategyResponse)
 async def get_strategy(
     strategy_id: str,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Get a specific strategy by ID"""
@@ -188,7 +211,7 @@ async def get_strategy(
 @router.post("/", response_model=StrategyResponse)
 async def create_new_strategy(
     strategy_data: StrategyCreate,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Create a new strategy"""
@@ -205,7 +228,7 @@ async def create_new_strategy(
 async def update_existing_strategy(
     strategy_id: str,
     strategy_update: StrategyUpdate,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Update an existing strategy"""
@@ -229,7 +252,7 @@ async def update_existing_strategy(
 @router.delete("/{strategy_id}")
 async def delete_existing_strategy(
     strategy_id: str,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Delete a strategy and its associated backtest results"""
@@ -266,7 +289,7 @@ async def delete_existing_strategy(
 async def toggle_strategy_trading(
     strategy_id: str,
     toggle_data: dict,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Toggle strategy active/inactive status"""
@@ -294,17 +317,21 @@ async def run_backtest_task(
     db: AsyncIOMotorDatabase,
     strategy: Strategy,
     params: BacktestParams,
-    user_id: str
+    user_id: Union[str, ObjectId]
 ):
     """Background task to run backtest via backend_services"""
     try:
-        from ..services.backtest_client import BacktestServiceClient
-        
-        # Create client for backend_services
-        backtest_client = BacktestServiceClient()
+        from ..services.backtest.services_client import backtest_services_client
         
-        # Start backtest on backend_services
-        execution_id = await backtest_client.start_backtest(strategy, params, user_id)
+        # Start backtest on backend_services through the shared client
+        execution_id = await backtest_services_client.start_backtest({
+            "strategy_id": str(strategy.id),
+            "user_id": str(canonical_user_id(user_id)),
+            "initial_capital": params.initial_capital,
+            "start_date": params.start_date,
+            "end_date": params.end_date,
+            "timeframe": params.timeframe
+        })
         
         if execution_id:
             print(f"Backtest started on backend_services with execution ID: {execution_id}")
@@ -319,7 +346,7 @@ async def start_backtest(
     strategy_id: str,
     backtest_params: BacktestParams,
     background_tasks: BackgroundTasks,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Start a backtest for a strategy"""
@@ -351,7 +378,7 @@ async def start_backtest(
 @router.get("/{strategy_id}/backtest", response_model=List[BacktestResponse])
 async def get_strategy_backtest_results(
     strategy_id: str,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Get all backtest results for a strategy"""
@@ -371,20 +398,19 @@ async def get_strategy_backtest_results(
             detail="Strategy not found"
         )
     
-    backtest_results = await get_backtest_results_by_strategy(db, strategy_obj_id)
+    backtest_results = await get_backtest_results_by_strategy(db, strategy_obj_id, current_user.id)
     return [backtest_result_to_response(result) for result in backtest_results]
 
 @router.get("/{strategy_id}/backtest/{backtest_id}", response_model=BacktestResponse)
 async def get_specific_backtest_result(
     strategy_id: str,
     backtest_id: str,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Get a specific backtest result"""
     try:
         strategy_obj_id = PyObjectId(strategy_id)
-        backtest_obj_id = PyObjectId(backtest_id)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -399,8 +425,8 @@ async def get_specific_backtest_result(
             detail="Strategy not found"
         )
     
-    backtest_result = await get_backtest_result_by_id(db, backtest_obj_id)
-    if not backtest_result or backtest_result.strategy_id != strategy_obj_id:
+    backtest_result = await get_backtest_result_by_id(db, backtest_id, strategy_obj_id, current_user.id)
+    if not backtest_result:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Backtest result not found"
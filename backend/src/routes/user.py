@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pymongo.database import Database
 from ..dependencies import get_db, get_current_user_from_token
-from ..models.user import UserInDB, UserUpdate, UserProfile
+from ..models.user import User, UserUpdate, UserProfile
 from ..crud.user import update_user, get_user_by_mongodb_id
 from bson import ObjectId
 
@@ -9,7 +9,7 @@ router = APIRouter()
 
 @router.get("/me", response_model=UserProfile)
 async def get_current_user_profile(
-    current_user: UserInDB = Depends(get_current_user_from_token)
+    current_user: User = Depends(get_current_user_from_token)
 ):
     """Get current user's profile"""
     return UserProfile(**current_user.model_dump())
@@ -17,7 +17,7 @@ async def get_current_user_profile(
 @router.put("/me", response_model=UserProfile)
 async def update_current_user_profile(
     user_update: UserUpdate,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: Database = Depends(get_db)
 ):
     """Update current user's profile"""
@@ -36,7 +36,7 @@ async def update_current_user_profile(
 async def get_user_profile(
     user_id: str,
     db: Database = Depends(get_db),
-    current_user: UserInDB = Depends(get_current_user_from_token)
+    current_user: User = Depends(get_current_user_from_token)
 ):
     """Get any user's profile by ID (for viewing other users)"""
     try:
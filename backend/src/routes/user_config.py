@@ -5,7 +5,9 @@ from bson import ObjectId
 from datetime import datetime, timezone
 
 from ..dependencies import get_db, get_current_user_from_token
-from ..models.user import UserInDB
+from ..database.user_ids import canonical_user_id
+from ..models.user import User
+from ..services.provider_credentials import provider_credentials
 from ..models.user_config import (
     UserConfigBase,
     UserConfigCreate,
@@ -19,13 +21,13 @@ router = APIRouter()
 
 @router.get("/", response_model=Optional[UserConfigResponse])
 async def get_user_config(
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Get user configuration"""
     try:
         # Find user config by user_id
-        config_doc = await db.user_config.find_one({"user_id": str(current_user.id)})
+        config_doc = await db.user_config.find_one({"user_id": canonical_user_id(current_user.id)})
         
         if not config_doc:
             return None
@@ -35,14 +37,7 @@ async def get_user_config(
         config_doc["user_id"] = str(config_doc["user_id"])
         
         # Decrypt sensitive values
-        if config_doc.get("alpaca_paper_secret_key"):
-            config_doc["alpaca_paper_secret_key"] = ConfigEncryption.decrypt_value(config_doc["alpaca_paper_secret_key"])
-        if config_doc.get("alpaca_live_secret_key"):
-            config_doc["alpaca_live_secret_key"] = ConfigEncryption.decrypt_value(config_doc["alpaca_live_secret_key"])
-        if config_doc.get("polygon_secret_key"):
-            config_doc["polygon_secret_key"] = ConfigEncryption.decrypt_value(config_doc["polygon_secret_key"])
-        
-        return UserConfigResponse(**config_doc)
+        return UserConfigResponse(**ConfigEncryption.decrypt_fields(config_doc))
         
     except Exception as e:
         raise HTTPException(
@@ -53,7 +48,7 @@ async def get_user_config(
 @router.post("/alpaca")
 async def save_alpaca_config(
     config_data: dict,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Save Alpaca configuration (paper or live)"""
@@ -85,16 +80,17 @@ async def save_alpaca_config(
         
         # Upsert the configuration to user_config collection
         result = await db.user_config.update_one(
-            {"user_id": str(current_user.id)},
+            {"user_id": canonical_user_id(current_user.id)},
             {
                 "$set": update_data,
                 "$setOnInsert": {
-                    "user_id": str(current_user.id),
+                    "user_id": canonical_user_id(current_user.id),
                     "created_at": datetime.now(timezone.utc)
                 }
             },
             upsert=True
         )
+        provider_credentials.invalidate(current_user.id)
         
         return {"message": "Alpaca configuration saved successfully"}
         
@@ -107,7 +103,7 @@ async def save_alpaca_config(
 @router.post("/polygon")
 async def save_polygon_config(
     config_data: dict,
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Save Polygon configuration"""
@@ -124,16 +120,17 @@ async def save_polygon_config(
         
         # Upsert the configuration
         result = await db.user_config.update_one(
-            {"user_id": str(current_user.id)},
+            {"user_id": canonical_user_id(current_user.id)},
             {
                 "$set": update_data,
                 "$setOnInsert": {
-                    "user_id": str(current_user.id),
+                    "user_id": canonical_user_id(current_user.id),
                     "created_at": datetime.now(timezone.utc)
                 }
             },
             upsert=True
         )
+        provider_credentials.invalidate(current_user.id)
         
         return {"message": "Polygon configuration saved successfully"}
         
@@ -145,14 +142,14 @@ async def save_polygon_config(
 
 @router.delete("/alpaca")
 async def delete_alpaca_config(
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Delete Alpaca configuration"""
     try:
         # Remove Alpaca-related fields
         result = await db.user_config.update_one(
-            {"user_id": str(current_user.id)},
+            {"user_id": canonical_user_id(current_user.id)},
             {
                 "$unset": {
                     "alpaca_paper_api_key": "",
@@ -167,6 +164,7 @@ async def delete_alpaca_config(
                 }
             }
         )
+        provider_credentials.invalidate(current_user.id)
         
         return {"message": "Alpaca configuration deleted successfully"}
         
@@ -178,14 +176,14 @@ async def delete_alpaca_config(
 
 @router.delete("/polygon")
 async def delete_polygon_config(
-    current_user: UserInDB = Depends(get_current_user_from_token),
+    current_user: User = Depends(get_current_user_from_token),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """Delete Polygon configuration"""
     try:
         # Remove Polygon-related fields
         result = await db.user_config.update_one(
-            {"user_id": str(current_user.id)},
+            {"user_id": canonical_user_id(current_user.id)},
             {
                 "$unset": {
                     "polygon_api_key_name": "",
@@ -196,6 +194,7 @@ async def delete_polygon_config(
                 }
             }
         )
+        provider_credentials.invalidate(current_user.id)
         
         return {"message": "Polygon configuration deleted successfully"}
         
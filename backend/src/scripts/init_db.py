@@ -10,6 +10,8 @@ src_path = Path(__file__).parent.parent
 sys.path.insert(0, str(src_path))
 
 from database.client import db_client
+from database.indexes import index_manager
+from database.user_ids import migrate_user_ids
 from services.default_strategies import get_default_strategies
 from models.strategy import Strategy
 from utils.mongo_helpers import PyObjectId
@@ -83,6 +85,18 @@ async def initialize_database():
         collections = await db.list_collection_names()
         logger.info(f"Existing collections: {collections}")
         
+        # Store every user_id as an ObjectId before indexing it
+        migration = await migrate_user_ids(db)
+        logger.info(f"user_id migration: {migration}")
+        
+        # Create the indexes behind the hot queries
+        report = await index_manager.bootstrap(db)
+        logger.info(f"Indexes: {report['indexes']}")
+        for collection, error in report["errors"].items():
+            logger.error(f"Index creation failed on '{collection}': {error}")
+        if report["collscans"]:
+            logger.warning(f"Hot queries still using a COLLSCAN: {report['collscans']}")
+        
         # Initialize default strategies collection
         logger.info("Initializing default strategies collection...")
         await initialize_default_strategies_collection()
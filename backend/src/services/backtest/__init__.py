@@ -1,3 +1,15 @@
 from .backtest_client import BacktestEngine
+from .services_client import (
+    BacktestServicesClient,
+    BacktestServicesUnavailable,
+    CircuitBreaker,
+    backtest_services_client,
+)
 
-__all__ = ["BacktestEngine"]
+__all__ = [
+    "BacktestEngine",
+    "BacktestServicesClient",
+    "BacktestServicesUnavailable",
+    "CircuitBreaker",
+    "backtest_services_client",
+]
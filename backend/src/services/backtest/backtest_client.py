@@ -3,9 +3,9 @@ import asyncio
 from typing import Dict, Any
 import logging
 from datetime import datetime
-import os
 
 from ...models.strategy import BacktestParams, BacktestResult
+from .services_client import BacktestServicesUnavailable, backtest_services_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +15,9 @@ class BacktestEngine:
     """
     
     def __init__(self):
-        # Get the backend_services URL from environment or use default
-        self.backend_services_url = os.getenv("BACKEND_SERVICES_URL", "http://backend_services:8001")
-        print(f"BacktestEngine initialized with backend_services_url: {self.backend_services_url}")
+        # Requests share the lifespan-managed, pooled backend_services client
+        self.client = backtest_services_client
+        print(f"BacktestEngine initialized with backend_services_url: {self.client.base_url}")
         
     async def run_backtest(
         self, 
@@ -45,37 +45,38 @@ class BacktestEngine:
                 "params": params.model_dump(mode="json")
             }
             
-            async with httpx.AsyncClient(timeout=300.0) as client:  # 5 minute timeout for backtests
-                response = await client.post(
-                    f"{self.backend_services_url}/api/v1/backtest/run",
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                result_data = response.json()
-                
-                # Convert the response back to a BacktestResult object
-                result = BacktestResult(
-                    strategy_id=result_data.get("strategy_id"),
-                    total_return=result_data.get("total_return", 0.0),
-                    sharpe_ratio=result_data.get("sharpe_ratio", 0.0),
-                    max_drawdown=result_data.get("max_drawdown", 0.0),
-                    win_rate=result_data.get("win_rate", 0.0),
-                    total_trades=result_data.get("total_trades", 0),
-                    profit_factor=result_data.get("profit_factor", 0.0),
-                    initial_capital=result_data.get("initial_capital", params.initial_capital),
-                    final_capital=result_data.get("final_capital", params.initial_capital),
-                    start_date=result_data.get("start_date", params.start_date),
-                    end_date=result_data.get("end_date", params.end_date),
-                    timeframe=result_data.get("timeframe", params.timeframe),
-                    trades=result_data.get("trades", []),
-                    equity_curve=result_data.get("equity_curve", [])
-                )
-                
-                logger.info(f"Backtest completed successfully: {result.total_trades} trades, {result.total_return:.2%} return")
-                return result
+            response = await self.client.request(
+                "POST",
+                "/api/v1/backtest/run",
+                json=payload,
+                timeout=300.0  # 5 minute timeout for backtests
+            )
+            response.raise_for_status()
+            
+            result_data = response.json()
+            
+            # Convert the response back to a BacktestResult object
+            result = BacktestResult(
+                strategy_id=result_data.get("strategy_id"),
+                total_return=result_data.get("total_return", 0.0),
+                sharpe_ratio=result_data.get("sharpe_ratio", 0.0),
+                max_drawdown=result_data.get("max_drawdown", 0.0),
+                win_rate=result_data.get("win_rate", 0.0),
+                total_trades=result_data.get("total_trades", 0),
+                profit_factor=result_data.get("profit_factor", 0.0),
+                initial_capital=result_data.get("initial_capital", params.initial_capital),
+                final_capital=result_data.get("final_capital", params.initial_capital),
+                start_date=result_data.get("start_date", params.start_date),
+                end_date=result_data.get("end_date", params.end_date),
+                timeframe=result_data.get("timeframe", params.timeframe),
+                trades=result_data.get("trades", []),
+                equity_curve=result_data.get("equity_curve", [])
+            )
+            
+            logger.info(f"Backtest completed successfully: {result.total_trades} trades, {result.total_return:.2%} return")
+            return result
                 
-        except httpx.RequestError as e:
+        except (httpx.RequestError, BacktestServicesUnavailable) as e:
             logger.error(f"Network error during backtest: {e}")
             # Return a default result indicating failure
             return BacktestResult(
@@ -0,0 +1,340 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ...utils import fast_json
+
+logger = logging.getLogger(__name__)
+
+BACKEND_SERVICES_URL = os.getenv("BACKEND_SERVICES_URL", "http://backend_services:8001")
+
+# Retried on: the request never reached a worker, or a proxy says the service is down
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+RETRYABLE_STATUS_CODES = {502, 503, 504}
+
+# Endpoint groups with their own circuit, so failing quotes or result reads
+# never stop backtests from being dispatched
+CIRCUIT_GROUPS = ("dispatch", "reads", "quotes")
+
+
+class BacktestServicesUnavailable(Exception):
+    """backend_services could not be reached or the circuit is open"""
+
+
+class BacktestServicesRejected(Exception):
+    """backend_services answered with a client error, e.g. an unknown symbol"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects calls
+    for ``reset_timeout`` seconds, then lets a single trial call through
+    (half-open). A success closes the circuit again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open" or (self.state == "half_open" and self._trial_in_flight)
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """Let another trial through after one ended without an outcome, e.g. cancelled"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"backend_services circuit opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+class BacktestServicesClient:
+    """
+    Shared, pooled HTTP client for dispatching work to backend_services.
+    Started and closed by the FastAPI lifespan.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BACKEND_SERVICES_URL,
+        max_retries: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 2.0,
+        circuits: Optional[Dict[str, CircuitBreaker]] = None
+    ):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.circuits = circuits or {group: CircuitBreaker() for group in CIRCUIT_GROUPS}
+        self.client: Optional[httpx.AsyncClient] = None
+
+    async def start(self):
+        """Open the pooled client"""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(10.0, connect=2.0, pool=2.0),
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+            )
+            logger.info(f"backend_services client started for {self.base_url}")
+
+    async def close(self):
+        """Close the pooled client"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _acquire(self, circuit: CircuitBreaker) -> bool:
+        """
+        Admit a call through the circuit
+
+        Returns:
+            Whether the call is the half-open trial, which the caller must
+            release however it ends
+        """
+        trial = circuit.state == "half_open"
+        if not circuit.allow_request():
+            raise BacktestServicesUnavailable("backend_services circuit is open")
+        return trial
+
+    async def request(self, method: str, path: str, circuit: str = "reads", **kwargs) -> httpx.Response:
+        """
+        Send a request with retries and circuit breaking.
+
+        Only failures that guarantee the request was not processed are
+        retried, so non-idempotent calls are never run twice.
+
+        Args:
+            circuit: Endpoint group whose circuit the call goes through
+
+        Raises:
+            BacktestServicesUnavailable: The circuit is open or every attempt failed
+        """
+        breaker = self.circuits[circuit]
+        trial = self._acquire(breaker)
+        try:
+            return await self._request_with_retries(breaker, method, path, **kwargs)
+        finally:
+            if trial:
+                breaker.release_trial()
+
+    async def _request_with_retries(self, breaker: CircuitBreaker, method: str, path: str, **kwargs) -> httpx.Response:
+        if self.client is None:
+            await self.start()
+
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt))
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except RETRYABLE_EXCEPTIONS as e:
+                last_error = e
+                logger.warning(f"backend_services {method} {path} attempt {attempt + 1} failed: {e}")
+                continue
+            except httpx.HTTPError as e:
+                breaker.record_failure()
+                raise BacktestServicesUnavailable(f"backend_services request failed: {e}") from e
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                last_error = httpx.HTTPStatusError(
+                    f"backend_services returned {response.status_code}",
+                    request=response.request, response=response
+                )
+                logger.warning(f"backend_services {method} {path} attempt {attempt + 1} returned {response.status_code}")
+                continue
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+
+        breaker.record_failure()
+        raise BacktestServicesUnavailable(f"backend_services unavailable: {last_error}") from last_error
+
+    async def stream(self, method: str, path: str, circuit: str = "reads", **kwargs) -> httpx.Response:
+        """
+        Send a request and return as soon as the headers arrive; the body is
+        read by the caller, who must close the response. Never retried,
+        since part of the body may already have been forwarded.
+
+        Raises:
+            BacktestServicesUnavailable: The circuit is open or the request failed
+        """
+        breaker = self.circuits[circuit]
+        trial = self._acquire(breaker)
+        try:
+            if self.client is None:
+                await self.start()
+
+            try:
+                response = await self.client.send(self.client.build_request(method, path, **kwargs), stream=True)
+            except httpx.HTTPError as e:
+                breaker.record_failure()
+                raise BacktestServicesUnavailable(f"backend_services request failed: {e}") from e
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+        finally:
+            if trial:
+                breaker.release_trial()
+
+    async def start_backtest(self, payload: Dict[str, Any]) -> str:
+        """
+        Dispatch a backtest and return the backend_services execution id
+
+        Raises:
+            BacktestServicesUnavailable: backend_services could not be reached
+            ValueError: backend_services rejected the request
+        """
+        response = await self.request("POST", "/backtest/run", circuit="dispatch", json=payload)
+        if response.status_code != 200:
+            raise ValueError(f"Backend services error: {response.text}")
+        return response.json()["backtest_id"]
+
+    async def start_batch(self, user_id: str, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Dispatch a group of backtests that share their market data
+
+        Returns:
+            The group_id and the execution ids (backtest_ids) in job order
+
+        Raises:
+            BacktestServicesUnavailable: backend_services could not be reached
+            ValueError: backend_services rejected the request
+        """
+        response = await self.request(
+            "POST", "/backtest/batch", circuit="dispatch", json={"user_id": user_id, "jobs": jobs}
+        )
+        if response.status_code != 200:
+            raise ValueError(f"Backend services error: {response.text}")
+        return response.json()
+
+    async def get_status(self, execution_id: str) -> Optional[Dict[str, Any]]:
+        """Execution status from backend_services, or None if unknown"""
+        response = await self.request("GET", f"/backtest/{execution_id}/status")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def get_series(self, execution_id: str, kind: str, **params) -> Optional[Dict[str, Any]]:
+        """
+        A range of a stored result series (trades or equity_curve)
+
+        Args:
+            execution_id: backend_services execution id
+            kind: Series name
+            **params: start, end, offset, limit, columns and max_points read parameters
+        """
+        params = {key: value for key, value in params.items() if value is not None}
+        response = await self.request("GET", f"/backtest/{execution_id}/series/{kind}", params=params)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return fast_json.loads(response.content)
+
+    async def open_export(self, execution_id: str, series: str, fmt: str, symbol: Optional[str] = None) -> Optional[httpx.Response]:
+        """
+        Stream a result series, or the cached bars of one symbol, as Arrow
+        IPC or Parquet; the caller must close the returned response
+
+        Args:
+            execution_id: backend_services execution id
+            series: trades, equity_curve or bars
+            fmt: arrow or parquet
+            symbol: Symbol whose bars to export, for series="bars"
+
+        Returns:
+            The open response, or None if there is no such data
+        """
+        path = f"/backtest/{execution_id}/bars/{symbol}" if series == "bars" else f"/backtest/{execution_id}/series/{series}"
+        response = await self.stream("GET", path, params={"format": fmt})
+        if response.status_code == 404:
+            await response.aclose()
+            return None
+        if response.status_code >= 400:
+            await response.aread()
+            await response.aclose()
+            response.raise_for_status()
+        return response
+
+    async def get_trade_context(self, execution_id: str, trade_index: int, bars: int = 20) -> Optional[Dict[str, Any]]:
+        """A trade with the cached bars and indicators around its entry and exit"""
+        response = await self.request(
+            "GET", f"/backtest/{execution_id}/trades/{trade_index}/context", params={"bars": bars}
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def get_quote(self, symbol: str, provider: str = "yahoo") -> Dict[str, Any]:
+        """
+        Latest quote for a symbol straight from the data provider
+
+        Raises:
+            BacktestServicesRejected: Unknown symbol or provider, with the upstream status
+        """
+        response = await self.request("GET", f"/quote/{symbol}", circuit="quotes", params={"provider": provider})
+        if 400 <= response.status_code < 500:
+            try:
+                detail = response.json().get("error") or response.text
+            except ValueError:
+                detail = response.text
+            raise BacktestServicesRejected(response.status_code, detail)
+        response.raise_for_status()
+        return response.json()
+
+
+# Global backend_services client instance
+backtest_services_client = BacktestServicesClient()
@@ -1,9 +1,18 @@
     # backend/services/default_strategies.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Awaitable, Callable, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime
+import asyncio
 import hashlib
 import json
+import os
+import time
+
+from ..utils import fast_json
+
+# Encoded default strategy responses are rebuilt at least this often, so
+# edits made outside this service show up without a restart
+DEFAULT_STRATEGIES_CACHE_TTL = float(os.getenv("DEFAULT_STRATEGIES_CACHE_TTL", "300"))
 
 # Default strategies configuration
 DEFAULT_STRATEGIES = [
@@ -121,6 +130,58 @@ DEFAULT_STRATEGIES = [
     }
 ]
 
+class DefaultStrategiesCache:
+    """
+    Encoded responses of the default strategy endpoints with strong ETags.
+    Default strategies only change when they are seeded or updated from
+    DEFAULT_STRATEGIES, which invalidate the cache; entries otherwise live
+    for ``ttl`` seconds. The ETag hashes the body, so a rebuild with the
+    same content keeps it.
+    """
+    
+    def __init__(self, ttl: float = DEFAULT_STRATEGIES_CACHE_TTL):
+        self.ttl = ttl
+        self.version = 0
+        self._entries: Dict[str, Tuple[float, str, bytes]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    def invalidate(self) -> None:
+        """Drop every entry; responses built concurrently are not stored"""
+        self.version += 1
+        self._entries.clear()
+    
+    def _fresh(self, name: str):
+        entry = self._entries.get(name)
+        if entry and entry[0] > time.monotonic():
+            return entry[1], entry[2]
+        return None
+    
+    async def get(self, name: str, build: Callable[[], Awaitable[Any]]) -> Tuple[str, bytes]:
+        """
+        The ETag and JSON body of a response, built at most once at a time
+        
+        Args:
+            name: Response name
+            build: Returns the JSON-compatible content on a miss
+        """
+        cached = self._fresh(name)
+        if cached:
+            return cached
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            cached = self._fresh(name)
+            if cached:
+                return cached
+            version = self.version
+            body = fast_json.dumps(await build())
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if version == self.version:
+                self._entries[name] = (time.monotonic() + self.ttl, etag, body)
+            return etag, body
+
+
+# Global cache of the default strategy responses
+default_strategies_cache = DefaultStrategiesCache()
+
 async def initialize_default_strategies(db: AsyncIOMotorDatabase) -> None:
     """
     Initialize default strategies in the database.
@@ -140,6 +201,7 @@ async def initialize_default_strategies(db: AsyncIOMotorDatabase) -> None:
                 "updated_at": datetime.utcnow(),
                 "version": "1.0"  # Version tracking for future updates
             })
+            default_strategies_cache.invalidate()
             print(f"Created default strategy: {strategy['name']}")
         else:
             # Strategy exists, check if it needs updating (optional)
@@ -199,4 +261,5 @@ async def update_default_strategies_if_needed(db: AsyncIOMotorDatabase) -> None:
                         }
                     }
                 )
+                default_strategies_cache.invalidate()
                 print(f"Updated default strategy: {strategy['name']}")
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Fan-out of backtest progress events from Redis pub/sub to streaming clients
+"""
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Set
+
+from ..utils.redis_client import redis_client
+
+# Must match backend_services/src/services/progress_publisher.py
+PROGRESS_CHANNEL = "backtest_progress"
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+
+def execution_snapshot_key(execution_id: str) -> str:
+    """Redis hash with the latest progress backend_services published"""
+    return f"backtest:execution:{execution_id}"
+
+
+class ProgressBroker:
+    """
+    Holds one Redis subscription per process and hands each event to the
+    local watchers of that execution. Slow watchers lose their oldest
+    events instead of blocking the others.
+    """
+
+    def __init__(self, channel: str = PROGRESS_CHANNEL, queue_size: int = 100):
+        self.channel = channel
+        self.queue_size = queue_size
+        self.watchers: Dict[str, Set[asyncio.Queue]] = {}
+        self._task = None
+
+    @property
+    def available(self) -> bool:
+        """Whether live events are flowing; callers fall back to polling otherwise"""
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        # The in-process fallback never sees events published by backend_services
+        if redis_client.redis is None or redis_client.is_mock:
+            print("Progress streaming needs a Redis server; clients will poll instead")
+            return
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        """Receive events, resubscribing with backoff if the connection drops"""
+        delay = 1.0
+        while True:
+            pubsub = redis_client.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                delay = 1.0
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._dispatch(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Progress subscription error: {e}; retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    def _dispatch(self, data: str) -> None:
+        try:
+            event = json.loads(data)
+        except (json.JSONDecodeError, TypeError):
+            return
+
+        for queue in self.watchers.get(event.get("execution_id"), ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    @contextmanager
+    def watch(self, execution_id: str) -> Iterator[asyncio.Queue]:
+        """Queue receiving the events of one execution while the block runs"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.watchers.setdefault(execution_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            watchers = self.watchers.get(execution_id)
+            if watchers is not None:
+                watchers.discard(queue)
+                if not watchers:
+                    del self.watchers[execution_id]
+
+
+def format_sse(event: Dict[str, Any], event_type: str = "progress") -> str:
+    """Encode one Server-Sent Event"""
+    return f"event: {event_type}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+# Global progress broker instance
+progress_broker = ProgressBroker()
@@ -0,0 +1,72 @@
+"""
+Short-lived cache of users' decrypted data provider credentials
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..database.user_ids import canonical_user_id
+from ..models.user_config import SECRET_FIELDS, ConfigEncryption
+
+# Decrypted secrets stay in process memory only, and only this long
+PROVIDER_CREDENTIALS_TTL = float(os.getenv("PROVIDER_CREDENTIALS_TTL", "60"))
+PROVIDER_CREDENTIALS_MAX_SIZE = int(os.getenv("PROVIDER_CREDENTIALS_MAX_SIZE", "1024"))
+
+# Stored user config fields that are provider credentials
+CREDENTIAL_FIELDS = (
+    "alpaca_paper_api_key", "alpaca_paper_endpoint",
+    "alpaca_live_api_key", "alpaca_live_endpoint",
+    "polygon_api_key_name",
+) + SECRET_FIELDS
+
+
+class ProviderCredentialsCache:
+    """
+    Decrypted credentials by user in a size-bounded LRU with a short TTL,
+    so repeated lookups do not re-read and re-decrypt the user's config.
+    Never written to Redis; entries are dropped when the config changes.
+    """
+
+    def __init__(self, ttl: float = PROVIDER_CREDENTIALS_TTL, max_size: int = PROVIDER_CREDENTIALS_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    async def get(self, db: AsyncIOMotorDatabase, user_id: Any) -> Dict[str, Any]:
+        """
+        The user's credentials with secrets decrypted; empty if none are configured
+
+        Args:
+            db: Database holding the user_config collection
+            user_id: User whose config to read
+        """
+        key = str(user_id)
+        entry = self._local.get(key)
+        if entry:
+            expires_at, credentials = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return credentials
+            del self._local[key]
+
+        projection = {field: 1 for field in CREDENTIAL_FIELDS}
+        config_doc = await db.user_config.find_one({"user_id": canonical_user_id(user_id)}, projection) or {}
+        config_doc.pop("_id", None)
+        credentials = ConfigEncryption.decrypt_fields(config_doc)
+
+        self._local[key] = (time.monotonic() + self.ttl, credentials)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+        return credentials
+
+    def invalidate(self, user_id: Any) -> None:
+        """Drop a user's credentials after their config changed"""
+        self._local.pop(str(user_id), None)
+
+
+# Global provider credentials cache instance
+provider_credentials = ProviderCredentialsCache()
@@ -0,0 +1,196 @@
+"""
+Read-through cache of market quotes shared by every replica
+"""
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..utils.redis_client import redis_client
+from .backtest.services_client import BacktestServicesRejected, backtest_services_client
+
+# In-process tier: absorbs bursts from one page without a Redis round trip
+QUOTE_CACHE_LOCAL_TTL = float(os.getenv("QUOTE_CACHE_LOCAL_TTL", "1"))
+QUOTE_CACHE_MAX_SIZE = int(os.getenv("QUOTE_CACHE_MAX_SIZE", "2048"))
+# Redis tier: a quote is fresh for QUOTE_CACHE_TTL seconds, then served stale
+# for up to QUOTE_CACHE_STALE_TTL more while one caller refreshes it
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "5"))
+QUOTE_CACHE_STALE_TTL = float(os.getenv("QUOTE_CACHE_STALE_TTL", "30"))
+# Unknown symbols and providers are remembered this long, so repeated lookups
+# of a typo do not each reach the data provider
+QUOTE_CACHE_NEGATIVE_TTL = float(os.getenv("QUOTE_CACHE_NEGATIVE_TTL", "10"))
+# Upper bound on one upstream fetch; replicas waiting on another's fetch give up after it
+QUOTE_FETCH_LOCK_TIMEOUT = float(os.getenv("QUOTE_FETCH_LOCK_TIMEOUT", "5"))
+
+QuoteFetcher = Callable[[str, str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+async def _fetch_from_services(symbol: str, provider: str) -> Dict[str, Any]:
+    return await backtest_services_client.get_quote(symbol, provider)
+
+
+class QuoteCache:
+    """
+    Quotes by provider and symbol, in a short-lived in-process LRU backed by
+    Redis. Concurrent misses for a symbol share one fetch in this process,
+    and a Redis lock lets only one replica fetch it upstream while the
+    others wait for its result. Once a quote goes stale it is still served
+    for ``stale_ttl`` seconds while a background refresh runs.
+
+    Upstream rejections (BacktestServicesRejected) are cached for
+    ``negative_ttl`` seconds and raised again to every caller meanwhile.
+
+    Cache errors never fail a request; the quote is fetched directly.
+    """
+
+    def __init__(
+        self,
+        fetch: QuoteFetcher = _fetch_from_services,
+        local_ttl: float = QUOTE_CACHE_LOCAL_TTL,
+        max_size: int = QUOTE_CACHE_MAX_SIZE,
+        ttl: float = QUOTE_CACHE_TTL,
+        stale_ttl: float = QUOTE_CACHE_STALE_TTL,
+        negative_ttl: float = QUOTE_CACHE_NEGATIVE_TTL,
+        lock_timeout: float = QUOTE_FETCH_LOCK_TIMEOUT,
+        poll_interval: float = 0.05
+    ):
+        self.fetch = fetch
+        self.local_ttl = local_ttl
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._local: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _key(symbol: str, provider: str) -> str:
+        return f"{provider.lower()}:{symbol.upper()}"
+
+    def _set_local(self, key: str, entry: Dict[str, Any]) -> None:
+        self._local[key] = (time.monotonic() + self.local_ttl, entry)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    @staticmethod
+    def _unwrap(entry: Dict[str, Any]) -> Dict[str, Any]:
+        """The cached quote, or the cached upstream rejection raised again"""
+        error = entry.get("error")
+        if error:
+            raise BacktestServicesRejected(error["status_code"], error["detail"])
+        return entry["quote"]
+
+    def _fresh(self, entry: Dict[str, Any]) -> bool:
+        ttl = self.negative_ttl if "error" in entry else self.ttl
+        return time.time() - entry["fetched_at"] < ttl
+
+    async def _store(self, key: str, entry: Dict[str, Any], ttl: float) -> None:
+        self._set_local(key, entry)
+        try:
+            await redis_client.cache_market_data(key, entry, ttl=math.ceil(ttl))
+        except Exception as e:
+            print(f"Error writing quote cache: {e}")
+
+    async def _get_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = await redis_client.get_market_data(key)
+            return entry if isinstance(entry, dict) and "fetched_at" in entry else None
+        except Exception as e:
+            print(f"Error reading quote cache: {e}")
+            return None
+
+    async def get(self, symbol: str, provider: str = "yahoo") -> Optional[Dict[str, Any]]:
+        """
+        Latest quote, at most ``ttl`` seconds old unless a refresh is pending
+
+        Raises:
+            BacktestServicesRejected: backend_services rejected the symbol or provider
+            BacktestServicesUnavailable: No cached quote and backend_services is down
+        """
+        symbol = symbol.upper()
+        key = self._key(symbol, provider)
+        local = self._local.get(key)
+        if local:
+            expires_at, entry = local
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                return self._unwrap(entry)
+            del self._local[key]
+
+        entry = await self._get_shared(key)
+        if entry:
+            if self._fresh(entry):
+                self._set_local(key, entry)
+                return self._unwrap(entry)
+            if "error" not in entry and time.time() - entry["fetched_at"] < self.ttl + self.stale_ttl:
+                self._refresh(key, symbol, provider)
+                return entry["quote"]
+
+        return await self._load(key, symbol, provider)
+
+    def _refresh(self, key: str, symbol: str, provider: str) -> None:
+        """Revalidate a stale quote without making the caller wait"""
+        async def refresh():
+            try:
+                await self._load(key, symbol, provider)
+            except Exception as e:
+                print(f"Error refreshing quote {key}: {e}")
+
+        if key not in self._inflight:
+            asyncio.create_task(refresh())
+
+    async def _load(self, key: str, symbol: str, provider: str) -> Optional[Dict[str, Any]]:
+        """Fetch once per key in this process, whoever asks"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_once(key, symbol, provider))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled request must not cancel the fetch other callers wait on
+        return await asyncio.shield(task)
+
+    async def _fetch_once(self, key: str, symbol: str, provider: str) -> Optional[Dict[str, Any]]:
+        """Fetch upstream under the cluster-wide lock, or wait for the replica holding it"""
+        try:
+            locked = await redis_client.acquire_lock(f"market:{key}", int(self.lock_timeout * 1000))
+        except Exception as e:
+            print(f"Error locking quote {key}: {e}")
+            locked = None
+
+        if locked is False:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                entry = await self._get_shared(key)
+                if entry and self._fresh(entry):
+                    self._set_local(key, entry)
+                    return self._unwrap(entry)
+            # The holder is gone or too slow; fetch ourselves
+
+        started = time.monotonic()
+        try:
+            try:
+                quote = await self.fetch(symbol, provider)
+            except BacktestServicesRejected as e:
+                error = {"status_code": e.status_code, "detail": e.detail}
+                await self._store(key, {"error": error, "fetched_at": time.time()}, self.negative_ttl)
+                raise
+            if quote:
+                await self._store(key, {"quote": quote, "fetched_at": time.time()}, self.ttl + self.stale_ttl)
+            return quote
+        finally:
+            # Past the timeout the lock has expired and may belong to another replica
+            if locked and time.monotonic() - started < self.lock_timeout:
+                try:
+                    await redis_client.release_lock(f"market:{key}")
+                except Exception as e:
+                    print(f"Error unlocking quote {key}: {e}")
+
+
+# Global quote cache instance
+quote_cache = QuoteCache()
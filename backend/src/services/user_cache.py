@@ -0,0 +1,97 @@
+"""
+Two-tier cache of authenticated users for the token dependency
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
+
+from ..models.user import User, UserInDB
+from ..utils.redis_client import redis_client
+
+logger = logging.getLogger(__name__)
+
+# In-process tier: short TTL bounds how long another replica's update can go unseen
+USER_CACHE_LOCAL_TTL = float(os.getenv("USER_CACHE_LOCAL_TTL", "15"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+# Redis tier: shared by all replicas and cleared on update
+USER_CACHE_REDIS_TTL = int(os.getenv("USER_CACHE_REDIS_TTL", "300"))
+
+
+class UserCache:
+    """
+    Caches users by id in a size-bounded LRU with a short TTL, backed by
+    Redis. Only the User model is kept, never the password hash. Cache
+    errors never fail a request; callers fall back to the database.
+    """
+
+    def __init__(self, local_ttl: float = USER_CACHE_LOCAL_TTL, max_size: int = USER_CACHE_MAX_SIZE,
+                 redis_ttl: int = USER_CACHE_REDIS_TTL):
+        self.local_ttl = local_ttl
+        self.max_size = max_size
+        self.redis_ttl = redis_ttl
+        self._local: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"user:{user_id}"
+
+    @staticmethod
+    def to_cached(user: Union[User, UserInDB]) -> User:
+        """The user without its password hash"""
+        if isinstance(user, User):
+            return user
+        return User.model_validate(user.model_dump(by_alias=True, exclude={"hashed_password"}))
+
+    def _set_local(self, user_id: str, user: User) -> None:
+        self._local[user_id] = (time.monotonic() + self.local_ttl, user)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def get(self, user_id: str) -> Optional[User]:
+        """Cached user, or None on a miss"""
+        entry = self._local.get(user_id)
+        if entry:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(user_id)
+                return user
+            del self._local[user_id]
+
+        try:
+            cached = await redis_client.get(self._key(user_id))
+            if isinstance(cached, dict):
+                user = User.model_validate(cached)
+                self._set_local(user_id, user)
+                return user
+        except Exception as e:
+            logger.warning(f"Error reading user cache: {e}")
+        return None
+
+    async def set(self, user_id: str, user: Union[User, UserInDB]) -> User:
+        """Store a user loaded from the database and return the cached form"""
+        user = self.to_cached(user)
+        self._set_local(user_id, user)
+        try:
+            await redis_client.set_with_ttl(
+                self._key(user_id),
+                user.model_dump(mode="json", by_alias=True),
+                self.redis_ttl
+            )
+        except Exception as e:
+            logger.warning(f"Error writing user cache: {e}")
+        return user
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a user after it changed or was removed in the database"""
+        self._local.pop(user_id, None)
+        try:
+            await redis_client.delete(self._key(user_id))
+        except Exception as e:
+            logger.warning(f"Error invalidating user cache: {e}")
+
+
+# Global user cache instance
+user_cache = UserCache()
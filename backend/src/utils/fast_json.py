@@ -0,0 +1,85 @@
+"""
+orjson-based encoding for large responses built from trusted data
+"""
+import json
+import math
+from typing import Any, AsyncIterator, Dict, Iterable
+
+from fastapi.responses import JSONResponse
+
+# Try to import orjson, fall back to the standard library if not available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def finite_floats(obj: Any) -> Any:
+    """Replace NaN and infinity with None, as orjson encodes them"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: finite_floats(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [finite_floats(value) for value in obj]
+    return obj
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Compact JSON bytes; datetimes as ISO strings, unknown types via str,
+    NaN and infinity as null. Values orjson rejects, e.g. integers wider
+    than 64 bits, are encoded by the standard library instead.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(finite_floats(obj), default=str, separators=(",", ":"), allow_nan=False).encode()
+
+
+def loads(data: Any) -> Any:
+    return orjson.loads(data) if ORJSON_AVAILABLE else json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson. Content is not validated, so only use
+    it for data the service produced itself.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+async def stream_object(fields: Iterable[tuple]) -> AsyncIterator[bytes]:
+    """
+    Encode a JSON object field by field. A value that is an async iterator
+    of lists is written as one array, a chunk at a time, so large arrays are
+    never held encoded in memory at once.
+
+    Args:
+        fields: (name, value) pairs in output order; values may also be
+            zero-argument callables, evaluated when their turn comes
+    """
+    yield b"{"
+    for i, (name, value) in enumerate(fields):
+        yield (b"," if i else b"") + dumps(name) + b":"
+        if callable(value):
+            value = value()
+        if hasattr(value, "__aiter__"):
+            yield b"["
+            first = True
+            async for chunk in value:
+                if not chunk:
+                    continue
+                encoded = dumps(chunk)[1:-1]
+                yield encoded if first else b"," + encoded
+                first = False
+            yield b"]"
+        else:
+            yield dumps(value)
+    yield b"}"
@@ -0,0 +1,108 @@
+"""
+Per-user rate limiting of expensive routes, applied as ASGI middleware
+"""
+import json
+import math
+import os
+import re
+from typing import List, NamedTuple, Optional, Pattern, Tuple
+
+from .redis_client import redis_client
+from .security import verify_token
+
+
+def _limit(name: str, default: str) -> Tuple[int, int]:
+    """Parse a "<requests>/<seconds>" limit from the environment"""
+    requests, seconds = os.getenv(name, default).split("/")
+    return int(requests), int(seconds)
+
+
+class RateLimitRule(NamedTuple):
+    name: str
+    method: str
+    path: Pattern[str]
+    limit: int
+    window: int
+
+
+# Routes that start backtests, fan out to backend_services or fetch quotes
+RATE_LIMIT_RULES: List[RateLimitRule] = [
+    RateLimitRule("backtest_run", "POST", re.compile(r"^/api/backtest/run$"),
+                  *_limit("RATE_LIMIT_BACKTEST_RUN", "10/60")),
+    RateLimitRule("backtest_run", "POST", re.compile(r"^/api/strategy/[^/]+/backtest$"),
+                  *_limit("RATE_LIMIT_BACKTEST_RUN", "10/60")),
+    RateLimitRule("backtest_batch", "POST", re.compile(r"^/api/backtest/batch$"),
+                  *_limit("RATE_LIMIT_BACKTEST_BATCH", "2/60")),
+    RateLimitRule("backtest_results", "GET", re.compile(r"^/api/backtest/(results|trade-details)/"),
+                  *_limit("RATE_LIMIT_BACKTEST_RESULTS", "120/60")),
+    RateLimitRule("quotes", "GET", re.compile(r"^/api/market/quotes?(/|$)"),
+                  *_limit("RATE_LIMIT_QUOTES", "300/60")),
+]
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket limits per user (or client address for anonymous calls) on
+    the routes matched by ``rules``. Other requests pass straight through,
+    so streaming responses are untouched. If Redis is unavailable requests
+    are allowed rather than failed.
+    """
+
+    def __init__(self, app, rules: List[RateLimitRule] = RATE_LIMIT_RULES):
+        self.app = app
+        self.rules = rules
+
+    def _match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.method == method and rule.path.match(path):
+                return rule
+        return None
+
+    @staticmethod
+    def _client_id(scope) -> str:
+        for name, value in scope.get("headers", []):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                payload = verify_token(token) if scheme.lower() == "bearer" else None
+                if payload and payload.get("sub"):
+                    return f"user:{payload['sub']}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        rule = self._match(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if rule is None or redis_client.redis is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            result = await redis_client.rate_limit(f"{rule.name}:{self._client_id(scope)}", rule.limit, rule.window)
+        except Exception as e:
+            print(f"Rate limit check failed, allowing request: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        headers = [
+            (b"x-ratelimit-limit", str(result.limit).encode()),
+            (b"x-ratelimit-remaining", str(result.remaining).encode()),
+        ]
+        if not result.allowed:
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": headers + [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(max(1, math.ceil(result.retry_after))).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -1,7 +1,12 @@
 import os
+import sys
 import json
+import math
+import time
+import heapq
 import asyncio
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, NamedTuple, Set, Tuple
 from datetime import datetime, timedelta
 
 # Try to import redis, fall back to mock if not available
@@ -12,70 +17,384 @@ except ImportError:
     REDIS_AVAILABLE = False
     redis = None
 
+# Token bucket refilled continuously at limit/window tokens per second.
+# One round trip per check; the server clock keeps replicas consistent.
+RATE_LIMIT_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+local rate = capacity / window_ms
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_ms = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_ms = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], window_ms)
+return {allowed, math.floor(tokens), retry_ms}
+"""
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+# Lifetime of backtest status and log keys
+BACKTEST_KEY_TTL = 86400
+
+# Bounds of the in-process fallback used when no Redis server is configured
+MOCK_REDIS_MAX_MEMORY = int(os.getenv("MOCK_REDIS_MAX_MEMORY", str(64 * 1024 * 1024)))
+MOCK_REDIS_SWEEP_INTERVAL = float(os.getenv("MOCK_REDIS_SWEEP_INTERVAL", "1"))
+MOCK_PUBSUB_QUEUE_SIZE = 1000
+
+def _approx_size(key: str, value: Any) -> int:
+    """Rough memory footprint of one key, for max-memory eviction"""
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+class MockPipeline:
+    """Queues commands and runs them in order on execute, like a redis-py pipeline"""
+    
+    def __init__(self, client: "MockRedisClient"):
+        self.client = client
+        self.commands: List[tuple] = []
+        
+    def __getattr__(self, name: str):
+        method = getattr(self.client, name)
+        
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue
+        
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, *exc):
+        self.commands = []
+        
+    async def execute(self) -> list:
+        # Mock commands never yield to the event loop, so the batch is atomic
+        commands, self.commands = self.commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+
+class MockPubSub:
+    """Subscription on a MockRedisClient; only sees messages published in this process"""
+    
+    def __init__(self, client: "MockRedisClient", ignore_subscribe_messages: bool = False):
+        self.client = client
+        self.ignore_subscribe_messages = ignore_subscribe_messages
+        self.channels: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=MOCK_PUBSUB_QUEUE_SIZE)
+        
+    def _put(self, message: Optional[Dict[str, Any]]):
+        # A slow subscriber loses its oldest messages instead of growing without bound
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+        
+    async def subscribe(self, *channels: str):
+        for channel in channels:
+            self.channels.add(channel)
+            self.client.subscribers.setdefault(channel, set()).add(self)
+            if not self.ignore_subscribe_messages:
+                self._put({"type": "subscribe", "pattern": None, "channel": channel, "data": len(self.channels)})
+                
+    async def unsubscribe(self, *channels: str):
+        for channel in channels or list(self.channels):
+            self.channels.discard(channel)
+            subscribers = self.client.subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(self)
+                if not subscribers:
+                    del self.client.subscribers[channel]
+            if not self.ignore_subscribe_messages:
+                self._put({"type": "unsubscribe", "pattern": None, "channel": channel, "data": len(self.channels)})
+                
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[Dict[str, Any]]:
+        try:
+            message = await asyncio.wait_for(self.queue.get(), timeout) if timeout else self.queue.get_nowait()
+        except (asyncio.TimeoutError, asyncio.QueueEmpty):
+            return None
+        if message and ignore_subscribe_messages and message["type"] != "message":
+            return None
+        return message
+        
+    async def listen(self):
+        while True:
+            message = await self.queue.get()
+            if message is None:
+                return
+            yield message
+            
+    async def aclose(self):
+        self.ignore_subscribe_messages = True
+        await self.unsubscribe()
+        # Wake a pending listen()
+        self._put(None)
+        
+    close = aclose
+
 class MockRedisClient:
-    """Mock Redis client for development when Redis is not available"""
+    """
+    In-process stand-in for Redis on single-node deployments without one.
     
-    def __init__(self):
-        self.data: Dict[str, Any] = {}
+    Keys honour their TTLs: expired keys are dropped when touched and by a
+    sweeper popping a heap of deadlines. Memory is bounded by evicting the
+    least recently used keys once ``max_memory`` (approximate bytes) is
+    exceeded, like Redis' allkeys-lru policy. Pub/sub only reaches
+    subscribers in this process.
+    """
+    
+    def __init__(self, max_memory: int = MOCK_REDIS_MAX_MEMORY, sweep_interval: float = MOCK_REDIS_SWEEP_INTERVAL):
+        self.max_memory = max_memory
+        self.sweep_interval = sweep_interval
+        self.data: "OrderedDict[str, Any]" = OrderedDict()
+        self.sizes: Dict[str, int] = {}
+        self.used_memory = 0
+        self.expires: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.subscribers: Dict[str, Set[MockPubSub]] = {}
+        self.expired_keys = 0
+        self.evicted_keys = 0
+        self._sweeper: Optional[asyncio.Task] = None
         
     async def connect(self):
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
         print("✅ Mock Redis client initialized (Redis container not required)")
         
     async def disconnect(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
         print("📤 Mock Redis client disconnected")
         
+    # Keyspace bookkeeping
+    def _remove(self, key: str) -> bool:
+        if key not in self.data:
+            return False
+        del self.data[key]
+        self.used_memory -= self.sizes.pop(key)
+        self.expires.pop(key, None)
+        return True
+        
+    def _alive(self, key: str) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._remove(key)
+            self.expired_keys += 1
+            return False
+        return key in self.data
+        
+    def _read(self, key: str, default: Any = None) -> Any:
+        if not self._alive(key):
+            return default
+        self.data.move_to_end(key)
+        return self.data[key]
+        
+    def _write(self, key: str, value: Any, keep_ttl: bool = True):
+        self._sweep()
+        if not keep_ttl:
+            self.expires.pop(key, None)
+        self.used_memory -= self.sizes.get(key, 0)
+        self.data[key] = value
+        self.data.move_to_end(key)
+        self.sizes[key] = _approx_size(key, value)
+        self.used_memory += self.sizes[key]
+        # Never evict the key just written
+        while self.used_memory > self.max_memory and len(self.data) > 1:
+            self._remove(next(iter(self.data)))
+            self.evicted_keys += 1
+            
+    def _set_expiry(self, key: str, seconds: float):
+        deadline = time.monotonic() + seconds
+        self.expires[key] = deadline
+        heapq.heappush(self._expiry_heap, (deadline, key))
+        # Refreshed TTLs leave superseded entries behind; rebuild before they pile up
+        if len(self._expiry_heap) > 2 * len(self.expires) + 1024:
+            self._expiry_heap = [(deadline, key) for key, deadline in self.expires.items()]
+            heapq.heapify(self._expiry_heap)
+            
+    def _sweep(self):
+        """Drop every key whose deadline has passed"""
+        now = time.monotonic()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            deadline, key = heapq.heappop(self._expiry_heap)
+            if self.expires.get(key) == deadline:
+                self._remove(key)
+                self.expired_keys += 1
+                
+    async def _sweep_loop(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self._sweep()
+            
+    # Commands
     async def ping(self):
         return True
         
-    async def hset(self, key: str, mapping: Dict[str, str]):
-        if key not in self.data:
-            self.data[key] = {}
-        self.data[key].update(mapping)
+    async def info(self) -> Dict[str, Any]:
+        self._sweep()
+        return {
+            "used_memory": self.used_memory,
+            "maxmemory": self.max_memory,
+            "maxmemory_policy": "allkeys-lru",
+            "expired_keys": self.expired_keys,
+            "evicted_keys": self.evicted_keys,
+            "db0": {"keys": len(self.data), "expires": len(self.expires)},
+        }
+        
+    async def dbsize(self) -> int:
+        self._sweep()
+        return len(self.data)
+        
+    async def exists(self, *keys) -> int:
+        return sum(1 for key in keys if self._alive(key))
+        
+    async def delete(self, *keys) -> int:
+        return sum(1 for key in keys if self._alive(key) and self._remove(key))
+            
+    async def expire(self, key: str, seconds: int) -> bool:
+        if not self._alive(key):
+            return False
+        self._set_expiry(key, seconds)
+        return True
+        
+    async def ttl(self, key: str) -> int:
+        if not self._alive(key):
+            return -2
+        deadline = self.expires.get(key)
+        return -1 if deadline is None else math.ceil(deadline - time.monotonic())
+        
+    async def get(self, key: str) -> Optional[str]:
+        return self._read(key)
+        
+    async def set(self, key: str, value: Any, ex: Optional[int] = None, px: Optional[int] = None,
+                  nx: bool = False, xx: bool = False):
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self._write(key, str(value), keep_ttl=False)
+        if ex is not None:
+            self._set_expiry(key, ex)
+        elif px is not None:
+            self._set_expiry(key, px / 1000)
+        return True
+        
+    async def setex(self, key: str, seconds: int, value: Any):
+        return await self.set(key, value, ex=seconds)
+        
+    async def incr(self, key: str) -> int:
+        return await self.incrby(key, 1)
+        
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._read(key, 0)) + amount
+        self._write(key, str(value))
+        return value
+        
+    async def hset(self, key: str, field: Optional[str] = None, value: Any = None,
+                   mapping: Optional[Dict[str, Any]] = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        current = dict(self._read(key, {}))
+        added = sum(1 for field in items if field not in current)
+        current.update({field: str(value) for field, value in items.items()})
+        self._write(key, current)
+        return added
+        
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        return self._read(key, {}).get(field)
         
     async def hgetall(self, key: str) -> Dict[str, str]:
-        return self.data.get(key, {})
+        return dict(self._read(key, {}))
         
-    async def expire(self, key: str, seconds: int):
-        # In mock mode, we don't actually expire keys
-        pass
+    async def lpush(self, key: str, *values: Any) -> int:
+        current = list(self._read(key, []))
+        for value in values:
+            current.insert(0, str(value))
+        self._write(key, current)
+        return len(current)
         
-    async def lpush(self, key: str, value: str):
-        if key not in self.data:
-            self.data[key] = []
-        self.data[key].insert(0, value)
+    async def llen(self, key: str) -> int:
+        return len(self._read(key, []))
         
     async def ltrim(self, key: str, start: int, end: int):
-        if key in self.data and isinstance(self.data[key], list):
-            if end == -1:
-                self.data[key] = self.data[key][start:]
-            else:
-                self.data[key] = self.data[key][start:end+1]
+        current = self._read(key)
+        if current is None:
+            return True
+        trimmed = current[start:None if end == -1 else end + 1]
+        if trimmed:
+            self._write(key, trimmed)
+        else:
+            self._remove(key)
+        return True
                 
     async def lrange(self, key: str, start: int, end: int) -> list:
-        if key not in self.data or not isinstance(self.data[key], list):
-            return []
-        if end == -1:
-            return self.data[key][start:]
-        return self.data[key][start:end+1]
+        return list(self._read(key, [])[start:None if end == -1 else end + 1])
         
-    async def delete(self, *keys):
-        for key in keys:
-            self.data.pop(key, None)
-            
-    async def setex(self, key: str, seconds: int, value: str):
-        self.data[key] = value
+    async def publish(self, channel: str, message: Any) -> int:
+        subscribers = self.subscribers.get(channel, ())
+        for subscriber in list(subscribers):
+            subscriber._put({"type": "message", "pattern": None, "channel": channel, "data": str(message)})
+        return len(subscribers)
         
-    async def get(self, key: str) -> Optional[str]:
-        return self.data.get(key)
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> MockPubSub:
+        return MockPubSub(self, ignore_subscribe_messages)
+        
+    def pipeline(self, transaction: bool = True) -> MockPipeline:
+        return MockPipeline(self)
+        
+    async def token_bucket(self, key: str, capacity: int, window_ms: int, cost: int = 1) -> list:
+        """In-process equivalent of RATE_LIMIT_SCRIPT; atomic on the event loop"""
+        now = int(time.time() * 1000)
+        tokens, ts = self._read(key, (capacity, now))
+        rate = capacity / window_ms
+        tokens = min(capacity, tokens + max(0, now - ts) * rate)
+        allowed, retry_ms = 0, 0
+        if tokens >= cost:
+            tokens -= cost
+            allowed = 1
+        else:
+            retry_ms = math.ceil((cost - tokens) / rate)
+        self._write(key, (tokens, now))
+        self._set_expiry(key, window_ms / 1000)
+        return [allowed, math.floor(tokens), retry_ms]
 
 class RedisClient:
     def __init__(self):
         self.redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
         self.redis = None
         self.use_mock = not REDIS_AVAILABLE or os.getenv("USE_MOCK_REDIS", "false").lower() == "true"
+        self._rate_limit_script = None
+        
+    @property
+    def is_mock(self) -> bool:
+        """Whether commands go to the in-process fallback rather than a Redis server"""
+        return isinstance(self.redis, MockRedisClient)
         
     async def connect(self):
         """Connect to Redis or initialize mock"""
+        self._rate_limit_script = None
         if self.use_mock or not REDIS_AVAILABLE:
             self.redis = MockRedisClient()
             await self.redis.connect()
@@ -98,9 +417,55 @@ class RedisClient:
                 await self.redis.disconnect()
             print("📤 Disconnected from Redis")
 
-    async def hset(self, key: str, mapping: Dict[str, Any]):
-        """Proxy for the hset command."""
-        return await self.redis.hset(key, mapping=mapping)
+    async def hset(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None):
+        """Proxy for the hset command; with ``ttl``, HSET and EXPIRE run as one MULTI."""
+        if ttl is None:
+            return await self.redis.hset(key, mapping=mapping)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, ttl)
+            results = await pipe.execute()
+        return results[0]
+    
+    async def hset_many(self, mappings: Dict[str, Dict[str, Any]], ttl: Optional[int] = None):
+        """HSET (and with ``ttl`` EXPIRE) of several keys as one MULTI."""
+        if not mappings:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for key, mapping in mappings.items():
+                pipe.hset(key, mapping=mapping)
+                if ttl is not None:
+                    pipe.expire(key, ttl)
+            await pipe.execute()
+    
+    async def hgetall(self, key: str) -> Dict[str, str]:
+        """Proxy for the hgetall command."""
+        return await self.redis.hgetall(key)
+    
+    async def hgetall_many(self, keys: List[str]) -> List[Dict[str, str]]:
+        """HGETALL of several keys in one round trip; missing keys give empty dicts."""
+        if not keys:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            return [dict(data or {}) for data in await pipe.execute()]
+    
+    async def expire(self, key: str, seconds: int):
+        """Proxy for the expire command."""
+        return await self.redis.expire(key, seconds)
+    
+    @staticmethod
+    def _parse_status(data: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        if not data:
+            return None
+        parsed = {}
+        for k, v in data.items():
+            try:
+                parsed[k] = json.loads(v)
+            except (json.JSONDecodeError, TypeError):
+                parsed[k] = v  # Keep as string
+        return parsed
     
     # Backtest Task Management
     async def set_backtest_status(self, backtest_id: str, status: str, progress: int = 0, **kwargs):
@@ -112,36 +477,34 @@ class RedisClient:
             "updated_at": datetime.utcnow().isoformat(),
             **kwargs
         }
-        await self.redis.hset(key, mapping={k: json.dumps(v) if isinstance(v, (dict, list)) else str(v) for k, v in data.items()})
-        # Set expiration for 24 hours
-        await self.redis.expire(key, 86400)
+        # HSET and the 24 hour expiry in one round trip
+        await self.hset(
+            key,
+            {k: json.dumps(v) if isinstance(v, (dict, list)) else str(v) for k, v in data.items()},
+            ttl=BACKTEST_KEY_TTL
+        )
     
     async def get_backtest_status(self, backtest_id: str) -> Optional[Dict[str, Any]]:
         """Get backtest status from Redis"""
         key = f"backtest:{backtest_id}"
-        data = await self.redis.hgetall(key)
-        if not data:
-            return None
-        
-        # Parse JSON fields
-        for k, v in data.items():
-            try:
-                data[k] = json.loads(v)
-            except (json.JSONDecodeError, TypeError):
-                pass  # Keep as string
-        
-        return data
+        return self._parse_status(await self.redis.hgetall(key))
+    
+    async def get_backtest_statuses(self, backtest_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Statuses of many backtests in one round trip, None for unknown ids"""
+        rows = await self.hgetall_many([f"backtest:{backtest_id}" for backtest_id in backtest_ids])
+        return {backtest_id: self._parse_status(data) for backtest_id, data in zip(backtest_ids, rows)}
     
     async def add_backtest_log(self, backtest_id: str, message: str):
         """Add log message to backtest"""
         key = f"backtest:{backtest_id}:logs"
         timestamp = datetime.utcnow().isoformat()
         log_entry = f"[{timestamp}] {message}"
-        await self.redis.lpush(key, log_entry)
-        # Keep only last 100 logs
-        await self.redis.ltrim(key, 0, 99)
-        # Set expiration
-        await self.redis.expire(key, 86400)
+        # Push, keep only the last 100 logs and refresh the expiry as one MULTI
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lpush(key, log_entry)
+            pipe.ltrim(key, 0, 99)
+            pipe.expire(key, BACKTEST_KEY_TTL)
+            await pipe.execute()
     
     async def get_backtest_logs(self, backtest_id: str) -> list:
         """Get backtest logs"""
@@ -155,6 +518,7 @@ class RedisClient:
             f"backtest:{backtest_id}",
             f"backtest:{backtest_id}:logs"
         ]
+        # A single multi-key DEL
         await self.redis.delete(*keys)
     
     # General utilities
@@ -162,6 +526,10 @@ class RedisClient:
         """Set key with TTL"""
         await self.redis.setex(key, ttl_seconds, json.dumps(value) if isinstance(value, (dict, list)) else str(value))
     
+    async def delete(self, *keys: str) -> int:
+        """Proxy for the delete command."""
+        return await self.redis.delete(*keys)
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value by key"""
         value = await self.redis.get(key)
@@ -173,20 +541,39 @@ class RedisClient:
             return value
     
     # Rate Limiting
+    async def rate_limit(self, key: str, limit: int, window: int, cost: int = 1) -> RateLimitResult:
+        """
+        Take ``cost`` tokens from a bucket holding ``limit`` tokens that
+        refills over ``window`` seconds, in a single atomic round trip
+
+        Returns:
+            Whether the request is allowed, the tokens left, and the seconds
+            until enough tokens are available when it is not
+        """
+        key = f"rate_limit:{key}"
+        window_ms = int(window * 1000)
+        if self.is_mock:
+            allowed, remaining, retry_ms = await self.redis.token_bucket(key, limit, window_ms, cost)
+        else:
+            if self._rate_limit_script is None:
+                # EVALSHA, reloading the script if the server has flushed it
+                self._rate_limit_script = self.redis.register_script(RATE_LIMIT_SCRIPT)
+            allowed, remaining, retry_ms = await self._rate_limit_script(keys=[key], args=[limit, window_ms, cost])
+        return RateLimitResult(bool(int(allowed)), limit, int(remaining), int(retry_ms) / 1000)
+    
     async def check_rate_limit(self, user_id: str, endpoint: str, limit: int = 60, window: int = 60) -> bool:
         """Check if user has exceeded rate limit"""
-        key = f"rate_limit:{user_id}:{endpoint}"
-        current = await self.redis.get(key)
-        
-        if current is None:
-            await self.redis.setex(key, window, "1")
-            return True
-        
-        if int(current) >= limit:
-            return False
-            
-        await self.redis.incr(key)
-        return True
+        result = await self.rate_limit(f"{user_id}:{endpoint}", limit, window)
+        return result.allowed
+    
+    # Locks
+    async def acquire_lock(self, key: str, ttl_ms: int) -> bool:
+        """SET NX with an expiry; True if this caller now holds the lock"""
+        return bool(await self.redis.set(f"lock:{key}", "1", nx=True, px=ttl_ms))
+    
+    async def release_lock(self, key: str):
+        """Release a lock taken with acquire_lock"""
+        await self.redis.delete(f"lock:{key}")
     
     # Market Data Caching
     async def cache_market_data(self, symbol: str, data: Dict[str, Any], ttl: int = 30):
@@ -0,0 +1 @@
+# Backtest benchmark suite
@@ -0,0 +1,27 @@
+from typing import Dict, List
+from pydantic import BaseModel, Field
+
+
+class BenchmarkDataset(BaseModel):
+    """Fixed synthetic dataset a benchmark case runs against"""
+    symbols: int = Field(..., description="Number of symbols in the universe")
+    start_date: str = Field(..., description="First calendar day of data")
+    end_date: str = Field(..., description="Last calendar day of data")
+    timeframe: str = Field(..., description="Bar timeframe (1d, 1h, 1m, ...)")
+    
+    @property
+    def symbol_names(self) -> List[str]:
+        """Deterministic symbol names for the universe"""
+        return [f"SYM{i:03d}" for i in range(self.symbols)]
+
+
+DATASETS: Dict[str, BenchmarkDataset] = {
+    'daily_1x1y': BenchmarkDataset(symbols=1, start_date='2023-01-01', end_date='2023-12-31', timeframe='1d'),
+    'daily_50x5y': BenchmarkDataset(symbols=50, start_date='2019-01-01', end_date='2023-12-31', timeframe='1d'),
+    'hourly_100x1y': BenchmarkDataset(symbols=100, start_date='2023-01-01', end_date='2023-12-31', timeframe='1h'),
+    'minute_10x1y': BenchmarkDataset(symbols=10, start_date='2023-01-01', end_date='2023-12-31', timeframe='1m'),
+    'minute_500x5y': BenchmarkDataset(symbols=500, start_date='2019-01-01', end_date='2023-12-31', timeframe='1m'),
+}
+
+# The full-size minute universe needs tens of GB of RAM; run it explicitly
+DEFAULT_CASES = ['daily_1x1y', 'daily_50x5y', 'hourly_100x1y', 'minute_10x1y']
@@ -0,0 +1,261 @@
+"""
+Reproducible backtest benchmarks.
+
+Runs the BacktestEngine, IndicatorFactory and signal evaluation against
+fixed synthetic datasets, records wall time, peak RSS and per-stage timings
+to a JSON history file, and flags regressions against a stored baseline.
+
+Usage (from backend_services/):
+    python src/benchmarks/run_benchmarks.py
+    python src/benchmarks/run_benchmarks.py --cases daily_1x1y minute_10x1y --repeat 3
+    python src/benchmarks/run_benchmarks.py --update-baseline
+    python src/benchmarks/run_benchmarks.py --fail-on-regression
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add the src directory to Python path
+src_path = Path(__file__).parent.parent
+sys.path.insert(0, str(src_path))
+
+from benchmarks.datasets import DATASETS, DEFAULT_CASES
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = Path(__file__).parent
+DEFAULT_HISTORY_PATH = BENCHMARK_DIR / 'results' / 'history.json'
+DEFAULT_BASELINE_PATH = BENCHMARK_DIR / 'baseline.json'
+
+# Seed for the engine's demo entry signals
+SIGNAL_SEED = 1234
+
+# Timings shorter than this are too noisy to flag on their own
+MIN_TIMED_SECONDS = 0.05
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def run_case(case_name: str) -> Dict[str, Any]:
+    """
+    Run one benchmark case. Executed in a fresh process so peak RSS and
+    caches belong to this case only.
+    """
+    import numpy as np
+    import polars as pl
+
+    from models.backtest import BacktestParams
+    from services.backtest.backtest_engine import BacktestEngine
+    from services.backtest.stage_timer import StageTimer
+    from services.indicators.IndicatorFactory import IndicatorFactory
+    from services.synthetic_data import SyntheticMarketGenerator
+
+    dataset = DATASETS[case_name]
+    symbols = dataset.symbol_names
+
+    # No entry/exit conditions selects the engine's seeded demo signals,
+    # so every case opens and closes positions
+    strategy = {
+        'name': f"benchmark_{case_name}",
+        'config': {
+            'symbols': symbols,
+            'timeframe': dataset.timeframe,
+            'entry_conditions': [],
+            'exit_conditions': [],
+            'risk_management': {'risk_per_trade': 0.02, 'max_position_size': 10000},
+        }
+    }
+    params = BacktestParams(
+        strategy_id='000000000000000000000000',
+        initial_capital=100000.0,
+        timeframe=dataset.timeframe,
+        start_date=dataset.start_date,
+        end_date=dataset.end_date,
+        data_provider='synthetic'
+    )
+
+    # Indicator input is built outside the timed region
+    bars = pl.from_arrow(SyntheticMarketGenerator().generate_table(
+        symbols, dataset.start_date, dataset.end_date, dataset.timeframe
+    ))
+
+    np.random.seed(SIGNAL_SEED)
+    timer = StageTimer()
+    engine = BacktestEngine()
+
+    started = time.perf_counter()
+    result = asyncio.run(engine.run_backtest(strategy, params, timer))
+    with timer.stage('indicators'):
+        IndicatorFactory(bars).get_indicators()
+    wall_time = time.perf_counter() - started
+
+    return {
+        'symbols': dataset.symbols,
+        'timeframe': dataset.timeframe,
+        'rows': bars.height,
+        'trades': result.total_trades,
+        'wall_time': round(wall_time, 6),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'stages': timer.as_dict(),
+    }
+
+
+def run_isolated(case_name: str, repeat: int) -> Dict[str, Any]:
+    """Run a case ``repeat`` times, each in a new process, and keep the fastest run"""
+    context = multiprocessing.get_context('spawn')
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs.append(executor.submit(run_case, case_name).result())
+
+    best = min(runs, key=lambda run: run['wall_time'])
+    best['peak_rss_mb'] = max(run['peak_rss_mb'] for run in runs)
+    best['repeat'] = repeat
+    return best
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Any],
+    threshold: float
+) -> List[Dict[str, Any]]:
+    """Compare results to the baseline and list every metric above ``threshold``"""
+    regressions = []
+    baseline_cases = baseline.get('cases', {})
+
+    for case_name, result in results.items():
+        reference = baseline_cases.get(case_name)
+        if not reference:
+            continue
+
+        metrics = {'peak_rss_mb': (result['peak_rss_mb'], reference.get('peak_rss_mb'))}
+        timings = {'wall_time': (result['wall_time'], reference.get('wall_time'))}
+        for stage, seconds in result['stages'].items():
+            timings[f"stages.{stage}"] = (seconds, reference.get('stages', {}).get(stage))
+        for metric, (current, previous) in timings.items():
+            if previous is not None and previous >= MIN_TIMED_SECONDS:
+                metrics[metric] = (current, previous)
+
+        for metric, (current, previous) in metrics.items():
+            if previous and current > previous * (1 + threshold):
+                regressions.append({
+                    'case': case_name,
+                    'metric': metric,
+                    'baseline': previous,
+                    'current': current,
+                    'change_pct': round((current / previous - 1) * 100, 1),
+                })
+
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    """Current git commit, if the source tree is a checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BENCHMARK_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _load_json(path: Path, default: Any) -> Any:
+    if not path.exists():
+        return default
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def _write_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=2)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the backtest benchmark suite")
+    parser.add_argument('--cases', nargs='+', choices=sorted(DATASETS), default=DEFAULT_CASES,
+                        help="Benchmark cases to run")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Runs per case; the fastest run is recorded")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument('--history', type=Path, default=DEFAULT_HISTORY_PATH,
+                        help="JSON file the run is appended to")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE_PATH,
+                        help="JSON file with the reference run")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store this run as the new baseline")
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help="Exit with status 1 when a regression is found")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    results = {}
+    for case_name in args.cases:
+        logger.info(f"Running benchmark case {case_name}")
+        results[case_name] = run_isolated(case_name, args.repeat)
+        result = results[case_name]
+        logger.info(
+            f"{case_name}: {result['wall_time']:.3f}s, {result['peak_rss_mb']:.0f} MB peak, "
+            f"{result['rows']} rows, {result['trades']} trades, stages={result['stages']}"
+        )
+
+    baseline = _load_json(args.baseline, {})
+    regressions = find_regressions(results, baseline, args.threshold)
+
+    run = {
+        'timestamp': datetime.utcnow().isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'threshold': args.threshold,
+        'cases': results,
+        'regressions': regressions,
+    }
+
+    history = _load_json(args.history, [])
+    history.append(run)
+    _write_json(args.history, history)
+    logger.info(f"Appended run to {args.history}")
+
+    if args.update_baseline:
+        _write_json(args.baseline, run)
+        logger.info(f"Stored run as baseline in {args.baseline}")
+
+    if not baseline and not args.update_baseline:
+        logger.info("No baseline found; run with --update-baseline to store one")
+
+    for regression in regressions:
+        logger.warning(
+            f"REGRESSION {regression['case']} {regression['metric']}: "
+            f"{regression['baseline']} -> {regression['current']} (+{regression['change_pct']}%)"
+        )
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
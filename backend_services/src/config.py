@@ -20,6 +20,7 @@ MONGO_PASSWORD = os.getenv("MONGO_PASSWORD", "")
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD", "")
+REDIS_URL = os.getenv("REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/0")
 
 # Alpaca API settings
 ALPACA_API_KEY = os.getenv("ALPACA_API_KEY", "")
@@ -30,6 +31,12 @@ ALPACA_BASE_URL = os.getenv("ALPACA_BASE_URL", "https://paper-api.alpaca.markets
 # Service settings
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", 2))
+# Seconds between batched writes of in-flight backtest progress to MongoDB
+STATUS_FLUSH_INTERVAL = float(os.getenv("STATUS_FLUSH_INTERVAL", 2.0))
+# Memory-mappable bars and indicators of finished backtests, for trade drill-down
+BAR_CACHE_DIR = os.getenv("BAR_CACHE_DIR", "/tmp/bot_club_bar_cache")
+# Bar cache size past which the least recently used entries are evicted; 0 disables eviction
+BAR_CACHE_MAX_BYTES = int(os.getenv("BAR_CACHE_MAX_BYTES", 2 * 1024 ** 3))
 SERVICE_PORT = int(os.getenv("SERVICE_PORT", 8001))  # Different from FastAPI port
 
 # FastAPI service URL for callbacks
@@ -1,15 +1,31 @@
 import asyncio
+import io
 import logging
+import math
 from aiohttp import web
 import json
+import pyarrow.parquet as pq
 from motor.motor_asyncio import AsyncIOMotorClient
 
+# Try to import orjson, fall back to the standard library if not available
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Local imports
 from config import (
     MONGO_HOST, MONGO_PORT, MONGO_URL, MONGO_DB, LOG_LEVEL,
-    SERVICE_PORT
+    SERVICE_PORT, ALPACA_API_KEY, ALPACA_API_SECRET
 )
 from services.backtest.backtest_service import BacktestService
+from services.backtest.downsampling import MIN_DOWNSAMPLE_POINTS
+from services.backtest.series_store import (
+    SERIES_COMPRESSION, SERIES_ROW_GROUP_SIZE, arrow_stream_chunks, parquet_arrow_stream, table_records
+)
+from services.data_providers import DataProviderFactory
+from services.metrics import metrics
+from services.progress_publisher import progress_publisher
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +34,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def finite_floats(obj):
+    """Replace NaN and infinity with None so every encoder writes null"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: finite_floats(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [finite_floats(value) for value in obj]
+    return obj
+
+def json_body_response(obj, status: int = 200) -> web.Response:
+    """
+    JSON response encoded with orjson when available, which encodes large
+    series many times faster. NaN and infinity become null. Values orjson
+    rejects fall back to the standard library encoder, which writes the
+    same null instead of its non-standard NaN.
+    """
+    body = None
+    if orjson is not None:
+        try:
+            body = orjson.dumps(obj, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass
+    if body is None:
+        body = json.dumps(finite_floats(obj), default=str, allow_nan=False).encode()
+    return web.Response(body=body, status=status, content_type='application/json')
+
 class BackendService:
     def __init__(self):
         self.app = web.Application()
@@ -30,11 +73,22 @@ class BackendService:
         # Health check endpoint
         self.app.router.add_get('/health', self.health_check)
         
+        # Prometheus scrape endpoint
+        self.app.router.add_get('/metrics', self.get_metrics)
+        
         # Backtest related endpoints
         self.app.router.add_post('/backtest/run', self.run_backtest)
+        self.app.router.add_post('/backtest/batch', self.run_backtest_batch)
         self.app.router.add_get('/backtest/{backtest_id}/status', self.get_backtest_status)
+        self.app.router.add_get('/backtest/{backtest_id}/flamegraph', self.get_backtest_flamegraph)
+        self.app.router.add_get('/backtest/{backtest_id}/series/{kind}', self.get_backtest_series)
+        self.app.router.add_get('/backtest/{backtest_id}/trades/{trade_index}/context', self.get_trade_context)
+        self.app.router.add_get('/backtest/{backtest_id}/bars/{symbol}', self.get_backtest_bars)
         self.app.router.add_delete('/backtest/{backtest_id}', self.cancel_backtest)
         
+        # Market data
+        self.app.router.add_get('/quote/{symbol}', self.get_quote)
+        
         # Setup middleware
         self.app.middlewares.append(self.error_middleware)
 
@@ -58,6 +112,9 @@ class BackendService:
             }
         })
 
+    async def get_metrics(self, request):
+        return web.Response(text=metrics.render(), content_type='text/plain')
+
     async def run_backtest(self, request):
         try:
             data = await request.json()
@@ -72,6 +129,10 @@ class BackendService:
             # The user_id is passed in the payload from the main backend service
             user_id = data['user_id']
             
+            # Opt-in stack sampling, as a body field or ?profile=true
+            profile = data.get('profile', request.query.get('profile', False))
+            data['profile'] = str(profile).lower() == 'true'
+            
             # Run the backtest
             backtest_id = await self.backtest_service.start_backtest(
                 strategy_id=data['strategy_id'],
@@ -87,12 +148,154 @@ class BackendService:
             logger.error(f"Error starting backtest: {e}")
             return web.json_response({"error": str(e)}, status=500)
 
+    async def run_backtest_batch(self, request):
+        try:
+            data = await request.json()
+            jobs = data.get('jobs')
+            if not data.get('user_id') or not isinstance(jobs, list) or not jobs:
+                return web.json_response({"error": "user_id and a non-empty jobs list are required"}, status=400)
+            
+            required_fields = ['strategy_id', 'initial_capital', 'start_date', 'end_date', 'timeframe']
+            for i, job in enumerate(jobs):
+                if not isinstance(job, dict):
+                    return web.json_response({"error": f"Job {i} must be an object"}, status=400)
+                for field in required_fields:
+                    if field not in job:
+                        return web.json_response({"error": f"Job {i} is missing required field: {field}"}, status=400)
+                job['user_id'] = data['user_id']
+            
+            batch = await self.backtest_service.start_batch(data['user_id'], jobs)
+            return web.json_response({"status": "started", **batch})
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        except Exception as e:
+            logger.error(f"Error starting backtest batch: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+
     async def get_backtest_status(self, request):
         backtest_id = request.match_info['backtest_id']
         status = await self.backtest_service.get_status(backtest_id)
         if not status:
             return web.json_response({"error": "Backtest not found"}, status=404)
-        return web.json_response(status)
+        # Completed results carry ObjectIds, datetimes and possibly an infinite
+        # profit factor, which the stdlib encoder keeps
+        return web.json_response(status, dumps=lambda obj: json.dumps(obj, default=str))
+
+    async def get_backtest_flamegraph(self, request):
+        backtest_id = request.match_info['backtest_id']
+        flamegraph = await self.backtest_service.get_flamegraph(backtest_id)
+        if not flamegraph:
+            return web.json_response({"error": "No profile recorded for this backtest"}, status=404)
+        return web.Response(
+            text=flamegraph['stacks'],
+            content_type='text/plain',
+            headers={
+                'Content-Disposition': f'attachment; filename="{backtest_id}.collapsed"',
+                'X-Profile-Samples': str(flamegraph['samples'])
+            }
+        )
+
+    async def get_backtest_series(self, request):
+        backtest_id = request.match_info['backtest_id']
+        kind = request.match_info['kind']
+        query = request.query
+        
+        # The whole series as stored, or re-encoded as an Arrow IPC stream
+        if query.get('format') in ('parquet', 'arrow'):
+            blob = await self.backtest_service.get_series_blob(backtest_id, kind)
+            if blob is None:
+                return web.json_response({"error": "Series not found"}, status=404)
+            if query['format'] == 'arrow':
+                return await self._stream_chunks(request, parquet_arrow_stream(blob))
+            return web.Response(body=blob, content_type='application/vnd.apache.parquet')
+        
+        try:
+            offset = int(query.get('offset', 0))
+            limit = int(query['limit']) if 'limit' in query else None
+            columns = query['columns'].split(',') if query.get('columns') else None
+            max_points = int(query['max_points']) if 'max_points' in query else None
+            if max_points is not None and max_points < MIN_DOWNSAMPLE_POINTS:
+                raise ValueError(f"max_points must be at least {MIN_DOWNSAMPLE_POINTS}")
+            series = await self.backtest_service.get_series(
+                backtest_id, kind, query.get('start'), query.get('end'), offset, limit, columns, max_points
+            )
+        except (ValueError, KeyError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        if series is None:
+            return web.json_response({"error": "Series not found"}, status=404)
+        
+        table, total_rows = series
+        return json_body_response({
+            "backtest_id": backtest_id,
+            "kind": kind,
+            "total_rows": total_rows,
+            "offset": offset,
+            "rows": table_records(table)
+        })
+
+    async def get_trade_context(self, request):
+        backtest_id = request.match_info['backtest_id']
+        try:
+            trade_index = int(request.match_info['trade_index'])
+            bars = int(request.query.get('bars', 20))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        if trade_index < 0 or not 0 < bars <= 500:
+            return web.json_response({"error": "trade_index must be >= 0 and bars in 1..500"}, status=400)
+        
+        context = await self.backtest_service.get_trade_context(backtest_id, trade_index, bars)
+        if context is None:
+            return web.json_response({"error": "Trade not found"}, status=404)
+        return json_body_response(context)
+
+    async def get_backtest_bars(self, request):
+        backtest_id = request.match_info['backtest_id']
+        symbol = request.match_info['symbol'].upper()
+        fmt = request.query.get('format', 'arrow')
+        if fmt not in ('arrow', 'parquet'):
+            return web.json_response({"error": "format must be arrow or parquet"}, status=400)
+        
+        table = await self.backtest_service.get_bars_table(backtest_id, symbol)
+        if table is None:
+            return web.json_response({"error": "Bars not found"}, status=404)
+        if fmt == 'arrow':
+            return await self._stream_chunks(
+                request, arrow_stream_chunks(table.schema, table.to_batches(max_chunksize=SERIES_ROW_GROUP_SIZE))
+            )
+        
+        def encode():
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer, compression=SERIES_COMPRESSION, row_group_size=SERIES_ROW_GROUP_SIZE)
+            return buffer.getvalue()
+        return web.Response(body=await asyncio.to_thread(encode), content_type='application/vnd.apache.parquet')
+    
+    async def _stream_chunks(self, request, chunks, content_type: str = 'application/vnd.apache.arrow.stream'):
+        """Send an Arrow IPC stream as it is encoded, off the event loop"""
+        response = web.StreamResponse(headers={'Content-Type': content_type})
+        await response.prepare(request)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    async def get_quote(self, request):
+        symbol = request.match_info['symbol'].upper()
+        provider_name = request.query.get('provider', 'yahoo')
+        credentials = {}
+        if provider_name.lower() == 'alpaca':
+            credentials = {'api_key': ALPACA_API_KEY, 'secret_key': ALPACA_API_SECRET}
+        try:
+            provider = DataProviderFactory.get_provider(provider_name, **credentials)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        
+        quote = await provider.get_quote(symbol)
+        if not quote:
+            return web.json_response({"error": "Quote not found"}, status=404)
+        return json_body_response(quote)
 
     async def cancel_backtest(self, request):
         backtest_id = request.match_info['backtest_id']
@@ -107,10 +310,18 @@ class BackendService:
         self.db_client = AsyncIOMotorClient(MONGO_URL)
         self.db = self.db_client[MONGO_DB]
         
+        # Progress events for streaming clients
+        await progress_publisher.connect()
+        
         # Initialize services
         logger.info("Initializing backtest service")
         self.backtest_service = BacktestService(self.db)
         await self.backtest_service.initialize()
+        metrics.gauge(
+            'backtest_active_executions',
+            'Backtests currently running in this service',
+            lambda: len(self.backtest_service.active_backtests)
+        )
         
         logger.info("Backend service started successfully")
 
@@ -119,6 +330,8 @@ class BackendService:
         if self.backtest_service:
             await self.backtest_service.shutdown()
         
+        await progress_publisher.disconnect()
+        
         if self.db_client:
             self.db_client.close()
             logger.info("Database connection closed")
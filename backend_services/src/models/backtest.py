@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
 from pydantic import BaseModel, Field
 from bson import ObjectId
 
@@ -31,6 +31,7 @@ class BacktestResult(BaseModel):
     timeframe: str = Field(..., description="Backtest timeframe")
     trades: List[Dict[str, Any]] = Field(default_factory=list, description="Individual trade details")
     equity_curve: List[Dict[str, Any]] = Field(default_factory=list, description="Equity curve data")
+    bar_cache_key: Optional[str] = Field(None, description="Bar cache entry holding the bars this backtest ran on")
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Config:
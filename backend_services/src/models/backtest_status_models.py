@@ -17,6 +17,7 @@ class BacktestExecution(BaseModel):
     user_id: str = Field(..., description="User ID")
     strategy_id: str = Field(..., description="Strategy ID")
     strategy_name: str = Field(..., description="Strategy name")
+    group_id: Optional[str] = Field(None, description="Batch the execution was submitted with")
     status: BacktestStatus = Field(default=BacktestStatus.PENDING, description="Execution status")
     start_time: datetime = Field(default_factory=datetime.utcnow, description="Start time")
     end_time: Optional[datetime] = Field(None, description="End time")
@@ -24,6 +25,7 @@ class BacktestExecution(BaseModel):
     error_message: Optional[str] = Field(None, description="Error message if failed")
     params: Dict[str, Any] = Field(..., description="Backtest parameters")
     result: Optional[Dict[str, Any]] = Field(None, description="Backtest result")
+    profile: Optional[Dict[str, Any]] = Field(None, description="Per-stage timing profile")
     
     class Config:
         validate_by_name = True
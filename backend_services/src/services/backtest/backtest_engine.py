@@ -1,18 +1,32 @@
 import asyncio
+import time
 import lumibot
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 
 from services.data_providers import DataProviderFactory
+from services.synthetic_data import SyntheticMarketGenerator
 from models.strategy import Strategy, StrategyConfig
 from models.backtest import BacktestParams, BacktestResult
+from .bar_cache import BarCache, bar_cache_key
+from .stage_timer import StageTimer
 
 logger = logging.getLogger(__name__)
 
+NANOSECONDS_PER_DAY = 86_400 * 1_000_000_000
+
+# Simulation progress is reported this many times per run at most
+PROGRESS_REPORTS = 50
+# Equity points sent with each simulation progress report
+PROGRESS_EQUITY_POINTS = 10
+
+# progress(stage, fraction of the stage done, new equity curve points)
+ProgressCallback = Callable[[str, float, List[Dict[str, Any]]], Awaitable[None]]
+
 
 class BacktestEngine:
     """
@@ -21,11 +35,14 @@ class BacktestEngine:
     
     def __init__(self, **kwargs):
         self.data_cache = {}  # Cache for historical data
+        self.bar_cache = BarCache()  # On-disk bars for trade drill-down
         
     async def run_backtest(
         self, 
         strategy: Dict[str, Any], 
-        params: BacktestParams
+        params: BacktestParams,
+        timer: Optional[StageTimer] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> BacktestResult:
         """
         Execute a complete backtest for a given strategy
@@ -33,6 +50,11 @@ class BacktestEngine:
         Args:
             strategy: Strategy configuration and rules
             params: Backtest parameters (dates, capital, etc.)
+            timer: Optional stage timer that receives fetch, signals,
+                simulation and metrics timings, per-symbol fetch times and
+                data cache hits/misses
+            progress: Optional async callback receiving stage changes and
+                simulation progress with partial equity curve points
             
         Returns:
             BacktestResult with performance metrics and trade history
@@ -43,28 +65,49 @@ class BacktestEngine:
         config = strategy.get('config', {})
         symbols = config.get('symbols', ['AAPL'])
         timeframe = params.timeframe or config.get('timeframe', '1d')
+        timer = timer or StageTimer()
         
         # Get historical data
-        data = await self._fetch_historical_data(
-            symbols, 
-            params.start_date, 
-            params.end_date, 
-            timeframe
-        )
+        if progress is not None:
+            await progress('fetch', 0.0, [])
+        with timer.stage('fetch'):
+            data = await self._fetch_historical_data(
+                symbols, 
+                params.start_date, 
+                params.end_date, 
+                timeframe,
+                params.data_provider,
+                timer
+            )
+        
+        # Keep the bars on disk so trade details never re-fetch them
+        bars_key = bar_cache_key(self._data_cache_key(
+            symbols, params.start_date, params.end_date, timeframe, params.data_provider
+        ))
+        if not self.bar_cache.has(bars_key):
+            try:
+                with timer.stage('bar_cache'):
+                    await asyncio.to_thread(self.bar_cache.write, bars_key, data)
+            except Exception as e:
+                logger.warning(f"Could not cache bars for trade details: {e}")
+                bars_key = None
         logger.info(f"these are the params:{params}")
         logger.info(f"type of the `strategy_id`:{type(params.strategy_id)}")
         # Initialize portfolio
         portfolio = Portfolio(initial_capital=params.initial_capital)
         
         # Execute strategy
-        trades = await self._execute_strategy(strategy, data, portfolio)
+        trades = await self._execute_strategy(strategy, data, portfolio, timer, progress)
         
         # Calculate performance metrics
-        metrics = self._calculate_performance_metrics(
-            portfolio, 
-            trades, 
-            params.initial_capital
-        )
+        if progress is not None:
+            await progress('metrics', 0.0, [])
+        with timer.stage('metrics'):
+            metrics = self._calculate_performance_metrics(
+                portfolio, 
+                trades, 
+                params.initial_capital
+            )
         
         # Create result object
         result = BacktestResult(
@@ -77,30 +120,122 @@ class BacktestEngine:
             profit_factor=metrics['profit_factor'],
             initial_capital=params.initial_capital,
             final_capital=portfolio.total_value,
-            start_date=params.start_date,
-            end_date=params.end_date,
+            start_date=str(params.start_date),
+            end_date=str(params.end_date),
             timeframe=timeframe,
             trades=[trade.to_dict() for trade in trades],
-            equity_curve=portfolio.get_equity_curve()
+            equity_curve=portfolio.get_equity_curve(),
+            bar_cache_key=bars_key
         )
         
         logger.info(f"Backtest completed: {len(trades)} trades, {metrics['total_return']:.2%} return")
         return result
         
+    def _data_cache_key(self, symbols: List[str], start_date, end_date, timeframe: str, data_provider: str) -> str:
+        return f"{data_provider}_{'-'.join(symbols)}_{start_date}_{end_date}_{timeframe}"
+        
+    async def preload_data(
+        self,
+        symbol_sets: List[List[str]],
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        data_provider: str = 'yahoo',
+        timer: Optional[StageTimer] = None
+    ) -> None:
+        """
+        Fetch the union of several symbol lists once and seed the data cache
+        and the bar cache for each list, so backtests over the same range
+        share one download and one set of indicator values
+        
+        Args:
+            symbol_sets: Symbol lists of the backtests to prepare
+            start_date: Start of the shared range
+            end_date: End of the shared range
+            timeframe: Bar timeframe
+            data_provider: Data provider name
+            timer: Optional stage timer receiving per-symbol fetch times
+        """
+        timer = timer or StageTimer()
+        pending = {}
+        for symbols in symbol_sets:
+            cache_key = self._data_cache_key(symbols, start_date, end_date, timeframe, data_provider)
+            if cache_key not in self.data_cache:
+                pending[cache_key] = symbols
+                
+        if pending:
+            union = sorted(set().union(*pending.values()))
+            logger.info(f"Preloading data for {len(pending)} symbol sets ({len(union)} symbols)")
+            frames = await self._fetch_symbol_frames(union, start_date, end_date, timeframe, data_provider, timer)
+            for cache_key, symbols in pending.items():
+                if any(symbol in frames for symbol in symbols):
+                    self.data_cache[cache_key] = self._combine_frames(frames, symbols)
+                    
+        # Indicators are computed once per distinct symbol list, before any run needs them
+        for symbols in symbol_sets:
+            cache_key = self._data_cache_key(symbols, start_date, end_date, timeframe, data_provider)
+            bars_key = bar_cache_key(cache_key)
+            if cache_key in self.data_cache and not self.bar_cache.has(bars_key):
+                try:
+                    await asyncio.to_thread(self.bar_cache.write, bars_key, self.data_cache[cache_key])
+                except Exception as e:
+                    logger.warning(f"Could not cache bars for trade details: {e}")
+        
     async def _fetch_historical_data(
         self, 
         symbols: List[str], 
         start_date: str, 
         end_date: str, 
-        timeframe: str
+        timeframe: str,
+        data_provider: str = 'yahoo',
+        timer: Optional[StageTimer] = None
     ) -> pd.DataFrame:
         """Fetch historical price data for the given symbols"""
+        timer = timer or StageTimer()
         
-        cache_key = f"{'-'.join(symbols)}_{start_date}_{end_date}_{timeframe}"
+        cache_key = self._data_cache_key(symbols, start_date, end_date, timeframe, data_provider)
         
         if cache_key in self.data_cache:
             logger.info(f"Using cached data for {symbols}")
+            timer.increment('cache_hits')
             return self.data_cache[cache_key]
+        timer.increment('cache_misses')
+        
+        frames = await self._fetch_symbol_frames(symbols, start_date, end_date, timeframe, data_provider, timer)
+        if not frames:
+            raise ValueError("No data retrieved for any symbols")
+            
+        # Cache the data
+        combined_data = self._combine_frames(frames, symbols)
+        self.data_cache[cache_key] = combined_data
+        
+        logger.info(f"Retrieved {len(combined_data)} data points")
+        return combined_data
+        
+    @staticmethod
+    def _combine_frames(frames: Dict[str, pd.DataFrame], symbols: List[str]) -> pd.DataFrame:
+        """Wide frame of the given symbols, on the bars every one of them has"""
+        return pd.concat([frames[symbol] for symbol in symbols if symbol in frames], axis=1).dropna()
+        
+    async def _fetch_symbol_frames(
+        self,
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+        timeframe: str,
+        data_provider: str,
+        timer: StageTimer
+    ) -> Dict[str, pd.DataFrame]:
+        """Bars of each symbol with ``{symbol}_`` prefixed columns; symbols without data are left out"""
+        if data_provider == 'synthetic':
+            # Offline, seeded data for load and benchmark runs
+            wide = SyntheticMarketGenerator().generate_wide_frame(
+                symbols, start_date, end_date, timeframe
+            )
+            return {
+                symbol: wide[[column for column in wide.columns if column.rsplit('_', 1)[0] == symbol]]
+                for symbol in symbols if f"{symbol}_Close" in wide.columns
+            }
             
         logger.info(f"Fetching data for {symbols} from {start_date} to {end_date}")
         
@@ -117,30 +252,21 @@ class BacktestEngine:
             # Fetch data for each symbol
             all_data = {}
             for symbol in symbols:
+                symbol_start = time.perf_counter()
                 ticker = yf.Ticker(symbol)
                 data = ticker.history(
                     start=start_date,
                     end=end_date,
                     interval=yf_interval
                 )
+                timer.add_symbol_fetch(symbol, time.perf_counter() - symbol_start)
                 
                 if not data.empty:
                     # Add symbol prefix to columns
                     data.columns = [f"{symbol}_{col}" for col in data.columns]
                     all_data[symbol] = data
                     
-            if not all_data:
-                raise ValueError("No data retrieved for any symbols")
-                
-            # Combine all symbol data
-            combined_data = pd.concat(all_data.values(), axis=1)
-            combined_data = combined_data.dropna()
-            
-            # Cache the data
-            self.data_cache[cache_key] = combined_data
-            
-            logger.info(f"Retrieved {len(combined_data)} data points")
-            return combined_data
+            return all_data
             
         except Exception as e:
             logger.error(f"Error fetching data: {e}")
@@ -150,168 +276,224 @@ class BacktestEngine:
         self, 
         strategy: Dict[str, Any], 
         data: pd.DataFrame, 
-        portfolio: 'Portfolio'
+        portfolio: 'Portfolio',
+        timer: Optional[StageTimer] = None,
+        progress: Optional[ProgressCallback] = None
     ) -> List['Trade']:
-        """Execute the trading strategy against historical data"""
+        """
+        Execute the trading strategy against historical data
+        
+        Each bar is evaluated cross-sectionally: exit and entry signals are
+        computed for every symbol as one vector, exits are settled in a batch,
+        and new positions are sized from a single cash snapshot and filled in
+        a deterministic rank order. Results therefore do not depend on the
+        order of ``config['symbols']``.
+        
+        Time spent evaluating signals is reported to ``timer`` as
+        ``signals``; the remaining bar processing as ``simulation``.
+        
+        When ``progress`` is given it is awaited every few bars with the
+        fraction simulated and a sample of the equity curve so far, which
+        also yields the event loop during long simulations.
+        """
+        
+        started = time.perf_counter()
+        signal_time = 0.0
+        report_time = 0.0
         
         config = strategy.get('config', {})
         entry_conditions = config.get('entry_conditions', [])
         exit_conditions = config.get('exit_conditions', [])
         risk_mgmt = config.get('risk_management', {})
         
+        # Canonical symbol order doubles as the allocation ranking
+        symbols = sorted({
+            symbol for symbol in config.get('symbols', ['AAPL'])
+            if f"{symbol}_Close" in data.columns
+        })
+        if not symbols or data.empty:
+            return []
+            
+        closes = data[[f"{symbol}_Close" for symbol in symbols]].to_numpy(dtype=float)
+        timestamps = data.index
+        timestamps_ns = np.asarray(timestamps.as_unit("ns").asi8)
+        
+        book = PositionBook(len(symbols))
         trades = []
-        open_positions = {}
+        cash_history = np.empty(len(closes))
+        invested_history = np.empty(len(closes))
+        report_every = max(len(closes) // PROGRESS_REPORTS, 1)
+        last_reported = 0
         
-        # Process each data point
-        for i, (timestamp, row) in enumerate(data.iterrows()):
+        # Process each bar for the whole universe at once
+        for i, prices in enumerate(closes):
             # Check for exit conditions first
-            for symbol, position in list(open_positions.items()):
-                if self._check_exit_conditions(exit_conditions, row, symbol, position, timestamp):
-                    trade = self._close_position(portfolio, position, row, timestamp)
-                    trades.append(trade)
-                    del open_positions[symbol]
-                    
+            signal_start = time.perf_counter()
+            exits = book.is_open & self._exit_signals(
+                exit_conditions, prices, book, timestamps_ns[i]
+            )
+            signal_time += time.perf_counter() - signal_start
+            if exits.any():
+                trades.extend(self._close_positions(
+                    portfolio, book, symbols, exits, prices, timestamps, i
+                ))
+                
             # Check for entry conditions
-            for symbol in config.get('symbols', ['AAPL']):
-                if symbol not in open_positions:
-                    if self._check_entry_conditions(entry_conditions, row, symbol):
-                        position = self._open_position(
-                            portfolio, 
-                            symbol, 
-                            row, 
-                            timestamp, 
-                            risk_mgmt
-                        )
-                        if position:
-                            open_positions[symbol] = position
+            signal_start = time.perf_counter()
+            entries = ~book.is_open & self._entry_signals(entry_conditions, prices)
+            signal_time += time.perf_counter() - signal_start
+            if entries.any():
+                self._open_positions(
+                    portfolio, book, entries, prices, i, timestamps_ns[i], risk_mgmt
+                )
+                
+            cash_history[i] = portfolio.cash
+            invested_history[i] = book.market_value(prices)
+            
+            if progress is not None and ((i + 1) % report_every == 0 or i + 1 == len(closes)):
+                report_start = time.perf_counter()
+                step = -(-(i + 1 - last_reported) // PROGRESS_EQUITY_POINTS)
+                points = [
+                    {
+                        'timestamp': timestamps[j].isoformat(),
+                        'value': float(cash_history[j] + invested_history[j]),
+                        'cash': float(cash_history[j])
+                    }
+                    for j in range(i, last_reported - 1, -step)[::-1]
+                ]
+                last_reported = i + 1
+                await progress('simulation', (i + 1) / len(closes), points)
+                report_time += time.perf_counter() - report_start
+                
+        portfolio.set_equity_history(timestamps, cash_history, invested_history)
                             
         # Close any remaining open positions at the end
-        final_timestamp = data.index[-1]
-        final_row = data.iloc[-1]
-        for symbol, position in open_positions.items():
-            trade = self._close_position(portfolio, position, final_row, final_timestamp)
-            trades.append(trade)
+        if book.is_open.any():
+            trades.extend(self._close_positions(
+                portfolio, book, symbols, book.is_open.copy(), closes[-1], timestamps, len(closes) - 1
+            ))
+            
+        if timer is not None:
+            timer.add('signals', signal_time)
+            timer.add('simulation', time.perf_counter() - started - signal_time - report_time)
             
         return trades
         
-    def _check_entry_conditions(
+    def _entry_signals(
         self, 
         conditions: List[Dict], 
-        row: pd.Series, 
-        symbol: str
-    ) -> bool:
-        """Check if entry conditions are met"""
-        # Simple example: buy if price is above moving average
+        prices: np.ndarray
+    ) -> np.ndarray:
+        """Evaluate entry conditions for every symbol on the current bar"""
         # In a real implementation, you'd parse the conditions properly
         
         if not conditions:
             # Default condition: random entry for demo
-            return np.random.random() < 0.1  # 10% chance to enter
+            return np.random.random(len(prices)) < 0.1  # 10% chance to enter
             
         # TODO: Implement proper condition checking
-        return False
+        return np.zeros(len(prices), dtype=bool)
         
-    def _check_exit_conditions(
+    def _exit_signals(
         self, 
         conditions: List[Dict], 
-        row: pd.Series, 
-        symbol: str, 
-        position: 'Position',
-        current_time: pd.Timestamp
-    ) -> bool:
-        """Check if exit conditions are met"""
+        prices: np.ndarray, 
+        book: 'PositionBook',
+        current_time_ns: int
+    ) -> np.ndarray:
+        """Evaluate exit conditions for every symbol on the current bar"""
         # Simple example: exit after 5 days or 10% profit/loss
         
-        current_price = row.get(f"{symbol}_Close", 0)
-        if current_price == 0:
-            return False
-            
-        # Calculate current P&L
-        pnl_pct = (current_price - position.entry_price) / position.entry_price
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pnl_pct = (prices - book.entry_price) / book.entry_price
+        days_held = (current_time_ns - book.entry_time_ns) // NANOSECONDS_PER_DAY
         
-        # Exit conditions
-        if abs(pnl_pct) > 0.1:  # 10% profit or loss
-            return True
-            
-        if position.get_days_held(current_time) > 5:  # Hold for max 5 days
-            return True
-            
-        return False
+        return (prices > 0) & (
+            (np.abs(pnl_pct) > 0.1)  # 10% profit or loss
+            | (days_held > 5)        # Hold for max 5 days
+        )
         
-    def _open_position(
+    def _open_positions(
         self, 
         portfolio: 'Portfolio', 
-        symbol: str, 
-        row: pd.Series, 
-        timestamp: pd.Timestamp, 
+        book: 'PositionBook', 
+        entries: np.ndarray, 
+        prices: np.ndarray, 
+        bar_index: int, 
+        bar_time_ns: int, 
         risk_mgmt: Dict
-    ) -> Optional['Position']:
-        """Open a new position"""
+    ) -> None:
+        """Open new positions for every entry signal on the current bar"""
         
-        entry_price = row.get(f"{symbol}_Close", 0)
-        if entry_price <= 0:
-            return None
+        candidates = np.flatnonzero(entries & (prices > 0))
+        if candidates.size == 0:
+            return
             
         # Calculate position size based on risk management
         risk_per_trade = risk_mgmt.get('risk_per_trade', 0.02)  # 2%
         max_position_size = risk_mgmt.get('max_position_size', 10000)
         
-        # Simple position sizing
+        # Every candidate is sized from the same cash snapshot
+        cash = portfolio.cash
         position_value = min(
-            portfolio.cash * risk_per_trade * 10,  # Leverage risk
+            cash * risk_per_trade * 10,  # Leverage risk
             max_position_size,
-            portfolio.cash * 0.95  # Don't use all cash
+            cash * 0.95  # Don't use all cash
         )
         
-        if position_value < entry_price:
-            return None  # Not enough cash
-            
-        shares = int(position_value / entry_price)
-        if shares <= 0:
-            return None
-            
-        total_cost = shares * entry_price
-        
-        if portfolio.cash >= total_cost:
-            portfolio.cash -= total_cost
-            position = Position(
-                symbol=symbol,
-                shares=shares,
-                entry_price=entry_price,
-                entry_time=timestamp,
-                entry_value=total_cost
-            )
-            return position
+        entry_prices = prices[candidates]
+        shares = np.floor(position_value / entry_prices)
+        sized = shares > 0
+        candidates, entry_prices, shares = candidates[sized], entry_prices[sized], shares[sized]
+        
+        # Fill in rank order until the snapshot cash runs out
+        costs = shares * entry_prices
+        filled = np.cumsum(costs) <= cash
+        if not filled.any():
+            return
             
-        return None
+        portfolio.cash -= float(costs[filled].sum())
+        book.open(candidates[filled], shares[filled], entry_prices[filled], costs[filled], bar_index, bar_time_ns)
         
-    def _close_position(
+    def _close_positions(
         self, 
         portfolio: 'Portfolio', 
-        position: 'Position', 
-        row: pd.Series, 
-        timestamp: pd.Timestamp
-    ) -> 'Trade':
-        """Close an existing position"""
-        
-        exit_price = row.get(f"{position.symbol}_Close", position.entry_price)
-        exit_value = position.shares * exit_price
-        
-        portfolio.cash += exit_value
-        
-        # Create trade record
-        trade = Trade(
-            symbol=position.symbol,
-            shares=position.shares,
-            entry_price=position.entry_price,
-            exit_price=exit_price,
-            entry_time=position.entry_time,
-            exit_time=timestamp,
-            pnl=exit_value - position.entry_value,
-            pnl_pct=(exit_price - position.entry_price) / position.entry_price
-        )
+        book: 'PositionBook', 
+        symbols: List[str], 
+        exits: np.ndarray, 
+        prices: np.ndarray, 
+        timestamps: pd.DatetimeIndex, 
+        bar_index: int
+    ) -> List['Trade']:
+        """Close every position flagged in ``exits`` at the current bar"""
+        
+        closed = np.flatnonzero(exits)
+        exit_prices = prices[closed]
+        shares = book.shares[closed]
+        entry_prices = book.entry_price[closed]
+        exit_values = shares * exit_prices
+        pnl = exit_values - book.entry_value[closed]
+        pnl_pct = (exit_prices - entry_prices) / entry_prices
+        
+        portfolio.cash += float(exit_values.sum())
+        
+        exit_time = timestamps[bar_index]
+        trades = [
+            Trade(
+                symbol=symbols[column],
+                shares=int(shares[k]),
+                entry_price=float(entry_prices[k]),
+                exit_price=float(exit_prices[k]),
+                entry_time=timestamps[book.entry_index[column]],
+                exit_time=exit_time,
+                pnl=float(pnl[k]),
+                pnl_pct=float(pnl_pct[k])
+            )
+            for k, column in enumerate(closed)
+        ]
         
-        return trade
+        book.close(closed)
+        return trades
         
     def _calculate_performance_metrics(
         self, 
@@ -368,8 +550,27 @@ class Portfolio:
     def total_value(self) -> float:
         return self.cash
         
+    def set_equity_history(
+        self, 
+        timestamps: pd.DatetimeIndex, 
+        cash: np.ndarray, 
+        invested: np.ndarray
+    ) -> None:
+        """Store the per-bar mark-to-market history produced by the simulation"""
+        self.equity_history = [
+            {
+                'timestamp': timestamp.isoformat(),
+                'value': float(cash_value + invested_value),
+                'cash': float(cash_value)
+            }
+            for timestamp, cash_value, invested_value in zip(timestamps, cash, invested)
+        ]
+        
     def get_equity_curve(self) -> List[Dict[str, Any]]:
         """Get equity curve data"""
+        if self.equity_history:
+            return self.equity_history
+            
         return [
             {
                 'timestamp': datetime.now().isoformat(),
@@ -379,26 +580,44 @@ class Portfolio:
         ]
 
 
-class Position:
-    """Represents an open trading position"""
+class PositionBook:
+    """Open positions for a whole symbol universe, one array slot per symbol"""
     
-    def __init__(
+    def __init__(self, size: int):
+        self.is_open = np.zeros(size, dtype=bool)
+        self.shares = np.zeros(size)
+        self.entry_price = np.full(size, np.nan)
+        self.entry_value = np.zeros(size)
+        self.entry_index = np.zeros(size, dtype=np.int64)
+        self.entry_time_ns = np.zeros(size, dtype=np.int64)
+        
+    def open(
         self, 
-        symbol: str, 
-        shares: int, 
-        entry_price: float, 
-        entry_time: pd.Timestamp,
-        entry_value: float
-    ):
-        self.symbol = symbol
-        self.shares = shares
-        self.entry_price = entry_price
-        self.entry_time = entry_time
-        self.entry_value = entry_value
-        
-    def get_days_held(self, current_time: pd.Timestamp) -> int:
-        """Calculates the number of days the position has been held."""
-        return (current_time - self.entry_time).days
+        columns: np.ndarray, 
+        shares: np.ndarray, 
+        entry_prices: np.ndarray, 
+        entry_values: np.ndarray, 
+        bar_index: int,
+        bar_time_ns: int
+    ) -> None:
+        """Record new positions for the given symbol columns"""
+        self.is_open[columns] = True
+        self.shares[columns] = shares
+        self.entry_price[columns] = entry_prices
+        self.entry_value[columns] = entry_values
+        self.entry_index[columns] = bar_index
+        self.entry_time_ns[columns] = bar_time_ns
+        
+    def close(self, columns: np.ndarray) -> None:
+        """Clear the positions for the given symbol columns"""
+        self.is_open[columns] = False
+        self.shares[columns] = 0
+        self.entry_price[columns] = np.nan
+        self.entry_value[columns] = 0
+        
+    def market_value(self, prices: np.ndarray) -> float:
+        """Mark all open positions to the given prices"""
+        return float(np.dot(self.shares, np.where(self.is_open, prices, 0.0)))
 
 
 class Trade:
@@ -1,26 +1,47 @@
 import asyncio
 import json
 import uuid
-import httpx
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import traceback
+from contextlib import nullcontext
+import bson
+import pyarrow as pa
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from models.backtest import BacktestParams, BacktestResult
 from models.backtest_status_models import BacktestExecution, BacktestStatus
-from config import API_SERVICE_URL
+from config import BACKTEST_WORKERS, STATUS_FLUSH_INTERVAL
+from services.metrics import observe_execution
+from services.progress_publisher import progress_publisher
 from .backtest_engine import BacktestEngine
+from .sampling_profiler import SamplingProfiler
+from .downsampling import downsample_table
+from .series_store import (
+    SERIES_TIME_COLUMNS, SeriesStore, encode_series, read_series, table_records, with_trade_signals
+)
+from .stage_timer import StageTimer
+from .status_buffer import StatusWriteBuffer
 
 logger = logging.getLogger(__name__)
 
+# Overall progress (start, end) covered by each engine stage
+ENGINE_STAGE_PROGRESS = {
+    'fetch': (30, 30, "Fetching market data"),
+    'simulation': (30, 85, "Simulating strategy"),
+    'metrics': (88, 88, "Calculating performance metrics"),
+}
+
 class BacktestService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.active_backtests = {}  # Track running backtests
         self.backtest_engine = BacktestEngine()
+        self.status_buffer = StatusWriteBuffer(db.backtest_executions, STATUS_FLUSH_INTERVAL)
+        self.series_store = SeriesStore(db)
+        self.batch_slots = asyncio.Semaphore(BACKTEST_WORKERS)  # Batch backtests simulated at once
         
     async def initialize(self):
         """Initialize the backtest service"""
@@ -29,6 +50,8 @@ class BacktestService:
         if "backtest_executions" not in await self.db.list_collection_names():
             logger.info("Creating backtest_executions collection")
             await self.db.create_collection("backtest_executions")
+        await self.db.backtest_flamegraphs.create_index("execution_id", unique=True)
+        await self.status_buffer.start()
 
     async def start_backtest(self, strategy_id: str, user_id: str, params: Dict[str, Any]) -> str:
         """
@@ -68,9 +91,117 @@ class BacktestService:
         
         return execution_id
     
+    async def start_batch(self, user_id: str, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Start a group of backtests that share their market data
+        
+        Market data for the union of the jobs' symbols is fetched once per
+        date range, timeframe and provider, and the bars and indicators are
+        cached once per symbol list, before the jobs are simulated at most
+        ``BACKTEST_WORKERS`` at a time.
+        
+        Args:
+            user_id: ID of the user running the backtests
+            jobs: Backtest parameters, each with its strategy_id
+            
+        Returns:
+            The group ID and the execution IDs in job order
+            
+        Raises:
+            ValueError: A strategy was not found; no job is started
+        """
+        group_id = str(uuid.uuid4())
+        
+        strategies = {}
+        for job in jobs:
+            strategy_id = job['strategy_id']
+            if strategy_id not in strategies:
+                strategies[strategy_id] = await self._get_strategy_for_backtest(strategy_id, user_id)
+                if not strategies[strategy_id]:
+                    raise ValueError(f"Strategy not found: {strategy_id}")
+        
+        runs = []
+        for job in jobs:
+            strategy = strategies[job['strategy_id']]
+            execution = BacktestExecution(
+                id=str(uuid.uuid4()),
+                user_id=user_id,
+                strategy_id=job['strategy_id'],
+                strategy_name=strategy.get("name", "Unknown Strategy"),
+                group_id=group_id,
+                status=BacktestStatus.PENDING,
+                params=job
+            )
+            runs.append((execution, strategy))
+        await self.db.backtest_executions.insert_many([execution.dict() for execution, _ in runs])
+        
+        preload = asyncio.create_task(self._preload_batch(runs))
+        for execution, strategy in runs:
+            task = asyncio.create_task(self._run_batch_job(execution.id, strategy, execution.params, preload))
+            self.active_backtests[execution.id] = {
+                "start_time": datetime.utcnow(),
+                "strategy": strategy["name"],
+                "task": task
+            }
+        
+        logger.info(f"Started batch {group_id} with {len(runs)} backtests")
+        return {"group_id": group_id, "backtest_ids": [execution.id for execution, _ in runs]}
+    
+    async def _preload_batch(self, runs: List[tuple]):
+        """Fetch and cache the data of a batch; a failure is left for each job to report"""
+        # Keyed the way each run will look its data up
+        ranges = {}
+        for execution, strategy in runs:
+            try:
+                params = self._backtest_params(execution.params)
+            except Exception:
+                continue
+            config = strategy.get('config', {})
+            data_range = (
+                params.start_date,
+                params.end_date,
+                params.timeframe or config.get('timeframe', '1d'),
+                params.data_provider
+            )
+            ranges.setdefault(data_range, []).append(config.get('symbols', ['AAPL']))
+        
+        for (start_date, end_date, timeframe, data_provider), symbol_sets in ranges.items():
+            try:
+                await self.backtest_engine.preload_data(symbol_sets, start_date, end_date, timeframe, data_provider)
+            except Exception as e:
+                logger.warning(f"Could not preload batch data for {start_date}..{end_date}: {e}")
+    
+    async def _run_batch_job(self, execution_id: str, strategy: Dict, params: Dict, preload: asyncio.Task):
+        """Run one backtest of a batch once its data is loaded and a worker slot is free"""
+        try:
+            await asyncio.shield(preload)
+            async with self.batch_slots:
+                await self._run_backtest_with_engine(execution_id, strategy, params)
+        except asyncio.CancelledError:
+            # Cancelled while queued; a started run records its own cancellation
+            self.active_backtests.pop(execution_id, None)
+            await self._update_execution_status(
+                execution_id,
+                BacktestStatus.CANCELLED,
+                0,
+                "Backtest was cancelled"
+            )
+    
+    @staticmethod
+    def _backtest_params(params: Dict) -> BacktestParams:
+        return BacktestParams(
+            strategy_id=params.get('strategy_id'),  # Use the strategy_id from params instead of strategy['_id']
+            start_date=params.get('start_date'),
+            end_date=params.get('end_date'),
+            initial_capital=params.get('initial_capital', 100000.0),
+            timeframe=params.get('timeframe', '1d'),
+            data_provider=params.get('data_provider', 'mock')  # Add the missing data_provider
+        )
+    
     async def _run_backtest_with_engine(self, execution_id: str, strategy: Dict, params: Dict):
         """Run backtest using the proper backtest engine"""
         logger.info(f"Starting backtest {execution_id} for strategy {strategy['name']}")
+        timer = StageTimer()
         
         try:
             # Track this backtest as active
@@ -84,14 +215,7 @@ class BacktestService:
             await self._update_execution_status(execution_id, BacktestStatus.RUNNING, 10)
             
             # Create BacktestParams object
-            backtest_params = BacktestParams(
-                strategy_id=params.get('strategy_id'),  # Use the strategy_id from params instead of strategy['_id']
-                start_date=params.get('start_date'),
-                end_date=params.get('end_date'),
-                initial_capital=params.get('initial_capital', 100000.0),
-                timeframe=params.get('timeframe', '1d'),
-                data_provider=params.get('data_provider', 'mock')  # Add the missing data_provider
-            )
+            backtest_params = self._backtest_params(params)
             
             # Update status
             await self._update_execution_status(
@@ -101,8 +225,27 @@ class BacktestService:
                 "Initializing backtest engine"
             )
             
-            # Run the actual backtest
-            result = await self.backtest_engine.run_backtest(strategy, backtest_params)
+            async def report_progress(stage: str, fraction: float, equity_points: List[Dict[str, Any]]):
+                start, end, message = ENGINE_STAGE_PROGRESS[stage]
+                await self._update_execution_status(
+                    execution_id,
+                    BacktestStatus.RUNNING,
+                    start + int((end - start) * fraction),
+                    message,
+                    stage=stage,
+                    equity_points=equity_points
+                )
+            
+            # Run the actual backtest, sampling its stacks when requested
+            profiler = SamplingProfiler() if params.get('profile') else None
+            try:
+                with profiler or nullcontext():
+                    result = await self.backtest_engine.run_backtest(
+                        strategy, backtest_params, timer, report_progress
+                    )
+            finally:
+                if profiler:
+                    await self._save_flamegraph(execution_id, profiler)
             
             # Update status
             await self._update_execution_status(
@@ -112,67 +255,206 @@ class BacktestService:
                 "Saving results"
             )
             
-            # Save result to main backend database via API call
-            await self._save_result_to_backend(strategy['_id'], result)
+            with timer.stage('serialization'):
+                result_doc = result.dict()
+            
+            # Trades and the equity curve go to compressed Parquet blobs; the result keeps references
+            with timer.stage('series_storage'):
+                result_doc['series'] = await self.series_store.save_result_series(execution_id, result_doc)
+            timer.increment(
+                'mongo_bytes_written',
+                len(bson.encode({"result": result_doc}))
+                + sum(ref['bytes'] for ref in result_doc['series'].values())
+                + sum(level['bytes'] for level in result_doc['series']['equity_curve']['zoom'].values())
+            )
             
             # Complete the backtest
+            profile = timer.as_profile()
             await self._update_execution_status(
                 execution_id, 
                 BacktestStatus.COMPLETED, 
                 100, 
                 "Backtest completed successfully",
-                result.dict()
+                result_doc,
+                profile
             )
+            observe_execution(BacktestStatus.COMPLETED.value, profile)
             
             logger.info(f"Backtest {execution_id} completed successfully")
             
         except asyncio.CancelledError:
             logger.warning(f"Backtest {execution_id} was cancelled")
+            profile = timer.as_profile()
             await self._update_execution_status(
                 execution_id, 
                 BacktestStatus.CANCELLED, 
                 0, 
-                "Backtest was cancelled"
+                "Backtest was cancelled",
+                profile=profile
             )
+            observe_execution(BacktestStatus.CANCELLED.value, profile)
             
         except Exception as e:
             error_msg = f"Backtest failed: {str(e)}"
             logger.error(f"Error in backtest {execution_id}: {error_msg}")
             logger.error(traceback.format_exc())
+            profile = timer.as_profile()
             await self._update_execution_status(
                 execution_id, 
                 BacktestStatus.FAILED, 
                 0, 
-                error_msg
+                error_msg,
+                profile=profile
             )
+            observe_execution(BacktestStatus.FAILED.value, profile)
             
         finally:
             # Remove from active backtests
             if execution_id in self.active_backtests:
                 del self.active_backtests[execution_id]
     
-    async def _save_result_to_backend(self, strategy_id: str, result: BacktestResult):
-        """Save backtest result to the main backend database"""
+    async def _save_flamegraph(self, execution_id: str, profiler: SamplingProfiler):
+        """Store the collapsed stacks of a profiled run"""
         try:
-            # Convert result to dict for API call
-            result_data = result.dict()
-            result_data['strategy_id'] = str(strategy_id)
-            
-            # Make API call to backend to save the result
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{API_SERVICE_URL}/api/backtest/save_result",
-                    json=result_data,
-                    timeout=30.0
-                )
-                
-                if response.status_code == 200:
-                    logger.info(f"Successfully saved backtest result for strategy {strategy_id}")
-                else:
-                    logger.error(f"Failed to save backtest result: {response.status_code} - {response.text}")
-                    
+            await self.db.backtest_flamegraphs.update_one(
+                {"execution_id": execution_id},
+                {"$set": {
+                    "execution_id": execution_id,
+                    "format": "collapsed",
+                    "interval": profiler.interval,
+                    "samples": profiler.sample_count,
+                    "duration": round(profiler.duration, 6),
+                    "stacks": profiler.collapsed(),
+                    "created_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+            logger.info(f"Saved flamegraph for backtest {execution_id} ({profiler.sample_count} samples)")
         except Exception as e:
-            logger.error(f"Error saving backtest result to backend: {e}")
+            logger.error(f"Error saving flamegraph for backtest {execution_id}: {e}")
+    
+    async def get_flamegraph(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """Get the collapsed-stack profile of a backtest run with profile=true"""
+        return await self.db.backtest_flamegraphs.find_one(
+            {"execution_id": backtest_id},
+            {"_id": 0}
+        )
+    
+    async def get_series(
+        self,
+        backtest_id: str,
+        kind: str,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        columns: Optional[List[str]] = None,
+        max_points: Optional[int] = None
+    ):
+        """
+        Read a time or row range of a result series (trades or equity_curve)
+        
+        With max_points, the equity curve is reduced with LTTB. Whole-curve
+        reads start from the smallest precomputed zoom level that still has
+        enough points, so chart loads do not depend on the backtest length.
+        
+        Returns:
+            The slice as an Arrow table and the total row count of the series,
+            or None if the backtest has no such series
+        """
+        if kind not in SERIES_TIME_COLUMNS:
+            raise ValueError(f"Unknown series: {kind}")
+        execution = await self.db.backtest_executions.find_one(
+            {"id": backtest_id},
+            {f"result.series.{kind}": 1, f"result.{kind}": 1}
+        )
+        result = (execution or {}).get("result") or {}
+        
+        downsample = bool(max_points) and kind == "equity_curve"
+        read_columns = None if downsample else columns
+        
+        ref = result.get("series", {}).get(kind)
+        if ref:
+            source = ref
+            if downsample and start is None and end is None and not offset and limit is None:
+                levels = sorted(ref.get("zoom", {}).items(), key=lambda level: int(level[0]))
+                source = next((level for points, level in levels if int(points) >= max_points), ref)
+            table = await self.series_store.read(kind, source, start, end, offset, limit, read_columns)
+            total_rows = ref["rows"]
+        elif kind in result:
+            # Results saved before series storage keep the records inline
+            blob, ref = encode_series(kind, result[kind])
+            table = read_series(kind, blob, start, end, offset, limit, read_columns)
+            total_rows = ref["rows"]
+        else:
+            return None
+        
+        if downsample:
+            table = downsample_table(table, "timestamp", "value", max_points)
+            if columns:
+                table = table.select(columns)
+        return table, total_rows
+    
+    async def get_trade_context(self, backtest_id: str, trade_index: int, bars: int = 20) -> Optional[Dict[str, Any]]:
+        """
+        A trade with the cached bars and indicator values around its entry
+        and exit, read from the bar cache without touching a data provider
+        
+        Returns:
+            None if the backtest or trade does not exist; entry_bars and
+            exit_bars are None when the bars are no longer cached
+        """
+        execution = await self.db.backtest_executions.find_one(
+            {"id": backtest_id},
+            {"result.bar_cache_key": 1}
+        )
+        series = await self.get_series(backtest_id, "trades", offset=trade_index, limit=1)
+        if not execution or not series or series[0].num_rows == 0:
+            return None
+        
+        trade = table_records(series[0])[0]
+        key = (execution.get("result") or {}).get("bar_cache_key")
+        bar_cache = self.backtest_engine.bar_cache
+        entry_bars = exit_bars = None
+        if key:
+            entry_bars = await asyncio.to_thread(bar_cache.window, key, trade["symbol"], trade["entry_time"], bars)
+            if trade.get("exit_time"):
+                exit_bars = await asyncio.to_thread(bar_cache.window, key, trade["symbol"], trade["exit_time"], bars)
+        return {"trade": trade, "entry_bars": entry_bars, "exit_bars": exit_bars}
+    
+    async def get_series_blob(self, backtest_id: str, kind: str) -> Optional[bytes]:
+        """The stored Parquet blob of a result series"""
+        execution = await self.db.backtest_executions.find_one(
+            {"id": backtest_id},
+            {f"result.series.{kind}": 1, f"result.{kind}": 1}
+        )
+        result = (execution or {}).get("result") or {}
+        ref = result.get("series", {}).get(kind)
+        if ref:
+            return await self.series_store.read_blob(ref)
+        if kind in result:
+            # Results saved before series storage keep the records inline
+            return encode_series(kind, result[kind])[0]
+        return None
+    
+    async def get_bars_table(self, backtest_id: str, symbol: str) -> Optional[pa.Table]:
+        """
+        The cached bars and indicator values a backtest ran on for one
+        symbol, with its per-bar entry and exit signals, or None if the
+        backtest is unknown or its bars were evicted
+        """
+        execution = await self.db.backtest_executions.find_one(
+            {"id": backtest_id},
+            {"result.bar_cache_key": 1}
+        )
+        key = ((execution or {}).get("result") or {}).get("bar_cache_key")
+        if not key:
+            return None
+        bars = await asyncio.to_thread(self.backtest_engine.bar_cache.table, key, symbol)
+        trades = await self.get_series(backtest_id, "trades")
+        if bars is None or trades is None:
+            return bars
+        return await asyncio.to_thread(with_trade_signals, bars, trades[0], symbol)
     
     async def _update_execution_status(
         self, 
@@ -180,9 +462,18 @@ class BacktestService:
         status: BacktestStatus, 
         progress: int, 
         message: str = None,
-        result: Dict = None
+        result: Dict = None,
+        profile: Dict = None,
+        stage: str = None,
+        equity_points: List[Dict[str, Any]] = None
     ):
-        """Update the status of a backtest execution in the database"""
+        """
+        Update the status of a backtest execution and publish it to
+        progress subscribers
+        
+        In-flight progress is buffered and written to the database in
+        batches; terminal states are written before this returns.
+        """
         update = {
             "status": status.value,
             "progress": progress,
@@ -192,55 +483,60 @@ class BacktestService:
         if message:
             update["message"] = message
             
+        if stage:
+            update["stage"] = stage
+            
         if result:
             update["result"] = result
             
-        if status in [BacktestStatus.COMPLETED, BacktestStatus.FAILED, BacktestStatus.CANCELLED]:
-            update["end_time"] = datetime.utcnow()
+        if profile:
+            update["profile"] = profile
             
-        await self.db.backtest_executions.update_one(
-            {"id": execution_id},
-            {"$set": update}
-        )
+        terminal = status in [BacktestStatus.COMPLETED, BacktestStatus.FAILED, BacktestStatus.CANCELLED]
+        if terminal:
+            update["end_time"] = datetime.utcnow()
+            try:
+                await self.status_buffer.write(execution_id, update)
+            except Exception as e:
+                # Kept in the buffer; the flush loop retries it
+                logger.error(f"Error writing final status of backtest {execution_id}: {e}")
+        else:
+            self.status_buffer.update(execution_id, update)
+        
+        # Stream a light event; results and profiles stay in MongoDB
+        event = {
+            "status": status.value,
+            "progress": progress,
+            "stage": stage,
+            "message": message,
+            "updated_at": update["updated_at"].isoformat()
+        }
+        if equity_points:
+            event["equity_points"] = equity_points
+        await progress_publisher.publish(execution_id, event)
     
     async def _get_strategy_for_backtest(self, strategy_id: str, user_id: str):
-        """Find a strategy for backtest, checking both custom and default strategies"""
+        """Find a strategy for backtest among the user's and the default strategies in one query"""
         try:
             strategy_obj_id = ObjectId(strategy_id)
+            user_obj_id = ObjectId(user_id)
         except Exception:
-            logger.error(f"Invalid ObjectId format for strategy: {strategy_id}")
+            logger.error(f"Invalid ObjectId format for strategy {strategy_id} or user {user_id}")
             return None
 
-        # First try as a default strategy (no user required)
-        default_strategy = await self.db.default_strategies.find_one({"_id": strategy_obj_id})
-        if default_strategy:
-            logger.info(f"Found default strategy: {default_strategy['name']}")
-            return default_strategy
-
-        # Try to convert user_id to ObjectId for user strategy lookup
-        try:
-            user_obj_id = ObjectId(user_id)
-        except Exception:
-            # If user_id is not an ObjectId, try as string
-            user_strategy = await self.db.strategy.find_one({
-                "_id": strategy_obj_id,
-                "user_id": user_id
-            })
-            if user_strategy:
-                logger.info(f"Found user strategy: {user_strategy['name']}")
-                return user_strategy
-        else:
-            # Try as a user strategy with ObjectId user_id
-            user_strategy = await self.db.strategy.find_one({
-                "_id": strategy_obj_id,
-                "$or": [
-                    {"user_id": user_obj_id},
-                    {"user_id": user_id}
-                ]
-            })
-            if user_strategy:
-                logger.info(f"Found user strategy: {user_strategy['name']}")
-                return user_strategy
+        # user_id is stored as an ObjectId in the strategy collection
+        pipeline = [
+            {"$match": {"_id": strategy_obj_id, "user_id": user_obj_id}},
+            {"$unionWith": {
+                "coll": "default_strategies",
+                "pipeline": [{"$match": {"_id": strategy_obj_id}}]
+            }},
+            {"$limit": 1}
+        ]
+        strategies = await self.db.strategy.aggregate(pipeline).to_list(length=1)
+        if strategies:
+            logger.info(f"Found strategy: {strategies[0].get('name')}")
+            return strategies[0]
             
         logger.warning(f"Strategy not found with ID: {strategy_id}")
         return None
@@ -336,6 +632,9 @@ class BacktestService:
         if not result:
             return None
             
+        # Progress that has not been flushed yet is newer than the stored document
+        result.update(self.status_buffer.peek(backtest_id))
+        
         # Convert ObjectId to string for JSON serialization
         if "_id" in result and isinstance(result["_id"], ObjectId):
             result["_id"] = str(result["_id"])
@@ -376,4 +675,10 @@ class BacktestService:
         if active_tasks:
             await asyncio.gather(*active_tasks, return_exceptions=True)
             
+        # Persist the final statuses of the cancelled backtests
+        try:
+            await self.status_buffer.stop()
+        except Exception as e:
+            logger.error(f"Error flushing execution statuses on shutdown: {e}")
+            
         logger.info("Backtest service shutdown complete")
\ No newline at end of file
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from config import BAR_CACHE_DIR, BAR_CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+BAR_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+INDICATOR_COLUMNS = ("sma_20", "ema_20", "rsi_14")
+
+
+def bar_cache_key(data_key: str) -> str:
+    """Directory name for the bars behind one engine data cache key"""
+    return hashlib.sha1(data_key.encode()).hexdigest()[:20]
+
+
+def _rsi(close: pd.Series, period: int = 14) -> pd.Series:
+    delta = close.diff()
+    gain = delta.clip(lower=0).ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+    loss = (-delta.clip(upper=0)).ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def symbol_bars(data: pd.DataFrame, symbol: str) -> pa.Table:
+    """OHLCV and indicator columns of one symbol, with int64 UTC nanosecond timestamps"""
+    close = data[f"{symbol}_Close"].astype(float)
+    columns = {"timestamp": pa.array(data.index.as_unit("ns").asi8, pa.int64())}
+    for field in BAR_FIELDS:
+        if f"{symbol}_{field}" in data:
+            columns[field.lower()] = pa.array(data[f"{symbol}_{field}"].to_numpy(dtype=float))
+    columns["sma_20"] = pa.array(close.rolling(20).mean().to_numpy())
+    columns["ema_20"] = pa.array(close.ewm(span=20, adjust=False).mean().to_numpy())
+    columns["rsi_14"] = pa.array(_rsi(close).to_numpy())
+    return pa.table(columns)
+
+
+class BarCache:
+    """
+    On-disk cache of the bars and indicator values a backtest ran on.
+
+    Each symbol is one uncompressed Arrow IPC file so readers can memory-map
+    it: a window read binary-searches the timestamp column and copies only
+    the rows it returns, touching a few pages regardless of file size.
+
+    The cache is bounded by ``max_bytes``: the mtime of an entry's marker
+    file records its last use, and the least recently used entries are
+    evicted after each write until the cache fits.
+    """
+
+    def __init__(self, root: str = BAR_CACHE_DIR, max_bytes: int = BAR_CACHE_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str, symbol: str) -> Path:
+        return self.root / key / f"{symbol}.arrow"
+
+    def _marker(self, key: str) -> Path:
+        return self.root / key / ".complete"
+
+    def _touch(self, key: str) -> None:
+        """Mark an entry as recently used"""
+        try:
+            os.utime(self._marker(key))
+        except OSError:
+            pass
+
+    def has(self, key: str) -> bool:
+        """Whether every symbol of an entry has been written"""
+        return self._marker(key).exists()
+
+    def write(self, key: str, data: pd.DataFrame) -> None:
+        """
+        Write every symbol of a wide engine frame; files appear atomically.
+        An entry that is already complete is only marked as used.
+        """
+        if self.has(key):
+            self._touch(key)
+            return
+        directory = self.root / key
+        directory.mkdir(parents=True, exist_ok=True)
+        symbols = sorted({column.rsplit("_", 1)[0] for column in data.columns if column.endswith("_Close")})
+        for symbol in symbols:
+            table = symbol_bars(data, symbol)
+            path = self._path(key, symbol)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        self._marker(key).touch()
+        self.evict(keep=key)
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """Last use, size and directory of every complete entry"""
+        entries = []
+        for directory in self.root.iterdir() if self.root.exists() else ():
+            try:
+                used = (directory / ".complete").stat().st_mtime
+                size = sum(path.stat().st_size for path in directory.glob("*.arrow"))
+            except OSError:
+                # Still being written, or removed meanwhile
+                continue
+            entries.append((used, size, directory))
+        return entries
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Remove the least recently used entries until the cache fits in
+        max_bytes, never the entry ``keep``
+
+        Returns:
+            Number of entries removed
+        """
+        if not self.max_bytes:
+            return 0
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, directory in entries:
+            if total <= self.max_bytes:
+                break
+            if directory.name == keep:
+                continue
+            # Readers see the entry as missing first; open memory maps stay valid
+            (directory / ".complete").unlink(missing_ok=True)
+            shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} bar cache entries, {total} bytes remain")
+        return removed
+
+    def table(self, key: str, symbol: str) -> Optional[pa.Table]:
+        """Every cached bar of a symbol, memory-mapped rather than read into memory"""
+        path = self._path(key, symbol)
+        if not path.exists():
+            return None
+        self._touch(key)
+        return ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+
+    def window(self, key: str, symbol: str, at: Any, bars: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rows within ``bars`` bars either side of the bar at or after ``at``
+
+        Returns:
+            The rows with ISO timestamps, or None if the symbol is not cached
+        """
+        path = self._path(key, symbol)
+        if not path.exists():
+            return None
+        self._touch(key)
+
+        timestamp = pd.Timestamp(at)
+        at_ns = (timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp).as_unit("ns").value
+        with pa.memory_map(str(path), "r") as source:
+            table = ipc.open_file(source).read_all()
+            timestamps = table.column("timestamp")
+            timestamps = timestamps.chunk(0) if timestamps.num_chunks == 1 else timestamps.combine_chunks()
+            ns = timestamps.to_numpy(zero_copy_only=True)
+            if len(ns) == 0:
+                return []
+            i = min(int(np.searchsorted(ns, at_ns)), len(ns) - 1)
+            first, last = max(i - bars, 0), min(i + bars + 1, len(ns))
+            rows = table.slice(first, last - first).to_pylist()
+
+        for row in rows:
+            row["timestamp"] = pd.Timestamp(row["timestamp"], tz="UTC").isoformat()
+        return rows
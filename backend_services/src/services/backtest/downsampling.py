@@ -0,0 +1,63 @@
+import numpy as np
+import pyarrow as pa
+
+# Point counts precomputed for the equity curve when a result is saved
+EQUITY_ZOOM_LEVELS = (500, 2000, 8000)
+# Both end points plus at least one bucket
+MIN_DOWNSAMPLE_POINTS = 3
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets
+
+    The first and last points are always kept. The inner points are split
+    into ``max_points - 2`` buckets, and each bucket keeps the point forming
+    the largest triangle with the previously kept point and the average of
+    the next bucket, so peaks and drawdowns survive.
+
+    Args:
+        x: Monotonic x values, e.g. epoch nanoseconds
+        y: Values to preserve the shape of
+        max_points: Number of points to keep, at least MIN_DOWNSAMPLE_POINTS
+    """
+    if max_points < MIN_DOWNSAMPLE_POINTS:
+        raise ValueError(f"max_points must be at least {MIN_DOWNSAMPLE_POINTS}")
+    n = len(x)
+    if max_points >= n:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64) - float(x[0])
+    y = np.asarray(y, dtype=np.float64)
+    # max_points - 1 edges give max_points - 2 non-empty buckets over points 1..n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(max_points - 2):
+        start, stop = edges[i], edges[i + 1]
+        if i == max_points - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            next_stop = edges[i + 2]
+            avg_x, avg_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample_table(table: pa.Table, time_column: str, value_column: str, max_points: int) -> pa.Table:
+    """Rows of a time series table kept by LTTB on one value column"""
+    if table.num_rows <= max_points:
+        return table
+    x = table[time_column].cast(pa.int64()).to_numpy()
+    y = table[value_column].to_numpy(zero_copy_only=False)
+    return table.take(pa.array(lttb_indices(x, y, max_points)))
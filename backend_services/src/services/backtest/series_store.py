@@ -0,0 +1,289 @@
+import asyncio
+import io
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorGridFSBucket
+
+from .downsampling import EQUITY_ZOOM_LEVELS, downsample_table
+
+logger = logging.getLogger(__name__)
+
+SERIES_BUCKET = "backtest_series"
+SERIES_COMPRESSION = "zstd"
+# Rows per Parquet row group; range reads decode only the groups they touch
+SERIES_ROW_GROUP_SIZE = 8192
+
+# Time column of each series, used for range reads; other listed columns are also timestamps
+SERIES_TIME_COLUMNS = {
+    "equity_curve": ("timestamp", ("timestamp",)),
+    "trades": ("entry_time", ("entry_time", "exit_time")),
+}
+
+
+def _utc_timestamp(value: Any) -> pd.Timestamp:
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+
+
+def series_table(kind: str, records: List[Dict[str, Any]]) -> pa.Table:
+    """Columnar form of a list of series records, with parsed UTC timestamps"""
+    frame = pd.DataFrame.from_records(records)
+    for column in SERIES_TIME_COLUMNS[kind][1]:
+        if column in frame:
+            # isoformat() drops zero microseconds, so precision varies row to row
+            frame[column] = pd.to_datetime(frame[column], utc=True, format="ISO8601")
+    return pa.Table.from_pandas(frame, preserve_index=False)
+
+
+def with_trade_signals(bars: pa.Table, trades: pa.Table, symbol: str) -> pa.Table:
+    """
+    Bars of one symbol with boolean entry_signal and exit_signal columns,
+    set on the bars where one of its trades entered or exited
+    """
+    utc = pa.timestamp("ns", "UTC")
+    timestamps = pc.cast(bars["timestamp"], utc)
+    if "symbol" in trades.column_names:
+        trades = trades.filter(pc.equal(trades["symbol"], symbol))
+    for signal, column in (("entry_signal", "entry_time"), ("exit_signal", "exit_time")):
+        times = pa.array([], utc)
+        # A backtest without trades stores a series without columns
+        if column in trades.column_names:
+            times = pc.drop_null(pc.cast(trades[column], utc)).combine_chunks()
+        bars = bars.append_column(signal, pc.is_in(timestamps, value_set=times))
+    return bars
+
+
+def _iso_strings(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """
+    Timestamps formatted like datetime.isoformat(), vectorized: Arrow
+    formats in C, which is far cheaper than building a datetime per value
+    """
+    tz = column.type.tz
+    column = pc.cast(column, pa.timestamp("us", tz), safe=False)
+    strings = pc.strftime(column, format="%Y-%m-%dT%H:%M:%S")
+    # isoformat() leaves out a zero fraction
+    strings = pc.replace_substring_regex(strings, pattern=r"\.000000$", replacement="")
+    if tz is not None:
+        # Series timestamps are stored in UTC
+        strings = pc.binary_join_element_wise(strings, "+00:00", "")
+    return strings
+
+
+def table_records(table: pa.Table) -> List[Dict[str, Any]]:
+    """JSON-ready records with ISO timestamps"""
+    names = table.column_names
+    columns = [
+        (_iso_strings(table[name]) if pa.types.is_timestamp(table.schema.field(name).type) else table[name]).to_pylist()
+        for name in names
+    ]
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def encode_series(kind: str, records: List[Dict[str, Any]]) -> Tuple[bytes, Dict[str, Any]]:
+    """Compressed Parquet bytes of a series and a description of its contents"""
+    return encode_table(kind, series_table(kind, records))
+
+
+def encode_table(kind: str, table: pa.Table) -> Tuple[bytes, Dict[str, Any]]:
+    """Compressed Parquet bytes of a series table and a description of its contents"""
+    buffer = io.BytesIO()
+    pq.write_table(
+        table,
+        buffer,
+        compression=SERIES_COMPRESSION,
+        row_group_size=SERIES_ROW_GROUP_SIZE
+    )
+    blob = buffer.getvalue()
+
+    time_column = SERIES_TIME_COLUMNS[kind][0]
+    ref = {
+        "format": "parquet",
+        "compression": SERIES_COMPRESSION,
+        "rows": table.num_rows,
+        "bytes": len(blob),
+        "columns": table.column_names,
+    }
+    if table.num_rows and time_column in table.column_names:
+        ref["start"] = table[time_column][0].as_py().isoformat()
+        ref["end"] = table[time_column][-1].as_py().isoformat()
+    return blob, ref
+
+
+def read_series(
+    kind: str,
+    blob: bytes,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None
+) -> pa.Table:
+    """Slice of an encoded series; see SeriesStore.read"""
+    parquet = pq.ParquetFile(io.BytesIO(blob))
+    time_column = SERIES_TIME_COLUMNS[kind][0]
+    ranged = start is not None or end is not None
+    lower = _utc_timestamp(start) if start is not None else None
+    upper = _utc_timestamp(end) if end is not None else None
+
+    # Pick row groups from the footer before decoding anything
+    groups = []
+    first_row = 0
+    skipped_rows = 0
+    time_index = parquet.schema_arrow.get_field_index(time_column)
+    for i in range(parquet.num_row_groups):
+        group = parquet.metadata.row_group(i)
+        if ranged and time_index >= 0:
+            stats = group.column(time_index).statistics
+            if stats is not None and stats.has_min_max:
+                if lower is not None and _utc_timestamp(stats.max) < lower:
+                    continue
+                if upper is not None and _utc_timestamp(stats.min) > upper:
+                    continue
+        elif not ranged:
+            last_row = first_row + group.num_rows
+            if last_row <= offset:
+                first_row = last_row
+                skipped_rows = last_row
+                continue
+            if limit is not None and first_row >= offset + limit:
+                break
+            first_row = last_row
+        groups.append(i)
+
+    read_columns = list(columns) if columns else None
+    if ranged and read_columns and time_column not in read_columns:
+        read_columns.append(time_column)
+    table = parquet.read_row_groups(groups, columns=read_columns) if groups else \
+        parquet.schema_arrow.empty_table().select(read_columns or parquet.schema_arrow.names)
+
+    if ranged and time_index >= 0:
+        mask = None
+        if lower is not None:
+            mask = pc.greater_equal(table[time_column], pa.scalar(lower, table[time_column].type))
+        if upper is not None:
+            upper_mask = pc.less_equal(table[time_column], pa.scalar(upper, table[time_column].type))
+            mask = upper_mask if mask is None else pc.and_(mask, upper_mask)
+        table = table.filter(mask)
+        skipped_rows = 0
+
+    table = table.slice(offset - skipped_rows, limit)
+    if columns:
+        table = table.select(list(columns))
+    return table
+
+
+def arrow_stream_chunks(schema: pa.Schema, batches: Iterable[pa.RecordBatch]) -> Iterator[bytes]:
+    """
+    An Arrow IPC stream as one chunk per record batch, so it can be sent
+    while later batches are still being decoded
+    """
+    buffer = io.BytesIO()
+    with ipc.new_stream(pa.PythonFile(buffer, mode="w"), schema) as writer:
+        for batch in batches:
+            writer.write_batch(batch)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    # End-of-stream marker written on close
+    yield buffer.getvalue()
+
+
+def parquet_arrow_stream(blob: bytes) -> Iterator[bytes]:
+    """A stored series re-encoded as an Arrow IPC stream, one row group at a time"""
+    parquet = pq.ParquetFile(io.BytesIO(blob))
+    return arrow_stream_chunks(parquet.schema_arrow, parquet.iter_batches(batch_size=SERIES_ROW_GROUP_SIZE))
+
+
+class SeriesStore:
+    """
+    Stores the bulky time series of a backtest result (trades, equity
+    curve) as compressed Parquet blobs in GridFS.
+
+    The execution document keeps a small reference per series, so it stays
+    far below the 16MB document limit and cheap to read. Reads decode only
+    the row groups that overlap the requested time or row range.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, bucket_name: str = SERIES_BUCKET):
+        self.bucket = AsyncIOMotorGridFSBucket(db, bucket_name=bucket_name)
+
+    async def save(self, execution_id: str, kind: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Write one series and return the reference stored on the result
+
+        Args:
+            execution_id: Backtest execution the series belongs to
+            kind: Series name, a key of SERIES_TIME_COLUMNS
+            records: Rows of the series
+        """
+        return await self._upload(execution_id, kind, kind, *await asyncio.to_thread(encode_series, kind, records))
+
+    async def _upload(self, execution_id: str, kind: str, name: str, blob: bytes, ref: Dict[str, Any]) -> Dict[str, Any]:
+        file_id = await self.bucket.upload_from_stream(
+            f"{execution_id}/{name}.parquet",
+            blob,
+            metadata={"execution_id": execution_id, "kind": kind, **ref}
+        )
+        return {"file_id": str(file_id), **ref}
+
+    async def save_equity_zoom_levels(self, execution_id: str, table: pa.Table) -> Dict[str, Any]:
+        """
+        Store LTTB-downsampled copies of an equity curve, one per zoom level
+        shorter than the curve, keyed by point count
+        """
+        zoom = {}
+        for points in [points for points in EQUITY_ZOOM_LEVELS if points < table.num_rows]:
+            # LTTB and Parquet encoding are CPU-bound; keep them off the event loop
+            blob, ref = await asyncio.to_thread(
+                lambda: encode_table("equity_curve", downsample_table(table, "timestamp", "value", points))
+            )
+            zoom[str(points)] = await self._upload(execution_id, "equity_curve", f"equity_curve.{points}", blob, ref)
+        return zoom
+
+    async def save_result_series(self, execution_id: str, result_doc: Dict[str, Any]) -> Dict[str, Any]:
+        """Move every series out of a result document, returning their references"""
+        series = {}
+        for kind in SERIES_TIME_COLUMNS:
+            records = result_doc.pop(kind, None) or []
+            table = await asyncio.to_thread(series_table, kind, records)
+            series[kind] = await self._upload(execution_id, kind, kind, *await asyncio.to_thread(encode_table, kind, table))
+            if kind == "equity_curve":
+                series[kind]["zoom"] = await self.save_equity_zoom_levels(execution_id, table)
+        return series
+
+    async def read_blob(self, ref: Dict[str, Any]) -> bytes:
+        """Raw Parquet bytes of a stored series"""
+        stream = await self.bucket.open_download_stream(ObjectId(ref["file_id"]))
+        return await stream.read()
+
+    async def read(
+        self,
+        kind: str,
+        ref: Dict[str, Any],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None
+    ) -> pa.Table:
+        """
+        Read a slice of a stored series
+
+        Args:
+            kind: Series name
+            ref: Reference returned by save
+            start: Inclusive lower bound on the series time column
+            end: Inclusive upper bound on the series time column
+            offset: Rows to skip after the time filter
+            limit: Maximum rows to return
+            columns: Columns to decode, all by default
+        """
+        blob = await self.read_blob(ref)
+        return await asyncio.to_thread(read_series, kind, blob, start, end, offset, limit, columns)
@@ -0,0 +1,52 @@
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class StageTimer:
+    """
+    Accumulates wall time per named stage of a backtest run, plus the
+    per-symbol fetch times and counters that make up an execution profile
+    """
+    
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.symbol_fetch: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time the enclosed block and add it to ``name``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+            
+    def add(self, name: str, seconds: float) -> None:
+        """Add ``seconds`` to the running total for ``name``"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        
+    def add_symbol_fetch(self, symbol: str, seconds: float) -> None:
+        """Record how long fetching one symbol took"""
+        self.symbol_fetch[symbol] = self.symbol_fetch.get(symbol, 0.0) + seconds
+        
+    def increment(self, name: str, amount: int = 1) -> None:
+        """Bump a counter such as ``cache_hits`` or ``mongo_bytes_written``"""
+        self.counters[name] = self.counters.get(name, 0) + amount
+        
+    def as_dict(self) -> Dict[str, float]:
+        """Stage totals in seconds, rounded for storage"""
+        return {name: round(seconds, 6) for name, seconds in self.stages.items()}
+        
+    def as_profile(self) -> Dict[str, Any]:
+        """Structured profile stored on the execution document"""
+        return {
+            "total_seconds": round(time.perf_counter() - self._started, 6),
+            "stages": self.as_dict(),
+            "symbol_fetch_seconds": {
+                symbol: round(seconds, 6) for symbol, seconds in self.symbol_fetch.items()
+            },
+            "counters": dict(self.counters),
+        }
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from services.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+status_updates_total = metrics.counter(
+    "backtest_status_updates_total", "Execution status updates received by the write-behind buffer"
+)
+status_writes_total = metrics.counter(
+    "backtest_status_writes_total", "Execution status updates written to MongoDB after coalescing"
+)
+
+
+class StatusWriteBuffer:
+    """
+    Write-behind buffer for execution status updates.
+
+    Updates for the same execution are coalesced in memory and written with
+    one unordered ``bulk_write`` per flush. Flushes run every
+    ``flush_interval`` seconds and immediately for terminal states, so
+    final results are durable by the time the caller continues.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, flush_interval: float = 1.0):
+        self.collection = collection
+        self.flush_interval = flush_interval
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write whatever is still pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing execution statuses: {e}")
+
+    def update(self, execution_id: str, fields: Dict[str, Any]) -> None:
+        """Queue fields to ``$set`` on an execution; newer values win"""
+        self.pending.setdefault(execution_id, {}).update(fields)
+        status_updates_total.inc()
+
+    async def write(self, execution_id: str, fields: Dict[str, Any]) -> None:
+        """Queue fields and flush right away, for updates that must be durable"""
+        self.update(execution_id, fields)
+        await self.flush()
+
+    def peek(self, execution_id: str) -> Dict[str, Any]:
+        """Fields not yet written to MongoDB for an execution"""
+        return dict(self.pending.get(execution_id, {}))
+
+    async def flush(self) -> int:
+        """
+        Write all pending updates in one bulk operation.
+
+        On failure the batch is put back under any newer updates and the
+        error is re-raised.
+        """
+        async with self._flush_lock:
+            if not self.pending:
+                return 0
+
+            batch, self.pending = self.pending, {}
+            operations = [
+                UpdateOne({"id": execution_id}, {"$set": fields})
+                for execution_id, fields in batch.items()
+            ]
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except Exception:
+                for execution_id, fields in batch.items():
+                    self.pending[execution_id] = {**fields, **self.pending.get(execution_id, {})}
+                raise
+
+            status_writes_total.inc(len(operations))
+            return len(operations)
@@ -0,0 +1,160 @@
+"""
+Minimal in-process metrics rendered in the Prometheus text exposition format
+"""
+import bisect
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds in seconds for stage duration histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    rendered = []
+    for name, value in pairs:
+        value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        rendered.append(f'{name}="{value}"')
+    return "{" + ",".join(rendered) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing value per label set"""
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.callback())}",
+        ]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[LabelKey, Dict[str, object]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        series = self.values.setdefault(
+            key, {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+        )
+        series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series["counts"]):
+                cumulative += count
+                le = ("le", _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds the service's metrics and renders them for a /metrics scrape"""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, documentation, buckets))
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float]) -> Gauge:
+        self.metrics[name] = Gauge(name, documentation, callback)
+        return self.metrics[name]
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry instance
+metrics = MetricsRegistry()
+
+backtest_executions_total = metrics.counter(
+    "backtest_executions_total", "Finished backtest executions by final status"
+)
+backtest_stage_seconds = metrics.histogram(
+    "backtest_stage_seconds", "Wall time spent in each backtest stage"
+)
+backtest_symbol_fetch_seconds = metrics.histogram(
+    "backtest_symbol_fetch_seconds", "Wall time spent fetching market data for one symbol"
+)
+backtest_data_cache_total = metrics.counter(
+    "backtest_data_cache_total", "Market data cache lookups by result"
+)
+backtest_mongo_bytes_written_total = metrics.counter(
+    "backtest_mongo_bytes_written_total", "BSON bytes of backtest results written to MongoDB"
+)
+
+
+def observe_execution(status: str, profile: Dict) -> None:
+    """Fold one execution profile into the service-wide metrics"""
+    backtest_executions_total.inc(status=status)
+
+    for stage, seconds in profile.get("stages", {}).items():
+        backtest_stage_seconds.observe(seconds, stage=stage)
+    for seconds in profile.get("symbol_fetch_seconds", {}).values():
+        backtest_symbol_fetch_seconds.observe(seconds)
+
+    counters = profile.get("counters", {})
+    if counters.get("cache_hits"):
+        backtest_data_cache_total.inc(counters["cache_hits"], result="hit")
+    if counters.get("cache_misses"):
+        backtest_data_cache_total.inc(counters["cache_misses"], result="miss")
+    if counters.get("mongo_bytes_written"):
+        backtest_mongo_bytes_written_total.inc(counters["mongo_bytes_written"])
@@ -0,0 +1,75 @@
+import json
+import logging
+from typing import Any, Dict, Optional
+
+# Redis is optional; without it progress is only stored in MongoDB
+try:
+    import redis.asyncio as redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+from config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Single channel shared by all executions; each backend replica holds one subscription
+PROGRESS_CHANNEL = "backtest_progress"
+SNAPSHOT_TTL_SECONDS = 86400
+SNAPSHOT_FIELDS = ("status", "progress", "stage", "message", "updated_at")
+
+
+def snapshot_key(execution_id: str) -> str:
+    """Redis hash holding the latest progress of an execution"""
+    return f"backtest:execution:{execution_id}"
+
+
+class ProgressPublisher:
+    """
+    Publishes backtest progress events to Redis pub/sub and keeps the latest
+    state of every execution in a Redis hash for late subscribers
+    """
+
+    def __init__(self, redis_url: str = REDIS_URL):
+        self.redis_url = redis_url
+        self.redis = None
+
+    async def connect(self):
+        if not REDIS_AVAILABLE:
+            logger.warning("redis package not installed; progress events disabled")
+            return
+        try:
+            self.redis = redis.from_url(self.redis_url, decode_responses=True)
+            await self.redis.ping()
+            logger.info("Progress publisher connected to Redis")
+        except Exception as e:
+            logger.warning(f"Failed to connect to Redis: {e}. Progress events disabled")
+            self.redis = None
+
+    async def disconnect(self):
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+
+    async def publish(self, execution_id: str, event: Dict[str, Any]) -> None:
+        """Store the snapshot and publish the event; failures never reach the backtest"""
+        if self.redis is None:
+            return
+
+        snapshot = {
+            field: str(event[field]) for field in SNAPSHOT_FIELDS
+            if event.get(field) is not None
+        }
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(snapshot_key(execution_id), mapping=snapshot)
+            pipe.expire(snapshot_key(execution_id), SNAPSHOT_TTL_SECONDS)
+            pipe.publish(PROGRESS_CHANNEL, json.dumps({"execution_id": execution_id, **event}, default=str))
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to publish progress for {execution_id}: {e}")
+
+
+# Global progress publisher instance
+progress_publisher = ProgressPublisher()
@@ -0,0 +1,271 @@
+"""
+Vectorized synthetic market data for load and benchmark testing
+"""
+import logging
+import zlib
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.tseries.holiday import USFederalHolidayCalendar
+
+logger = logging.getLogger(__name__)
+
+# Regular US equity session, in exchange local time
+SESSION_TIMEZONE = "America/New_York"
+SESSION_OPEN_MINUTES = 9 * 60 + 30
+SESSION_LENGTH_MINUTES = 390
+TRADING_DAYS_PER_YEAR = 252
+
+# Bar size in minutes for every supported timeframe
+TIMEFRAME_MINUTES = {
+    '1m': 1,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '1h': 60,
+    '60m': 60,
+    '1d': SESSION_LENGTH_MINUTES,
+    '1D': SESSION_LENGTH_MINUTES,
+}
+
+ARROW_SCHEMA = pa.schema([
+    ('symbol', pa.dictionary(pa.int32(), pa.string())),
+    ('timestamp', pa.timestamp('ns', tz=SESSION_TIMEZONE)),
+    ('open', pa.float64()),
+    ('high', pa.float64()),
+    ('low', pa.float64()),
+    ('close', pa.float64()),
+    ('volume', pa.int64()),
+])
+
+
+def trading_calendar(
+    start_date: Union[str, pd.Timestamp],
+    end_date: Union[str, pd.Timestamp],
+    timeframe: str = '1d'
+) -> pd.DatetimeIndex:
+    """
+    Build the bar timestamps for a date range.
+
+    Weekends and US federal holidays (a stand-in for the exchange calendar)
+    are skipped. Daily bars are stamped at midnight, intraday bars at the
+    start of each interval of the 09:30-16:00 session.
+    """
+    if timeframe not in TIMEFRAME_MINUTES:
+        raise ValueError(f"Unsupported timeframe for synthetic data: {timeframe}")
+
+    holidays = USFederalHolidayCalendar().holidays(start=start_date, end=end_date)
+    days = pd.bdate_range(start=start_date, end=end_date, freq='C', holidays=holidays)
+
+    bar_minutes = TIMEFRAME_MINUTES[timeframe]
+    if bar_minutes >= SESSION_LENGTH_MINUTES:
+        return days.tz_localize(SESSION_TIMEZONE)
+
+    offsets = SESSION_OPEN_MINUTES + np.arange(0, SESSION_LENGTH_MINUTES, bar_minutes)
+    stamps = (
+        days.values.astype('datetime64[m]')[:, None]
+        + offsets.astype('timedelta64[m]')[None, :]
+    ).ravel()
+    return pd.DatetimeIndex(stamps).tz_localize(SESSION_TIMEZONE)
+
+
+class SyntheticMarketGenerator:
+    """
+    Seeded generator of multi-symbol OHLCV bars.
+
+    Prices follow a geometric Brownian motion with Merton-style jumps, volumes
+    follow a U-shaped intraday profile scaled by the size of each move. Every
+    symbol draws from its own seed derived from ``seed`` and the symbol name,
+    so a symbol's series does not change when the universe around it does.
+    """
+
+    def __init__(
+        self,
+        seed: int = 42,
+        drift: float = 0.07,
+        volatility: float = 0.25,
+        jump_intensity: float = 4.0,
+        jump_mean: float = -0.01,
+        jump_std: float = 0.04,
+        base_volume: float = 1_000_000
+    ):
+        """
+        Args:
+            seed: Root seed for all random draws
+            drift: Mean annualized drift across symbols
+            volatility: Mean annualized volatility across symbols
+            jump_intensity: Expected number of jumps per year
+            jump_mean: Mean log jump size
+            jump_std: Standard deviation of the log jump size
+            base_volume: Mean daily volume across symbols
+        """
+        self.seed = seed
+        self.drift = drift
+        self.volatility = volatility
+        self.jump_intensity = jump_intensity
+        self.jump_mean = jump_mean
+        self.jump_std = jump_std
+        self.base_volume = base_volume
+
+    def _rng(self, symbol: str) -> np.random.Generator:
+        """Random generator seeded from the root seed and the symbol name"""
+        return np.random.default_rng([self.seed, zlib.crc32(symbol.encode())])
+
+    def generate_symbol(self, symbol: str, timestamps: pd.DatetimeIndex, timeframe: str) -> Dict[str, np.ndarray]:
+        """Generate OHLCV columns for one symbol over the given bars"""
+        rng = self._rng(symbol)
+        n = len(timestamps)
+
+        bar_minutes = TIMEFRAME_MINUTES[timeframe]
+        bars_per_day = -(-SESSION_LENGTH_MINUTES // bar_minutes)
+        dt = 1.0 / (TRADING_DAYS_PER_YEAR * bars_per_day)
+
+        # Per-symbol character
+        start_price = float(np.exp(rng.normal(np.log(100.0), 0.8)))
+        sigma = self.volatility * rng.uniform(0.5, 1.8)
+        mu = self.drift + rng.normal(0.0, 0.05)
+        daily_volume = self.base_volume * np.exp(rng.normal(0.0, 0.7))
+
+        # Jump-diffusion log returns
+        diffusion = (mu - 0.5 * sigma ** 2) * dt + sigma * np.sqrt(dt) * rng.standard_normal(n)
+        jump_counts = rng.poisson(self.jump_intensity * dt, n)
+        jumps = jump_counts * self.jump_mean + np.sqrt(jump_counts) * self.jump_std * rng.standard_normal(n)
+        log_returns = diffusion + jumps
+
+        close = start_price * np.exp(np.cumsum(log_returns))
+        open_ = np.empty(n)
+        open_[0] = start_price
+        open_[1:] = close[:-1]
+
+        # Wicks scale with per-bar volatility
+        wick = sigma * np.sqrt(dt) * 0.5
+        high = np.maximum(open_, close) * np.exp(np.abs(rng.normal(0.0, wick, n)))
+        low = np.minimum(open_, close) * np.exp(-np.abs(rng.normal(0.0, wick, n)))
+
+        # U-shaped intraday profile, heavier on large moves
+        position_in_session = (np.arange(n) % bars_per_day) / max(bars_per_day - 1, 1)
+        profile = 1.0 + 1.5 * (2.0 * position_in_session - 1.0) ** 2
+        profile /= profile[:bars_per_day].sum() if bars_per_day > 1 else profile[0]
+        shock = 1.0 + 2.0 * np.abs(log_returns) / (sigma * np.sqrt(dt))
+        volume = daily_volume * profile * shock * np.exp(rng.normal(0.0, 0.3, n))
+
+        return {
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': np.maximum(volume, 1.0).astype(np.int64),
+        }
+
+    def generate_batches(
+        self,
+        symbols: List[str],
+        start_date: Union[str, pd.Timestamp],
+        end_date: Union[str, pd.Timestamp],
+        timeframe: str = '1d',
+        symbols_per_batch: int = 50
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Stream bars as Arrow record batches of ``symbols_per_batch`` symbols.
+
+        Rows are ordered by symbol, then timestamp. Peak memory is bounded by
+        the batch size, not by the size of the universe.
+        """
+        timestamps = trading_calendar(start_date, end_date, timeframe)
+        n = len(timestamps)
+        if n == 0:
+            return
+
+        timestamp_values = timestamps.as_unit('ns').asi8
+        dictionary = pa.array(symbols, type=pa.string())
+
+        for first in range(0, len(symbols), symbols_per_batch):
+            chunk = symbols[first:first + symbols_per_batch]
+            columns = [self.generate_symbol(symbol, timestamps, timeframe) for symbol in chunk]
+
+            indices = np.repeat(np.arange(first, first + len(chunk), dtype=np.int32), n)
+            arrays = [
+                pa.DictionaryArray.from_arrays(pa.array(indices), dictionary),
+                pa.array(np.tile(timestamp_values, len(chunk)), type=ARROW_SCHEMA.field('timestamp').type),
+            ]
+            for field in ('open', 'high', 'low', 'close', 'volume'):
+                arrays.append(pa.array(np.concatenate([column[field] for column in columns])))
+
+            yield pa.RecordBatch.from_arrays(arrays, schema=ARROW_SCHEMA)
+
+    def generate_table(
+        self,
+        symbols: List[str],
+        start_date: Union[str, pd.Timestamp],
+        end_date: Union[str, pd.Timestamp],
+        timeframe: str = '1d'
+    ) -> pa.Table:
+        """Generate bars for all symbols as a single Arrow table"""
+        batches = list(self.generate_batches(symbols, start_date, end_date, timeframe))
+        return pa.Table.from_batches(batches, schema=ARROW_SCHEMA)
+
+    def write_ipc(
+        self,
+        path: Union[str, Path],
+        symbols: List[str],
+        start_date: Union[str, pd.Timestamp],
+        end_date: Union[str, pd.Timestamp],
+        timeframe: str = '1d'
+    ) -> int:
+        """Stream bars straight into an Arrow IPC file and return the row count"""
+        rows = 0
+        with pa.OSFile(str(path), 'wb') as sink:
+            with pa.ipc.new_file(sink, ARROW_SCHEMA) as writer:
+                for batch in self.generate_batches(symbols, start_date, end_date, timeframe):
+                    writer.write_batch(batch)
+                    rows += batch.num_rows
+        logger.info(f"Wrote {rows} synthetic bars for {len(symbols)} symbols to {path}")
+        return rows
+
+    def generate_frame(
+        self,
+        symbol: str,
+        start_date: Union[str, pd.Timestamp],
+        end_date: Union[str, pd.Timestamp],
+        timeframe: str = '1d'
+    ) -> pd.DataFrame:
+        """Generate bars for one symbol as a timestamp-indexed DataFrame"""
+        timestamps = trading_calendar(start_date, end_date, timeframe)
+        columns: Optional[Dict[str, np.ndarray]] = None
+        if len(timestamps):
+            columns = self.generate_symbol(symbol, timestamps, timeframe)
+
+        df = pd.DataFrame(
+            columns or {field: [] for field in ('open', 'high', 'low', 'close', 'volume')},
+            index=timestamps
+        )
+        df.index.name = 'timestamp'
+        return df
+
+    def generate_wide_frame(
+        self,
+        symbols: List[str],
+        start_date: Union[str, pd.Timestamp],
+        end_date: Union[str, pd.Timestamp],
+        timeframe: str = '1d'
+    ) -> pd.DataFrame:
+        """
+        Generate bars for all symbols in the backtest engine's wide layout.
+
+        Columns are ``{symbol}_Open`` ... ``{symbol}_Volume``, matching the
+        frames the engine builds from yfinance downloads.
+        """
+        timestamps = trading_calendar(start_date, end_date, timeframe)
+        if len(timestamps) == 0:
+            return pd.DataFrame(index=timestamps)
+
+        columns = {}
+        for symbol in symbols:
+            bars = self.generate_symbol(symbol, timestamps, timeframe)
+            for field, values in bars.items():
+                columns[f"{symbol}_{field.capitalize()}"] = values
+
+        return pd.DataFrame(columns, index=timestamps)
@@ -0,0 +1,41 @@
+"""
+Shared setup for the unit tests
+
+The backend is imported as the ``src`` package and backend_services from
+its source directory, the way each service runs in its container:
+
+    python -m pytest test
+
+The integration scripts below talk to a running stack (localhost:8000 and
+8001); they are only collected when RUN_INTEGRATION_TESTS is set, and can
+still be run directly with python.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (os.path.join(ROOT, "backend"), os.path.join(ROOT, "backend_services", "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+INTEGRATION_SCRIPTS = [
+    "comprehensive_integration_test.py",
+    "test_api_config.py",
+    "test_auth_flow.py",
+    "test_integration.py",
+]
+
+collect_ignore = [] if os.getenv("RUN_INTEGRATION_TESTS") else INTEGRATION_SCRIPTS
+
+
+@pytest.fixture
+def mock_redis(monkeypatch):
+    """The backend redis_client backed by a fresh in-process MockRedisClient"""
+    from src.utils.redis_client import MockRedisClient, redis_client
+
+    client = MockRedisClient()
+    monkeypatch.setattr(redis_client, "redis", client)
+    return client
@@ -0,0 +1,179 @@
+"""
+In-memory stand-in for the few Motor collection methods the CRUD code uses
+
+Supports equality, $lt/$lte/$gt/$gte/$in/$ne/$type and $or filters on
+dotted paths, inclusion projections, sort, limit, to_list, UpdateOne bulk
+writes, and aggregation pipelines of $match, $unionWith and $limit.
+"""
+import copy
+from typing import Any, Dict, List
+
+from bson import ObjectId
+
+MISSING = object()
+
+OPERATORS = {
+    "$lt": lambda value, arg: value is not MISSING and value < arg,
+    "$lte": lambda value, arg: value is not MISSING and value <= arg,
+    "$gt": lambda value, arg: value is not MISSING and value > arg,
+    "$gte": lambda value, arg: value is not MISSING and value >= arg,
+    "$in": lambda value, arg: value in arg,
+    "$ne": lambda value, arg: value != arg,
+    "$type": lambda value, arg: isinstance(value, {"string": str, "objectId": ObjectId}[arg]),
+}
+
+
+def lookup(doc: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return MISSING
+        doc = doc[part]
+    return doc
+
+
+def matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        value = lookup(doc, key)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(OPERATORS[op](value, arg) for op, arg in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def project(doc: Dict[str, Any], projection: Dict[str, Any] = None) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    projected = {} if projection.get("_id", 1) == 0 else {"_id": doc["_id"]}
+    for path, include in projection.items():
+        if path == "_id" or not include:
+            continue
+        value = lookup(doc, path)
+        if value is MISSING:
+            continue
+        *parents, leaf = path.split(".")
+        target = projected
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = copy.deepcopy(value)
+    return projected
+
+
+class FakeCursor:
+    """Sorts and limits the matching documents, then projects them"""
+
+    def __init__(self, docs: List[Dict[str, Any]], projection: Dict[str, Any] = None):
+        self.docs = docs
+        self.projection = projection
+
+    def sort(self, key, direction=None):
+        keys = [(key, direction)] if isinstance(key, str) else list(key)
+        for field, order in reversed(keys):
+            self.docs.sort(key=lambda doc: lookup(doc, field), reverse=order == -1)
+        return self
+
+    def limit(self, count: int):
+        self.docs = self.docs[:count]
+        return self
+
+    async def to_list(self, length=None):
+        docs = self.docs if length is None else self.docs[:length]
+        return [project(doc, self.projection) for doc in docs]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self.docs:
+            yield project(doc, self.projection)
+
+
+class FakeResult:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class FakeCollection:
+    def __init__(self, db: "FakeDatabase" = None):
+        self.db = db
+        self.docs: List[Dict[str, Any]] = []
+
+    async def insert_one(self, doc):
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", ObjectId())
+        self.docs.append(doc)
+        return FakeResult(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs):
+        return FakeResult(inserted_ids=[(await self.insert_one(doc)).inserted_id for doc in docs])
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([doc for doc in self.docs if matches(doc, query or {})], projection)
+
+    def aggregate(self, pipeline):
+        docs = list(self.docs)
+        for stage in pipeline:
+            (operator, arg), = stage.items()
+            if operator == "$match":
+                docs = [doc for doc in docs if matches(doc, arg)]
+            elif operator == "$unionWith":
+                docs += self.db[arg["coll"]].aggregate(arg.get("pipeline", [])).docs
+            elif operator == "$limit":
+                docs = docs[:arg]
+            else:
+                raise NotImplementedError(operator)
+        return FakeCursor(docs)
+
+    async def find_one(self, query=None, projection=None):
+        docs = await self.find(query, projection).to_list(1)
+        return docs[0] if docs else None
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if matches(doc, query):
+                doc.update(copy.deepcopy(update.get("$set", {})))
+                return FakeResult(matched_count=1, modified_count=1)
+        return FakeResult(matched_count=0, modified_count=0)
+
+    async def bulk_write(self, operations, ordered=True):
+        modified = 0
+        for operation in operations:
+            modified += (await self.update_one(operation._filter, operation._doc)).modified_count
+        return FakeResult(modified_count=modified)
+
+    async def delete_one(self, query):
+        for doc in self.docs:
+            if matches(doc, query):
+                self.docs.remove(doc)
+                return FakeResult(deleted_count=1)
+        return FakeResult(deleted_count=0)
+
+    async def delete_many(self, query):
+        kept = [doc for doc in self.docs if not matches(doc, query)]
+        deleted, self.docs = len(self.docs) - len(kept), kept
+        return FakeResult(deleted_count=deleted)
+
+    async def count_documents(self, query):
+        return sum(1 for doc in self.docs if matches(doc, query))
+
+
+class FakeDatabase:
+    """Collections are created on first access, by attribute or by name"""
+
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self)
+        return self.collections[name]
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
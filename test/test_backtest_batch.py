@@ -0,0 +1,139 @@
+"""
+Batch submission and aggregate group progress
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from fake_mongo import FakeDatabase
+from src.dependencies import get_current_user_from_token, get_db
+from src.main import app
+from src.models.user import User
+from src.routes import backtest_routes
+from src.services.progress_stream import execution_snapshot_key
+from src.utils.redis_client import redis_client
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+def job(strategy_id, **overrides):
+    return {
+        "strategy_id": str(strategy_id),
+        "strategy_type": "user",
+        "initial_capital": 10_000,
+        "timeframe": "1d",
+        "start_date": "2024-01-01",
+        "end_date": "2024-06-30",
+        "data_provider": "yahoo",
+        **overrides,
+    }
+
+
+@pytest.fixture
+def db():
+    db = FakeDatabase()
+    asyncio.run(db.strategy.insert_many([
+        {"_id": ObjectId(), "user_id": ObjectId(USER_ID), "name": f"Strategy {i}"} for i in range(2)
+    ]))
+    return db
+
+
+@pytest.fixture
+def dispatched(monkeypatch):
+    calls = []
+
+    async def start_batch(user_id, jobs):
+        calls.append((user_id, jobs))
+        return {"group_id": "services-group", "backtest_ids": [f"e{i}" for i in range(len(jobs))]}
+
+    monkeypatch.setattr(backtest_routes.backtest_services_client, "start_batch", start_batch)
+    return calls
+
+
+@pytest.fixture
+def client(db, mock_redis, dispatched):
+    user = User(_id=USER_ID, email="a@b.com", userName="usr", firstName="a", lastName="b", createdAt="2024-01-01")
+    app.dependency_overrides[get_current_user_from_token] = lambda: user
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def strategy_ids(db):
+    return [doc["_id"] for doc in db.strategy.docs]
+
+
+def test_batch_dispatches_every_job_once_in_order(client, db, dispatched):
+    first, second = strategy_ids(db)
+
+    response = client.post("/api/backtest/batch", json={"jobs": [job(first), job(second, timeframe="1h")]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["backtest_ids"]) == 2
+    [(user_id, jobs)] = dispatched
+    assert user_id == USER_ID
+    assert [(j["strategy_id"], j["timeframe"]) for j in jobs] == [(str(first), "1d"), (str(second), "1h")]
+    statuses = asyncio.run(redis_client.get_backtest_statuses(body["backtest_ids"]))
+    assert [status["execution_id"] for status in statuses.values()] == ["e0", "e1"]
+
+
+@pytest.mark.parametrize("jobs, status", [
+    (lambda first: [job(first), job(first, end_date="2023-01-01")], 400),
+    (lambda first: [job(first), job(ObjectId())], 404),
+    (lambda first: [], 422),
+])
+def test_an_invalid_job_rejects_the_whole_batch(client, db, dispatched, jobs, status):
+    first, _ = strategy_ids(db)
+
+    response = client.post("/api/backtest/batch", json={"jobs": jobs(first)})
+
+    assert response.status_code == status
+    assert dispatched == []
+
+
+def test_group_progress_aggregates_its_backtests(client, db):
+    first, second = strategy_ids(db)
+    body = client.post("/api/backtest/batch", json={"jobs": [job(first), job(second)]}).json()
+    asyncio.run(redis_client.hset_many({
+        execution_snapshot_key("e0"): {"status": "completed", "progress": "100"},
+        execution_snapshot_key("e1"): {"status": "running", "progress": "40"},
+    }))
+
+    running = client.get(f"/api/backtest/group/{body['group_id']}").json()
+    asyncio.run(redis_client.hset(execution_snapshot_key("e1"), {"status": "failed", "progress": "40", "message": "no data"}))
+    finished = client.get(f"/api/backtest/group/{body['group_id']}").json()
+
+    assert (running["status"], running["progress"], running["counts"]) == ("running", 70, {"completed": 1, "running": 1})
+    assert (finished["status"], finished["progress"]) == ("partially_failed", 100)
+    assert finished["backtests"][body["backtest_ids"][1]]["error"] == "no data"
+
+
+def test_groups_of_other_users_are_hidden(client):
+    asyncio.run(redis_client.hset(backtest_routes._group_key("g1"), {"user_id": "someone-else", "backtest_ids": "a"}))
+
+    assert client.get("/api/backtest/group/g1").status_code == 403
+    assert client.get("/api/backtest/group/missing").status_code == 404
+
+
+def test_strategies_of_other_users_cannot_be_run(client, db, dispatched):
+    foreign = ObjectId()
+    asyncio.run(db.strategy.insert_one({"_id": foreign, "user_id": ObjectId(), "name": "Not mine"}))
+
+    single = client.post("/api/backtest/run", json=job(foreign))
+    batch = client.post("/api/backtest/batch", json={"jobs": [job(foreign)]})
+
+    assert (single.status_code, batch.status_code) == (404, 404)
+    assert dispatched == []
+
+
+def test_default_templates_resolve_by_id(client, db, dispatched):
+    template = ObjectId()
+    asyncio.run(db.default_strategies.insert_one({"_id": template, "key": "ema_crossover_v1", "name": "EMA"}))
+
+    response = client.post("/api/backtest/batch", json={"jobs": [job(template, strategy_type="default")]})
+
+    assert response.status_code == 200
+    assert dispatched[0][1][0]["strategy_id"] == str(template)
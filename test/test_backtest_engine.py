@@ -0,0 +1,83 @@
+"""
+Cross-sectional simulation in BacktestEngine
+"""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("lumibot")
+
+from services.backtest.backtest_engine import BacktestEngine, Portfolio, PositionBook
+
+
+def wide_frame(closes: dict, start: str = "2024-01-01", freq: str = "D") -> pd.DataFrame:
+    index = pd.date_range(start, periods=len(next(iter(closes.values()))), freq=freq, tz="UTC")
+    return pd.DataFrame({f"{symbol}_Close": values for symbol, values in closes.items()}, index=index)
+
+
+def test_entries_fill_in_rank_order_from_one_cash_snapshot():
+    engine = BacktestEngine()
+    portfolio = Portfolio(initial_capital=10_000)
+    book = PositionBook(6)
+    prices = np.full(6, 100.0)
+
+    # 2% risk x 10 sizes each position at 2,000, so five fit into 10,000
+    engine._open_positions(portfolio, book, np.ones(6, dtype=bool), prices, 0, 0, {"risk_per_trade": 0.02})
+
+    assert book.is_open.tolist() == [True] * 5 + [False]
+    assert book.shares[:5].tolist() == [20.0] * 5
+    assert portfolio.cash == pytest.approx(0.0)
+
+
+def test_symbols_without_a_price_are_never_entered():
+    engine = BacktestEngine()
+    portfolio = Portfolio(initial_capital=10_000)
+    book = PositionBook(3)
+
+    engine._open_positions(portfolio, book, np.ones(3, dtype=bool), np.array([100.0, 0.0, 50.0]), 0, 0, {})
+
+    assert book.is_open.tolist() == [True, False, True]
+
+
+def test_positions_exit_after_five_days_held():
+    engine = BacktestEngine()
+    book = PositionBook(1)
+    book.open(np.array([0]), np.array([1.0]), np.array([100.0]), np.array([100.0]), 0, 0)
+    day = 86_400 * 1_000_000_000
+
+    assert not engine._exit_signals([], np.array([101.0]), book, 5 * day)[0]
+    assert engine._exit_signals([], np.array([101.0]), book, 6 * day)[0]
+    assert engine._exit_signals([], np.array([111.0]), book, day)[0]
+
+
+def test_results_do_not_depend_on_symbol_order():
+    rng = np.random.default_rng(7)
+    data = wide_frame({
+        symbol: 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 120)))
+        for symbol in ("MSFT", "AAPL", "GOOG")
+    })
+
+    def run(symbols):
+        np.random.seed(11)
+        portfolio = Portfolio(initial_capital=100_000)
+        strategy = {"config": {"symbols": symbols}}
+        trades = asyncio.run(BacktestEngine()._execute_strategy(strategy, data, portfolio))
+        return [trade.to_dict() for trade in trades], portfolio.get_equity_curve()
+
+    assert run(["MSFT", "AAPL", "GOOG"]) == run(["GOOG", "MSFT", "AAPL"])
+
+
+def test_open_positions_are_closed_on_the_last_bar():
+    np.random.seed(3)
+    data = wide_frame({"AAPL": np.linspace(100, 101, 3)})
+    portfolio = Portfolio(initial_capital=100_000)
+    engine = BacktestEngine()
+    engine._entry_signals = lambda conditions, prices: np.ones(len(prices), dtype=bool)
+
+    trades = asyncio.run(engine._execute_strategy({"config": {"symbols": ["AAPL"]}}, data, portfolio))
+
+    assert len(trades) == 1
+    assert trades[0].exit_time == data.index[-1]
+    assert portfolio.cash > 100_000
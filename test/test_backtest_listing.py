@@ -0,0 +1,127 @@
+"""
+Keyset-paginated listing of a user's backtests
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi.testclient import TestClient
+
+from fake_mongo import FakeDatabase
+from src.crud.backtest import decode_backtest_cursor, encode_backtest_cursor, list_backtest_summaries
+from src.dependencies import get_current_user_from_token, get_db
+from src.main import app
+from src.models.user import User
+from src.routes import backtest_routes
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+
+@pytest.fixture
+def client(db, mock_redis, monkeypatch):
+    user = User(_id=USER_ID, email="a@b.com", userName="usr", firstName="a", lastName="b", createdAt="2024-01-01")
+    app.dependency_overrides[get_current_user_from_token] = lambda: user
+    app.dependency_overrides[get_db] = lambda: db
+
+    async def start_backtest(payload):
+        # What backend_services records for an accepted run
+        execution_id = str(uuid.uuid4())
+        await db.backtest_executions.insert_one({
+            "id": execution_id,
+            "user_id": payload["user_id"],
+            "strategy_id": payload["strategy_id"],
+            "strategy_name": "Momentum",
+            "status": "pending",
+            "start_time": datetime.utcnow(),
+            "params": payload,
+            "result": None,
+        })
+        return execution_id
+
+    monkeypatch.setattr(backtest_routes.backtest_services_client, "start_backtest", start_backtest)
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def seed_executions(db, count, user_id=USER_ID):
+    start = datetime(2024, 1, 1)
+    asyncio.run(db.backtest_executions.insert_many([
+        {
+            "id": f"run-{i}",
+            "user_id": user_id,
+            "strategy_id": "s",
+            "strategy_name": "Momentum",
+            "status": "completed",
+            # Pairs share a start time, so pages must break ties on _id
+            "start_time": start + timedelta(minutes=i // 2),
+            "params": {"start_date": "2023-01-01", "end_date": "2023-12-31"},
+            "result": {"total_return": i, "sharpe_ratio": 1.0, "max_drawdown": -2.0, "total_trades": 3},
+        }
+        for i in range(count)
+    ]))
+
+
+def test_a_new_run_is_listed(client, db):
+    strategy_id = ObjectId()
+    asyncio.run(db.strategy.insert_one({"_id": strategy_id, "user_id": ObjectId(USER_ID), "name": "Momentum"}))
+
+    run = client.post("/api/backtest/run", json={
+        "strategy_id": str(strategy_id),
+        "strategy_type": "user",
+        "initial_capital": 10_000,
+        "timeframe": "1d",
+        "start_date": "2024-01-01",
+        "end_date": "2024-06-30",
+        "data_provider": "yahoo",
+    })
+    assert run.status_code == 200
+
+    listed = client.get("/api/backtest/user").json()
+
+    assert len(listed) == 1
+    assert listed[0]["strategy_id"] == str(strategy_id)
+    assert listed[0]["status"] == "pending"
+    assert listed[0]["start_date"] == "2024-01-01"
+
+
+def test_pages_cover_every_run_once_newest_first(client, db):
+    seed_executions(db, 7)
+    seed_executions(db, 2, user_id=str(ObjectId()))
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/backtest/user", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        seen += [summary["id"] for summary in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+
+    assert sorted(seen) == sorted(f"run-{i}" for i in range(7))
+    assert [int(run_id.split("-")[1]) // 2 for run_id in seen] == [3, 2, 2, 1, 1, 0, 0]
+
+
+def test_a_malformed_cursor_is_rejected(client):
+    assert client.get("/api/backtest/user", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_cursor_round_trips(db):
+    doc = {"start_time": datetime(2024, 1, 2, 3, 4, 5), "_id": ObjectId()}
+
+    assert decode_backtest_cursor(encode_backtest_cursor(doc)) == (doc["start_time"], doc["_id"])
+
+
+def test_a_full_last_page_has_no_next_cursor(db):
+    seed_executions(db, 3)
+
+    docs, cursor = asyncio.run(list_backtest_summaries(db, USER_ID, limit=3))
+
+    assert len(docs) == 3
+    assert cursor is None
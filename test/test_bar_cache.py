@@ -0,0 +1,86 @@
+"""
+On-disk bar cache: window reads and bounded eviction
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from services.backtest.bar_cache import BarCache
+
+
+def wide_frame(symbols=("AAPL",), days=60):
+    index = pd.date_range("2024-01-01", periods=days, freq="D", tz="UTC")
+    close = np.linspace(100.0, 160.0, days)
+    columns = {}
+    for symbol in symbols:
+        columns.update({
+            f"{symbol}_Open": close, f"{symbol}_High": close + 1, f"{symbol}_Low": close - 1,
+            f"{symbol}_Close": close, f"{symbol}_Volume": np.full(days, 1000.0),
+        })
+    return pd.DataFrame(columns, index=index)
+
+
+def entry_size(cache, key):
+    return sum(path.stat().st_size for path in (cache.root / key).glob("*.arrow"))
+
+
+def age(cache, key, seconds_ago):
+    marker = cache.root / key / ".complete"
+    used = marker.stat().st_mtime - seconds_ago
+    os.utime(marker, (used, used))
+
+
+def test_window_reads_bars_either_side_of_a_time(tmp_path):
+    cache = BarCache(str(tmp_path), max_bytes=0)
+    cache.write("k", wide_frame(("AAPL", "MSFT")))
+
+    rows = cache.window("k", "AAPL", "2024-01-10T12:00:00", 2)
+
+    assert cache.has("k")
+    assert [row["timestamp"][:10] for row in rows] == ["2024-01-09", "2024-01-10", "2024-01-11", "2024-01-12", "2024-01-13"]
+    assert set(rows[0]) >= {"open", "close", "sma_20", "ema_20", "rsi_14"}
+    assert cache.window("k", "TSLA", "2024-01-10", 2) is None
+
+
+def test_windows_are_clamped_to_the_series(tmp_path):
+    cache = BarCache(str(tmp_path), max_bytes=0)
+    cache.write("k", wide_frame())
+
+    assert len(cache.window("k", "AAPL", "2023-01-01", 3)) == 4
+    assert len(cache.window("k", "AAPL", "2030-01-01", 3)) == 4
+
+
+def test_complete_entries_are_not_rewritten(tmp_path):
+    cache = BarCache(str(tmp_path), max_bytes=0)
+    cache.write("k", wide_frame(days=60))
+
+    cache.write("k", wide_frame(days=30))
+
+    assert cache.table("k", "AAPL").num_rows == 60
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = BarCache(str(tmp_path), max_bytes=0)
+    for key in ("old", "used", "new"):
+        cache.write(key, wide_frame())
+    age(cache, "old", 300)
+    age(cache, "used", 200)
+    cache.window("used", "AAPL", "2024-01-10", 1)
+
+    cache.max_bytes = 2 * entry_size(cache, "new")
+    removed = cache.evict()
+
+    assert removed == 1
+    assert not (tmp_path / "old").exists()
+    assert cache.has("used") and cache.has("new")
+
+
+def test_the_entry_just_written_is_never_evicted(tmp_path):
+    cache = BarCache(str(tmp_path), max_bytes=1)
+    cache.write("first", wide_frame())
+
+    cache.write("second", wide_frame())
+
+    assert not cache.has("first")
+    assert cache.has("second")
@@ -0,0 +1,52 @@
+"""
+Regression detection of the benchmark suite
+"""
+from benchmarks.datasets import DATASETS, DEFAULT_CASES
+from benchmarks.run_benchmarks import find_regressions
+
+BASELINE = {
+    "cases": {
+        "daily_1x1y": {
+            "wall_time": 1.0,
+            "peak_rss_mb": 100.0,
+            "stages": {"simulation": 0.5, "metrics": 0.001},
+        }
+    }
+}
+
+
+def result(wall_time=1.0, peak_rss_mb=100.0, simulation=0.5, metrics=0.001):
+    return {
+        "wall_time": wall_time,
+        "peak_rss_mb": peak_rss_mb,
+        "stages": {"simulation": simulation, "metrics": metrics},
+    }
+
+
+def test_changes_within_the_threshold_pass():
+    assert find_regressions({"daily_1x1y": result(wall_time=1.15, simulation=0.55)}, BASELINE, 0.2) == []
+
+
+def test_slower_stages_and_more_memory_are_flagged():
+    regressions = find_regressions(
+        {"daily_1x1y": result(simulation=0.8, peak_rss_mb=150.0)}, BASELINE, 0.2
+    )
+
+    assert {(r["metric"], r["change_pct"]) for r in regressions} == {
+        ("stages.simulation", 60.0),
+        ("peak_rss_mb", 50.0),
+    }
+
+
+def test_stages_too_short_to_time_are_ignored():
+    assert find_regressions({"daily_1x1y": result(metrics=0.01)}, BASELINE, 0.2) == []
+
+
+def test_cases_missing_from_the_baseline_are_skipped():
+    assert find_regressions({"daily_50x5y": result(wall_time=10.0)}, BASELINE, 0.2) == []
+
+
+def test_default_cases_exist_and_symbol_names_are_stable():
+    assert set(DEFAULT_CASES) <= set(DATASETS)
+    assert DATASETS["daily_1x1y"].symbol_names == ["SYM000"]
+    assert len(set(DATASETS["daily_50x5y"].symbol_names)) == 50
@@ -0,0 +1,55 @@
+"""
+Connection pool metrics and the internal metrics endpoints
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import dependencies
+from src.database.client import PoolMetricsListener
+from src.main import app
+
+
+def test_pool_listener_tracks_checkouts_and_waits():
+    listener = PoolMetricsListener()
+    for _ in range(2):
+        listener.connection_created(None)
+        listener.connection_check_out_started(None)
+        listener.connection_checked_out(SimpleNamespace(duration=0.002))
+    listener.connection_check_out_started(None)
+    listener.connection_check_out_failed(None)
+    listener.connection_checked_in(None)
+
+    stats = listener.snapshot()
+
+    assert stats["open_connections"] == 2
+    assert stats["checked_out"] == 1
+    assert stats["available"] == 1
+    assert stats["max_checked_out"] == 2
+    assert stats["max_waiting"] == 1
+    assert stats["waiting"] == 0
+    assert stats["checkout_failures"] == 1
+    assert stats["avg_checkout_wait_ms"] == 2.0
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_metrics_are_hidden_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(dependencies, "METRICS_TOKEN", None)
+
+    assert client.get("/metrics/db-pool").status_code == 404
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(dependencies, "METRICS_TOKEN", "scrape-secret")
+
+    assert client.get("/metrics/db-pool").status_code == 401
+    assert client.get("/metrics/db-pool", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/metrics/db-pool", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "open_connections" in response.json()
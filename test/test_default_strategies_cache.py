@@ -0,0 +1,93 @@
+"""
+Cached default strategy responses with ETags and conditional GETs
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from fake_mongo import FakeDatabase
+from src.dependencies import get_db
+from src.main import app
+from src.routes import strategy as strategy_routes
+from src.routes.strategy import _etag_matches
+from src.services.default_strategies import DEFAULT_STRATEGIES, DefaultStrategiesCache
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+])
+def test_if_none_match_compares_weakly(header, expected):
+    assert _etag_matches(header, '"abc"') is expected
+
+
+def test_concurrent_misses_build_once():
+    cache = DefaultStrategiesCache()
+    builds = []
+
+    async def build():
+        builds.append(1)
+        await asyncio.sleep(0.01)
+        return [{"name": "EMA"}]
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("default", build) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert len(builds) == 1
+    assert len({etag for etag, _ in results}) == 1
+    assert results[0][1] == b'[{"name":"EMA"}]'
+
+
+def test_invalidation_during_a_build_is_not_overwritten():
+    cache = DefaultStrategiesCache()
+
+    async def build():
+        cache.invalidate()
+        return []
+
+    asyncio.run(cache.get("default", build))
+
+    assert cache._entries == {}
+
+
+def test_same_content_keeps_its_etag_after_expiry():
+    cache = DefaultStrategiesCache(ttl=0)
+
+    async def build():
+        return {"a": 1}
+
+    first = asyncio.run(cache.get("default", build))
+    second = asyncio.run(cache.get("default", build))
+
+    assert first == second
+
+
+@pytest.fixture
+def client(monkeypatch):
+    db = FakeDatabase()
+    asyncio.run(db.default_strategies.insert_many([dict(strategy) for strategy in DEFAULT_STRATEGIES]))
+    monkeypatch.setattr(strategy_routes, "default_strategies_cache", DefaultStrategiesCache())
+    app.dependency_overrides[get_db] = lambda: db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_conditional_get_returns_304_for_a_current_copy(client):
+    first = client.get("/api/strategy/default")
+    etag = first.headers["etag"]
+
+    current = client.get("/api/strategy/default", headers={"If-None-Match": etag})
+    changed = client.get("/api/strategy/default", headers={"If-None-Match": '"stale"'})
+
+    assert first.status_code == 200
+    assert [strategy["name"] for strategy in first.json()] == [strategy["name"] for strategy in DEFAULT_STRATEGIES]
+    assert first.headers["cache-control"] == "no-cache"
+    assert (current.status_code, current.content, current.headers["etag"]) == (304, b"", etag)
+    assert changed.status_code == 200 and changed.content == first.content
@@ -0,0 +1,76 @@
+"""
+LTTB downsampling of equity curves and the max_points floor of the series endpoint
+"""
+import asyncio
+
+import numpy as np
+import pyarrow as pa
+import pytest
+
+from services.backtest.downsampling import MIN_DOWNSAMPLE_POINTS, downsample_table, lttb_indices
+
+
+def test_ends_are_kept_and_indices_increase():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+
+    indices = lttb_indices(x, y, 50)
+
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 999
+    assert (np.diff(indices) > 0).all()
+
+
+def test_spikes_survive():
+    y = np.zeros(1000)
+    y[123], y[777] = 50.0, -40.0
+
+    indices = lttb_indices(np.arange(1000), y, 20)
+
+    assert {123, 777} <= set(indices.tolist())
+
+
+def test_short_series_are_returned_whole():
+    assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("max_points", [0, 1, 2])
+def test_fewer_than_three_points_are_rejected(max_points):
+    with pytest.raises(ValueError):
+        lttb_indices(np.arange(100), np.arange(100), max_points)
+
+
+def test_downsample_table_takes_rows_on_the_time_column():
+    timestamps = pa.array(np.arange(100) * 86_400_000_000, type=pa.timestamp("us", "UTC"))
+    table = pa.table({"timestamp": timestamps, "value": np.linspace(0.0, 1.0, 100)})
+
+    reduced = downsample_table(table, "timestamp", "value", 10)
+
+    assert reduced.num_rows == 10
+    assert reduced["timestamp"][0] == table["timestamp"][0]
+    assert downsample_table(table, "timestamp", "value", 500) is table
+
+
+def test_series_endpoint_rejects_max_points_below_the_floor():
+    pytest.importorskip("lumibot")
+    from aiohttp.test_utils import TestClient, TestServer
+    from main import BackendService
+
+    class Backtests:
+        calls = 0
+
+        async def get_series(self, *args):
+            self.calls += 1
+
+    async def scenario():
+        service = BackendService()
+        service.backtest_service = Backtests()
+        async with TestClient(TestServer(service.app)) as client:
+            response = await client.get("/backtest/run-1/series/equity_curve", params={"max_points": "2"})
+            return response.status, await response.json(), service.backtest_service.calls
+
+    status, body, calls = asyncio.run(scenario())
+
+    assert status == 400
+    assert str(MIN_DOWNSAMPLE_POINTS) in body["error"]
+    assert calls == 0
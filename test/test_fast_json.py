@@ -0,0 +1,78 @@
+"""
+orjson encoding with the standard library fallback, and streamed objects
+"""
+import asyncio
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.utils import fast_json
+
+
+def test_dumps_handles_nulls_datetimes_and_numpy():
+    encoded = fast_json.dumps({
+        "missing": None,
+        "at": datetime(2024, 1, 2, 3, 4, 5),
+        "values": np.array([1.5, 2.5]),
+        "count": np.int64(3),
+    })
+
+    assert json.loads(encoded) == {
+        "missing": None,
+        "at": "2024-01-02T03:04:05",
+        "values": [1.5, 2.5],
+        "count": 3,
+    }
+
+
+def test_values_orjson_rejects_fall_back_to_the_standard_library():
+    pytest.importorskip("orjson")
+
+    assert fast_json.loads(fast_json.dumps({"big": 2 ** 70, "none": None})) == {"big": 2 ** 70, "none": None}
+
+
+def test_dumps_without_orjson(monkeypatch):
+    monkeypatch.setattr(fast_json, "ORJSON_AVAILABLE", False)
+
+    assert fast_json.dumps({"a": [1, None], "b": datetime(2024, 1, 1)}) == b'{"a":[1,null],"b":"2024-01-01 00:00:00"}'
+
+
+def test_stream_object_writes_async_arrays_chunk_by_chunk():
+    async def rows():
+        yield [{"i": 0}, {"i": 1}]
+        yield []
+        yield [{"i": 2}]
+
+    async def collect():
+        fields = [("id", "b1"), ("rows", rows), ("empty", lambda: None)]
+        return b"".join([chunk async for chunk in fast_json.stream_object(fields)])
+
+    assert json.loads(asyncio.run(collect())) == {"id": "b1", "rows": [{"i": 0}, {"i": 1}, {"i": 2}], "empty": None}
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_non_finite_floats_are_null_with_or_without_orjson(monkeypatch, orjson_available):
+    if orjson_available:
+        pytest.importorskip("orjson")
+    monkeypatch.setattr(fast_json, "ORJSON_AVAILABLE", orjson_available)
+
+    encoded = fast_json.dumps({"ratio": float("nan"), "values": [1.5, float("inf"), (float("-inf"),)]})
+
+    assert encoded == b'{"ratio":null,"values":[1.5,null,[null]]}'
+
+
+@pytest.mark.parametrize("orjson_available", [True, False])
+def test_backend_services_responses_write_null_for_non_finite_floats(monkeypatch, orjson_available):
+    pytest.importorskip("lumibot")
+    import main
+
+    if orjson_available:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(main, "orjson", None)
+
+    response = main.json_body_response({"ratio": float("nan"), "values": [1.5, float("inf")]})
+
+    assert json.loads(response.body, parse_constant=pytest.fail) == {"ratio": None, "values": [1.5, None]}
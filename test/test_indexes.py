@@ -0,0 +1,70 @@
+"""
+Index bootstrap and the hot query audit
+"""
+import asyncio
+
+from src.database.indexes import HOT_QUERIES, REQUIRED_INDEXES, IndexManager
+
+
+class IndexedCollection:
+    def __init__(self, fail=False):
+        self.indexes = {}
+        self.fail = fail
+
+    async def create_indexes(self, models):
+        if self.fail:
+            raise RuntimeError("IndexOptionsConflict")
+        names = [model.document["name"] for model in models]
+        self.indexes.update({name: {} for name in names})
+        return names
+
+
+class ExplainingDatabase(dict):
+    def __init__(self, plans, **collections):
+        super().__init__(collections)
+        self.plans = plans
+
+    def __missing__(self, name):
+        return self.setdefault(name, IndexedCollection())
+
+    async def command(self, name, command, verbosity=None):
+        return {"queryPlanner": {"winningPlan": self.plans[command["find"]]}}
+
+
+def test_each_hot_query_is_covered_by_a_declared_index():
+    for query in HOT_QUERIES:
+        leading_keys = [model.document["key"] for model in REQUIRED_INDEXES[query["collection"]]]
+        assert any(next(iter(keys)) in query["filter"] for keys in leading_keys), query["name"]
+
+
+def test_index_names_are_unique_per_collection():
+    for collection, models in REQUIRED_INDEXES.items():
+        names = [model.document["name"] for model in models]
+        assert len(names) == len(set(names)), collection
+
+
+def test_declared_indexes_are_created_and_failures_stay_per_collection():
+    executions = IndexedCollection()
+    db = ExplainingDatabase({}, backtest_executions=executions, strategy=IndexedCollection(fail=True))
+
+    report = asyncio.run(IndexManager().ensure_indexes(db))
+
+    assert set(executions.indexes) == {"id", "user_id_start_time_id", "strategy_id_start_time"}
+    assert list(report["errors"]) == ["strategy"]
+    assert "user" in report["indexes"]
+
+
+def test_audit_reports_collection_scans_anywhere_in_the_plan():
+    queries = [
+        {"name": "indexed", "collection": "a", "filter": {"x": 1}},
+        {"name": "scanned", "collection": "b", "filter": {"y": 1}, "sort": {"z": -1}},
+    ]
+    plans = {
+        "a": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}},
+        "b": {"stage": "SORT", "inputStage": {"stage": "OR", "inputStages": [{"stage": "COLLSCAN"}]}},
+    }
+
+    report = asyncio.run(IndexManager(hot_queries=queries).audit(ExplainingDatabase(plans)))
+
+    assert report["collscans"] == ["scanned"]
+    assert report["queries"][0]["stages"] == ["FETCH", "IXSCAN"]
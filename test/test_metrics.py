@@ -0,0 +1,64 @@
+"""
+Stage profiles and their Prometheus rendering
+"""
+import time
+
+from services.backtest.stage_timer import StageTimer
+from services.metrics import MetricsRegistry
+
+
+def test_stage_timer_accumulates_stages_fetches_and_counters():
+    timer = StageTimer()
+    with timer.stage("fetch"):
+        time.sleep(0.01)
+    timer.add("fetch", 1.0)
+    timer.add_symbol_fetch("AAPL", 0.25)
+    timer.add_symbol_fetch("AAPL", 0.25)
+    timer.increment("cache_hits")
+    timer.increment("cache_hits", 2)
+
+    profile = timer.as_profile()
+
+    assert 1.01 <= profile["stages"]["fetch"] < 1.5
+    assert profile["symbol_fetch_seconds"] == {"AAPL": 0.5}
+    assert profile["counters"] == {"cache_hits": 3}
+    assert profile["total_seconds"] >= 0.01
+
+
+def test_stage_is_recorded_when_the_block_raises():
+    timer = StageTimer()
+    try:
+        with timer.stage("simulation"):
+            raise RuntimeError
+    except RuntimeError:
+        pass
+
+    assert "simulation" in timer.as_dict()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="fetch")
+    histogram.observe(0.5, stage="fetch")
+    histogram.observe(5, stage="fetch")
+
+    lines = registry.render().splitlines()
+
+    assert 'stage_seconds_bucket{stage="fetch",le="0.1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="1"} 2' in lines
+    assert 'stage_seconds_bucket{stage="fetch",le="+Inf"} 3' in lines
+    assert 'stage_seconds_count{stage="fetch"} 3' in lines
+    assert 'stage_seconds_sum{stage="fetch"} 5.55' in lines
+
+
+def test_counters_and_gauges_render_with_escaped_labels():
+    registry = MetricsRegistry()
+    registry.counter("runs_total", "Runs").inc(status='bad "quote"')
+    registry.gauge("queue_depth", "Queued runs", lambda: 4)
+
+    text = registry.render()
+
+    assert '# TYPE runs_total counter' in text
+    assert 'runs_total{status="bad \\"quote\\""} 1' in text
+    assert 'queue_depth 4' in text
@@ -0,0 +1,122 @@
+"""
+Expiry, LRU eviction and pub/sub of the in-process Redis fallback
+"""
+import asyncio
+
+import pytest
+
+from src.utils import redis_client as redis_module
+from src.utils.redis_client import MockRedisClient, _approx_size
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(redis_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_keys_expire_when_read(clock):
+    client = MockRedisClient()
+    run(client.set("k", "v", ex=10))
+
+    assert run(client.ttl("k")) == 10
+    clock.now += 10
+
+    assert run(client.get("k")) is None
+    assert run(client.ttl("k")) == -2
+    assert client.expired_keys == 1
+
+
+def test_sweep_drops_expired_keys_nobody_reads(clock):
+    client = MockRedisClient()
+    run(client.set("short", "v", px=500))
+    run(client.set("long", "v", ex=60))
+    run(client.set("forever", "v"))
+    clock.now += 1
+
+    assert run(client.dbsize()) == 2
+    assert set(client.data) == {"long", "forever"}
+
+
+def test_set_clears_the_ttl_but_hash_writes_keep_it(clock):
+    client = MockRedisClient()
+    run(client.set("k", "v", ex=10))
+    run(client.set("k", "w"))
+    run(client.hset("h", mapping={"a": 1}))
+    run(client.expire("h", 10))
+    run(client.hset("h", "b", 2))
+
+    assert run(client.ttl("k")) == -1
+    assert run(client.ttl("h")) == 10
+
+
+def test_refreshed_ttls_replace_the_old_deadline(clock):
+    client = MockRedisClient()
+    run(client.set("k", "v", ex=5))
+    run(client.expire("k", 60))
+    clock.now += 10
+
+    assert run(client.get("k")) == "v"
+
+
+def test_least_recently_used_keys_are_evicted_first():
+    size = _approx_size("k0", "x" * 100)
+    client = MockRedisClient(max_memory=3 * size)
+    for i in range(3):
+        run(client.set(f"k{i}", "x" * 100))
+    run(client.get("k0"))
+
+    run(client.set("k3", "x" * 100))
+
+    assert set(client.data) == {"k0", "k2", "k3"}
+    assert client.evicted_keys == 1
+    assert client.used_memory <= client.max_memory
+
+
+def test_the_key_just_written_survives_even_when_too_large():
+    client = MockRedisClient(max_memory=10)
+    run(client.set("a", "1"))
+
+    run(client.set("big", "x" * 1000))
+
+    assert list(client.data) == ["big"]
+
+
+def test_deleting_releases_memory():
+    client = MockRedisClient()
+    run(client.set("a", "1"))
+    run(client.hset("h", mapping={"f": "v"}))
+
+    assert run(client.delete("a", "h", "missing")) == 2
+    assert client.used_memory == 0
+
+
+def test_subscribers_receive_published_messages():
+    client = MockRedisClient()
+
+    async def scenario():
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe("progress")
+        receivers = await client.publish("progress", "50")
+        message = await pubsub.get_message(timeout=0.1)
+        await pubsub.unsubscribe("progress")
+        return receivers, message, await client.publish("progress", "60")
+
+    receivers, message, after = run(scenario())
+
+    assert receivers == 1
+    assert message["data"] == "50"
+    assert after == 0
@@ -0,0 +1,98 @@
+"""
+Backtest progress streaming over Server-Sent Events
+"""
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.dependencies import get_current_user_from_token
+from src.main import app
+from src.models.user import User
+from src.routes import backtest_routes
+from src.services.progress_stream import ProgressBroker, format_sse
+from src.utils.redis_client import redis_client
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+def parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_events_reach_only_the_watchers_of_their_execution():
+    broker = ProgressBroker()
+    with broker.watch("a") as a, broker.watch("b") as b:
+        broker._dispatch(json.dumps({"execution_id": "a", "progress": 10}))
+        broker._dispatch("not json")
+
+        assert a.get_nowait()["progress"] == 10
+        assert b.empty()
+    assert broker.watchers == {}
+
+
+def test_slow_watchers_lose_their_oldest_events():
+    broker = ProgressBroker(queue_size=2)
+    with broker.watch("a") as queue:
+        for progress in (1, 2, 3):
+            broker._dispatch(json.dumps({"execution_id": "a", "progress": progress}))
+
+        assert [queue.get_nowait()["progress"] for _ in range(2)] == [2, 3]
+
+
+def test_published_events_are_fanned_out_from_one_subscription(mock_redis):
+    async def scenario():
+        broker = ProgressBroker()
+        broker._task = asyncio.create_task(broker._listen())
+        with broker.watch("a") as queue:
+            await asyncio.sleep(0.01)
+            await mock_redis.publish(broker.channel, json.dumps({"execution_id": "a", "status": "running"}))
+            event = await asyncio.wait_for(queue.get(), 1)
+        await broker.stop()
+        return event
+
+    assert asyncio.run(scenario())["status"] == "running"
+
+
+def test_sse_frames_are_json_encoded():
+    assert format_sse({"progress": 5}) == 'event: progress\ndata: {"progress": 5}\n\n'
+
+
+@pytest.fixture
+def client(mock_redis, monkeypatch):
+    user = User(_id=USER_ID, email="a@b.com", userName="usr", firstName="a", lastName="b", createdAt="2024-01-01")
+    app.dependency_overrides[get_current_user_from_token] = lambda: user
+    monkeypatch.setattr(backtest_routes, "STREAM_POLL_SECONDS", 0)
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_stream_polls_backend_services_without_pub_sub(client, monkeypatch):
+    asyncio.run(redis_client.hset("backtest:bt", {"user_id": USER_ID, "execution_id": "exec", "status": "running"}))
+    statuses = iter([
+        {"status": "running", "progress": 40, "stage": "simulation"},
+        {"status": "running", "progress": 40, "stage": "simulation"},
+        {"status": "completed", "progress": 100},
+    ])
+
+    async def get_status(execution_id):
+        return next(statuses)
+
+    monkeypatch.setattr(backtest_routes.backtest_services_client, "get_status", get_status)
+
+    response = client.get("/api/backtest/stream/bt")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert [(data["status"], data["progress"]) for _, data in events] == [("running", 40), ("completed", 100)]
+
+
+def test_stream_of_another_users_backtest_is_refused(client):
+    asyncio.run(redis_client.hset("backtest:bt", {"user_id": "someone-else", "execution_id": "exec"}))
+
+    assert client.get("/api/backtest/stream/bt").status_code == 403
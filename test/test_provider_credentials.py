@@ -0,0 +1,135 @@
+"""
+Config secret encryption with key rotation, and the decrypted credentials cache
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+from cryptography.fernet import Fernet
+
+from fake_mongo import FakeDatabase
+from src.database.config_secrets import rotate_config_secrets
+from src.models.user_config import ConfigEncryption
+from src.services import provider_credentials as provider_credentials_module
+from src.services.provider_credentials import ProviderCredentialsCache
+
+USER_ID = ObjectId("507f1f77bcf86cd799439011")
+OLD_KEY, NEW_KEY = Fernet.generate_key().decode(), Fernet.generate_key().decode()
+
+
+@pytest.fixture
+def key(monkeypatch):
+    monkeypatch.setenv("CONFIG_ENCRYPTION_KEY", OLD_KEY)
+    return lambda setting: monkeypatch.setenv("CONFIG_ENCRYPTION_KEY", setting)
+
+
+def test_values_round_trip_and_the_cipher_is_reused(key):
+    encrypted = ConfigEncryption.encrypt_value("secret")
+
+    assert encrypted != "secret"
+    assert ConfigEncryption.decrypt_value(encrypted) == "secret"
+    assert ConfigEncryption.get_cipher() is ConfigEncryption.get_cipher()
+    assert ConfigEncryption.encrypt_value("") == ""
+
+
+def test_rotation_moves_values_to_the_primary_key(key):
+    encrypted = ConfigEncryption.encrypt_value("secret")
+    key(f"{NEW_KEY},{OLD_KEY}")
+
+    rotated = ConfigEncryption.rotate_value(encrypted)
+    key(NEW_KEY)
+
+    assert ConfigEncryption.decrypt_value(encrypted) == ""
+    assert ConfigEncryption.decrypt_value(rotated) == "secret"
+    assert ConfigEncryption.rotate_value("") == ""
+
+
+def test_decrypt_fields_only_touches_secret_fields(key):
+    doc = {
+        "alpaca_paper_api_key": "PK123",
+        "alpaca_paper_secret_key": ConfigEncryption.encrypt_value("paper-secret"),
+        "alpaca_live_secret_key": "",
+        "polygon_secret_key": "not-a-token",
+    }
+
+    decrypted = ConfigEncryption.decrypt_fields(doc)
+
+    assert decrypted == {
+        "alpaca_paper_api_key": "PK123",
+        "alpaca_paper_secret_key": "paper-secret",
+        "alpaca_live_secret_key": "",
+        "polygon_secret_key": "",
+    }
+    assert doc["alpaca_paper_secret_key"] != "paper-secret"
+
+
+def test_stored_secrets_are_re_encrypted_under_the_new_key(key):
+    db = FakeDatabase()
+    paper = ConfigEncryption.encrypt_value("paper-secret")
+    asyncio.run(db.user_config.insert_many([
+        {"_id": ObjectId(), "alpaca_paper_secret_key": paper, "alpaca_live_secret_key": "", "alpaca_paper_api_key": "PK1"},
+        {"_id": ObjectId(), "polygon_secret_key": "not-a-token"},
+        {"_id": ObjectId(), "alpaca_paper_api_key": "PK2"},
+    ]))
+
+    assert asyncio.run(rotate_config_secrets(db)) == {"rotated": 0, "skipped": 0}
+    key(f"{NEW_KEY},{OLD_KEY}")
+    report = asyncio.run(rotate_config_secrets(db, batch_size=1))
+    rerun = asyncio.run(rotate_config_secrets(db))
+    key(NEW_KEY)
+
+    assert report == {"rotated": 1, "skipped": 1}
+    assert rerun == {"rotated": 0, "skipped": 1}
+    first = db.user_config.docs[0]
+    assert ConfigEncryption.decrypt_value(first["alpaca_paper_secret_key"]) == "paper-secret"
+    assert first["alpaca_live_secret_key"] == "" and first["alpaca_paper_api_key"] == "PK1"
+    assert db.user_config.docs[1]["polygon_secret_key"] == "not-a-token"
+
+
+def test_invalid_keys_are_rejected(key):
+    key("not-a-fernet-key")
+
+    with pytest.raises(ValueError):
+        ConfigEncryption.get_cipher()
+
+
+@pytest.fixture
+def db(key):
+    db = FakeDatabase()
+    asyncio.run(db.user_config.insert_one({
+        "user_id": USER_ID,
+        "alpaca_paper_api_key": "PK123",
+        "alpaca_paper_secret_key": ConfigEncryption.encrypt_value("paper-secret"),
+        "theme": "dark",
+    }))
+    return db
+
+
+def test_credentials_are_decrypted_and_cached_until_invalidated(db):
+    cache = ProviderCredentialsCache()
+
+    first = asyncio.run(cache.get(db, str(USER_ID)))
+    db.user_config.docs[0]["alpaca_paper_api_key"] = "PK456"
+    cached = asyncio.run(cache.get(db, USER_ID))
+    cache.invalidate(USER_ID)
+    reloaded = asyncio.run(cache.get(db, USER_ID))
+
+    assert first == {"alpaca_paper_api_key": "PK123", "alpaca_paper_secret_key": "paper-secret"}
+    assert cached is first
+    assert reloaded["alpaca_paper_api_key"] == "PK456"
+
+
+def test_entries_expire_and_the_cache_is_bounded(db, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(provider_credentials_module.time, "monotonic", lambda: now[0])
+    cache = ProviderCredentialsCache(ttl=60, max_size=2)
+
+    others = [ObjectId(), ObjectId()]
+    asyncio.run(cache.get(db, USER_ID))
+    for user_id in others:
+        assert asyncio.run(cache.get(db, user_id)) == {}
+    assert list(cache._local) == [str(user_id) for user_id in others]
+
+    now[0] += 61
+    db.user_config.docs[0]["alpaca_paper_api_key"] = "PK456"
+    assert asyncio.run(cache.get(db, USER_ID))["alpaca_paper_api_key"] == "PK456"
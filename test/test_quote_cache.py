@@ -0,0 +1,125 @@
+"""
+Two-tier quote cache: stale-while-revalidate, shared fetches and negative caching
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.dependencies import get_current_user_from_token
+from src.main import app
+from src.models.user import User
+from src.routes import market
+from src.services import quote_cache as quote_cache_module
+from src.services.backtest.services_client import BacktestServicesRejected, BacktestServicesUnavailable
+from src.services.quote_cache import QuoteCache
+
+QUOTE = {"symbol": "AAPL", "price": 190.5}
+
+
+class Upstream:
+    """Counts fetches; raises ``error`` instead of quoting when set"""
+
+    def __init__(self, error=None, delay=0.0):
+        self.calls = 0
+        self.error = error
+        self.delay = delay
+
+    async def __call__(self, symbol, provider):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {**QUOTE, "symbol": symbol}
+
+
+def test_concurrent_misses_share_one_fetch(mock_redis):
+    upstream = Upstream(delay=0.01)
+    cache = QuoteCache(fetch=upstream)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.get("aapl") for _ in range(10)))
+
+    quotes = asyncio.run(scenario())
+
+    assert upstream.calls == 1
+    assert all(quote == QUOTE for quote in quotes)
+
+
+def test_replicas_share_quotes_through_redis(mock_redis):
+    upstream = Upstream()
+    first, second = QuoteCache(fetch=upstream), QuoteCache(fetch=upstream)
+
+    async def scenario():
+        await first.get("AAPL")
+        return await second.get("AAPL")
+
+    assert asyncio.run(scenario()) == QUOTE
+    assert upstream.calls == 1
+
+
+def test_stale_quotes_are_served_while_refreshing(mock_redis, monkeypatch):
+    upstream = Upstream()
+    cache = QuoteCache(fetch=upstream, local_ttl=0, ttl=5, stale_ttl=30)
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(quote_cache_module.time, "time", lambda: now[0])
+
+    async def scenario():
+        await cache.get("AAPL")
+        now[0] += 10
+        stale = await cache.get("AAPL")
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return stale
+
+    assert asyncio.run(scenario()) == QUOTE
+    assert upstream.calls == 2
+
+
+def test_rejections_are_cached_briefly(mock_redis, monkeypatch):
+    upstream = Upstream(error=BacktestServicesRejected(404, "Quote not found"))
+    cache = QuoteCache(fetch=upstream, local_ttl=0, negative_ttl=10)
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(quote_cache_module.time, "time", lambda: now[0])
+
+    def get():
+        with pytest.raises(BacktestServicesRejected) as rejected:
+            asyncio.run(cache.get("NOPE"))
+        return rejected.value.status_code
+
+    assert [get(), get()] == [404, 404]
+    assert upstream.calls == 1
+
+    now[0] += 11
+    get()
+    assert upstream.calls == 2
+
+
+def test_outages_are_not_cached(mock_redis):
+    upstream = Upstream(error=BacktestServicesUnavailable("down"))
+    cache = QuoteCache(fetch=upstream)
+
+    for _ in range(2):
+        with pytest.raises(BacktestServicesUnavailable):
+            asyncio.run(cache.get("AAPL"))
+
+    assert upstream.calls == 2
+
+
+@pytest.mark.parametrize("error, status", [
+    (BacktestServicesRejected(404, "Quote not found"), 404),
+    (BacktestServicesRejected(400, "Unknown provider: nope"), 400),
+    (BacktestServicesUnavailable("down"), 503),
+])
+def test_quote_route_passes_upstream_errors_through(mock_redis, monkeypatch, error, status):
+    monkeypatch.setattr(market, "quote_cache", QuoteCache(fetch=Upstream(error=error)))
+    user = User(_id="507f1f77bcf86cd799439011", email="a@b.com", userName="usr", firstName="a", lastName="b", createdAt="2024-01-01")
+    app.dependency_overrides[get_current_user_from_token] = lambda: user
+    try:
+        response = TestClient(app).get("/api/market/quote/NOPE")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == status
+    if status != 503:
+        assert response.json()["detail"] == str(error)
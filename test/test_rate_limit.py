@@ -0,0 +1,96 @@
+"""
+Token-bucket rate limiting: the in-process bucket, the Redis Lua script and
+the route middleware
+"""
+import asyncio
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.utils import redis_client as redis_module
+from src.utils.rate_limit import RateLimitMiddleware, RateLimitRule
+from src.utils.redis_client import redis_client
+
+
+class Clock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(redis_module.time, "time", clock.time)
+    return clock
+
+
+def take(count, key="user:1:runs", limit=3, window=60):
+    async def scenario():
+        return [await redis_client.rate_limit(key, limit, window) for _ in range(count)]
+    return asyncio.run(scenario())
+
+
+def test_bucket_allows_a_burst_then_denies(mock_redis, clock):
+    results = take(4)
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert results[-1].retry_after == pytest.approx(20.0)
+
+
+def test_bucket_refills_over_the_window(mock_redis, clock):
+    take(3)
+
+    clock.now += 20
+    refilled = take(2)
+
+    assert [r.allowed for r in refilled] == [True, False]
+
+
+def test_buckets_are_per_key(mock_redis, clock):
+    take(3, key="user:1:runs")
+
+    assert take(1, key="user:2:runs")[0].allowed
+
+
+def test_lua_script_matches_the_in_process_bucket(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.setattr(redis_client, "redis", fakeredis.FakeAsyncRedis(decode_responses=True))
+    monkeypatch.setattr(redis_client, "_rate_limit_script", None)
+
+    results = take(4)
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert 0 < results[-1].retry_after <= 20.0
+
+
+def test_middleware_limits_matching_routes_only(mock_redis):
+    app = FastAPI()
+
+    @app.post("/api/backtest/run")
+    async def run():
+        return {"ok": True}
+
+    @app.get("/api/backtest/results/{backtest_id}")
+    async def results(backtest_id: str):
+        return {"ok": True}
+
+    rules = [RateLimitRule("backtest_run", "POST", re.compile(r"^/api/backtest/run$"), 1, 60)]
+    client = TestClient(RateLimitMiddleware(app, rules))
+
+    first = client.post("/api/backtest/run")
+    second = client.post("/api/backtest/run")
+    unlimited = [client.get("/api/backtest/results/x").status_code for _ in range(3)]
+
+    assert first.status_code == 200
+    assert first.headers["x-ratelimit-remaining"] == "0"
+    assert second.status_code == 429
+    assert int(second.headers["retry-after"]) == 60
+    assert unlimited == [200, 200, 200]
@@ -0,0 +1,96 @@
+"""
+Pipelined Redis status and log writes, and bulk status reads
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.dependencies import get_current_user_from_token
+from src.main import app
+from src.models.user import User
+from src.services.progress_stream import execution_snapshot_key
+from src.utils.redis_client import BACKTEST_KEY_TTL, redis_client
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+@pytest.fixture
+def round_trips(mock_redis, monkeypatch):
+    """Number of pipelines executed against the mock"""
+    calls = []
+    pipeline = mock_redis.pipeline
+
+    def counted(transaction=True):
+        calls.append(transaction)
+        return pipeline(transaction)
+
+    monkeypatch.setattr(mock_redis, "pipeline", counted)
+    return calls
+
+
+def test_status_writes_set_the_expiry_in_the_same_transaction(mock_redis, round_trips):
+    async def scenario():
+        await redis_client.set_backtest_status("b1", "running", 40, stage="simulation")
+        return await redis_client.get_backtest_status("b1"), await mock_redis.ttl("backtest:b1")
+
+    status, ttl = asyncio.run(scenario())
+
+    assert round_trips == [True]
+    assert status["status"] == "running" and status["progress"] == 40
+    assert 0 < ttl <= BACKTEST_KEY_TTL
+
+
+def test_logs_keep_the_last_hundred(mock_redis, round_trips):
+    async def scenario():
+        for i in range(105):
+            await redis_client.add_backtest_log("b1", f"step {i}")
+        return await redis_client.get_backtest_logs("b1"), await mock_redis.ttl("backtest:b1:logs")
+
+    logs, ttl = asyncio.run(scenario())
+
+    assert len(round_trips) == 105
+    assert len(logs) == 100
+    assert logs[0].endswith("step 104")
+    assert ttl > 0
+
+
+def test_bulk_reads_take_one_round_trip(mock_redis, round_trips):
+    async def scenario():
+        await redis_client.hset_many({
+            "backtest:a": {"status": "completed", "progress": "100"},
+            "backtest:b": {"status": "running", "progress": "10"},
+        }, ttl=60)
+        return await redis_client.get_backtest_statuses(["a", "missing", "b"])
+
+    statuses = asyncio.run(scenario())
+
+    assert round_trips == [True, False]
+    assert statuses == {
+        "a": {"status": "completed", "progress": 100},
+        "missing": None,
+        "b": {"status": "running", "progress": 10},
+    }
+
+
+def test_statuses_route_merges_progress_and_hides_other_users(mock_redis, round_trips):
+    asyncio.run(redis_client.hset_many({
+        "backtest:mine": {"status": "running", "progress": "0", "user_id": USER_ID, "execution_id": "e1"},
+        "backtest:theirs": {"status": "running", "progress": "0", "user_id": "someone-else"},
+        execution_snapshot_key("e1"): {"status": "failed", "progress": "55.0", "message": "no data"},
+    }))
+    round_trips.clear()
+    user = User(_id=USER_ID, email="a@b.com", userName="usr", firstName="a", lastName="b", createdAt="2024-01-01")
+    app.dependency_overrides[get_current_user_from_token] = lambda: user
+    try:
+        response = TestClient(app).get("/api/backtest/statuses", params=[("ids", "mine"), ("ids", "theirs"), ("ids", "gone")])
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "mine": {"status": "failed", "progress": 55, "error": "no data"},
+        "theirs": None,
+        "gone": None,
+    }
+    assert round_trips == [False, False]
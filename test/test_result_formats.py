@@ -0,0 +1,78 @@
+"""
+Accept-header negotiation of columnar backtest results
+"""
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from src.dependencies import get_current_user_from_token
+from src.main import app
+from src.models.user import User
+from src.routes import backtest_routes
+from src.routes.backtest_routes import _columnar_format
+from src.services.backtest.services_client import BacktestServicesClient
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("", None),
+    ("application/json", None),
+    ("*/*", None),
+    ("application/vnd.apache.arrow.stream", "arrow"),
+    ("Application/VND.Apache.Parquet", "parquet"),
+    ("application/x-parquet", "parquet"),
+    ("application/json, application/vnd.apache.parquet", None),
+    ("application/json;q=0.5, application/vnd.apache.parquet", "parquet"),
+    ("text/html, application/vnd.apache.arrow.stream;q=0.9, */*;q=0.1", "arrow"),
+    ("application/vnd.apache.arrow.stream;q=bad", "arrow"),
+])
+def test_columnar_format_follows_q_values_then_order(accept, expected):
+    assert _columnar_format(accept) == expected
+
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def client(mock_redis, monkeypatch):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path == "/backtest/e1/status":
+            return httpx.Response(200, json={"id": "e1", "user_id": USER_ID, "status": "completed", "result": {"total_trades": 1}})
+        if request.url.path == "/backtest/e1/series/trades":
+            return httpx.Response(200, content=chunks(b"PAR1", b"...", b"PAR1"))
+        return httpx.Response(404, json={"error": "Series not found"})
+
+    services = BacktestServicesClient(backoff_base=0)
+    services.client = httpx.AsyncClient(base_url="http://services", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(backtest_routes, "backtest_services_client", services)
+    user = User(_id=USER_ID, email="a@b.com", userName="usr", firstName="a", lastName="b", createdAt="2024-01-01")
+    app.dependency_overrides[get_current_user_from_token] = lambda: user
+    yield TestClient(app), requests
+    app.dependency_overrides.clear()
+
+
+def test_parquet_is_streamed_from_backend_services(client):
+    client, requests = client
+
+    response = client.get("/api/backtest/results/e1", headers={"Accept": "application/vnd.apache.parquet"})
+
+    assert response.status_code == 200
+    assert response.content == b"PAR1...PAR1"
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    assert "Accept" in response.headers["vary"]
+    assert 'filename="e1-trades.parquet"' in response.headers["content-disposition"]
+    assert requests[-1].url.params["format"] == "parquet"
+
+
+def test_missing_series_and_bars_without_a_symbol(client):
+    client, _ = client
+    arrow = {"Accept": "application/vnd.apache.arrow.stream"}
+
+    assert client.get("/api/backtest/results/e1?series=equity_curve", headers=arrow).status_code == 404
+    assert client.get("/api/backtest/results/e1?series=bars", headers=arrow).status_code == 400
@@ -0,0 +1,36 @@
+"""
+Stack sampling of backtest runs
+"""
+import time
+
+from services.backtest.sampling_profiler import SamplingProfiler
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_samples_are_collapsed_root_first():
+    with SamplingProfiler(interval=0.001) as profiler:
+        busy_wait(0.1)
+
+    assert profiler.sample_count > 0
+    assert profiler.duration >= 0.1
+    lines = profiler.collapsed().splitlines()
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == profiler.sample_count
+    assert any("test_samples_are_collapsed_root_first" in line and line.index("test_samples") < line.index("busy_wait")
+               for line in lines)
+
+
+def test_stop_ends_sampling():
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    busy_wait(0.02)
+    profiler.stop()
+    count = profiler.sample_count
+
+    busy_wait(0.02)
+
+    assert profiler.sample_count == count
@@ -0,0 +1,92 @@
+"""
+Parquet encoding and range reads of backtest series
+"""
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from services.backtest import series_store
+from services.backtest.series_store import encode_series, read_series, series_table, table_records, with_trade_signals
+
+
+def equity_curve(count):
+    start = datetime(2024, 1, 1)
+    # Every other timestamp has microseconds, as isoformat() output mixes precisions
+    return [
+        {"timestamp": (start + timedelta(days=i, microseconds=i % 2)).isoformat(), "value": 10_000.0 + i}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def small_row_groups(monkeypatch):
+    monkeypatch.setattr(series_store, "SERIES_ROW_GROUP_SIZE", 4)
+
+
+def test_mixed_iso_precision_round_trips():
+    records = equity_curve(6)
+
+    blob, ref = encode_series("equity_curve", records)
+
+    assert ref["rows"] == 6 and ref["bytes"] == len(blob)
+    assert ref["start"] == "2024-01-01T00:00:00+00:00"
+    assert table_records(read_series("equity_curve", blob)) == [
+        {"timestamp": record["timestamp"] + "+00:00", "value": record["value"]} for record in records
+    ]
+
+
+def test_range_reads_are_inclusive_and_skip_row_groups(small_row_groups):
+    blob, _ = encode_series("equity_curve", equity_curve(20))
+
+    table = read_series("equity_curve", blob, start="2024-01-06", end="2024-01-09T00:00:00.000001")
+
+    assert table["value"].to_pylist() == [10_005.0, 10_006.0, 10_007.0, 10_008.0]
+
+
+def test_offset_and_limit_span_row_groups(small_row_groups):
+    blob, _ = encode_series("equity_curve", equity_curve(20))
+
+    table = read_series("equity_curve", blob, offset=6, limit=5, columns=["value"])
+
+    assert table.column_names == ["value"]
+    assert table["value"].to_pylist() == [10_006.0 + i for i in range(5)]
+
+
+def test_range_outside_the_series_is_empty():
+    blob, _ = encode_series("equity_curve", equity_curve(5))
+
+    assert read_series("equity_curve", blob, start="2025-01-01").num_rows == 0
+
+
+def test_trades_parse_both_time_columns():
+    trades = [
+        {"entry_time": "2024-01-02T10:00:00", "exit_time": "2024-01-03T15:30:00.250000", "pnl": 12.5},
+        {"entry_time": "2024-01-04T10:00:00.5", "exit_time": None, "pnl": None},
+    ]
+
+    blob, ref = encode_series("trades", trades)
+    records = table_records(read_series("trades", blob))
+
+    assert ref["end"] == "2024-01-04T10:00:00.500000+00:00"
+    assert records[0]["exit_time"] == "2024-01-03T15:30:00.250000+00:00"
+    assert records[1]["exit_time"] is None
+
+
+def test_bars_flag_the_entries_and_exits_of_their_symbol():
+    bars = pa.table({
+        "timestamp": pd.date_range("2024-01-01", periods=4, freq="D"),
+        "close": [1.0, 2.0, 3.0, 4.0],
+    })
+    trades = series_table("trades", [
+        {"symbol": "AAPL", "entry_time": "2024-01-02T00:00:00", "exit_time": "2024-01-04T00:00:00"},
+        {"symbol": "AAPL", "entry_time": "2024-01-04T00:00:00", "exit_time": None},
+        {"symbol": "MSFT", "entry_time": "2024-01-01T00:00:00", "exit_time": "2024-01-03T00:00:00"},
+    ])
+
+    flagged = with_trade_signals(bars, trades, "AAPL")
+
+    assert flagged["entry_signal"].to_pylist() == [False, True, False, True]
+    assert flagged["exit_signal"].to_pylist() == [False, False, False, True]
+    assert with_trade_signals(bars, series_table("trades", []), "AAPL")["entry_signal"].to_pylist() == [False] * 4
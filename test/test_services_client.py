@@ -0,0 +1,119 @@
+"""
+Retries and circuit breaking of the backend_services client
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.services.backtest.services_client import (
+    BacktestServicesClient,
+    BacktestServicesRejected,
+    BacktestServicesUnavailable,
+    CircuitBreaker,
+)
+
+
+def make_client(handler, **kwargs):
+    client = BacktestServicesClient(backoff_base=0, **kwargs)
+    client.client = httpx.AsyncClient(base_url="http://services", transport=httpx.MockTransport(handler))
+    return client
+
+
+def half_open(breaker: CircuitBreaker) -> CircuitBreaker:
+    breaker.failures = breaker.failure_threshold
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout
+    return breaker
+
+
+def test_circuit_opens_after_consecutive_failures_and_closes_on_a_trial_success():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.is_open and not breaker.allow_request()
+
+    half_open(breaker)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_connect_errors_are_retried_then_open_the_circuit():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise httpx.ConnectError("refused", request=request)
+
+    client = make_client(handler, max_retries=3, circuits={"reads": CircuitBreaker(failure_threshold=1)})
+
+    with pytest.raises(BacktestServicesUnavailable):
+        asyncio.run(client.get_status("exec"))
+    assert len(attempts) == 3
+    assert client.circuits["reads"].is_open
+
+
+def test_failing_quotes_do_not_block_dispatch():
+    def handler(request):
+        if request.url.path.startswith("/quote"):
+            return httpx.Response(500)
+        return httpx.Response(200, json={"backtest_id": "exec"})
+
+    client = make_client(handler)
+    for _ in range(client.circuits["quotes"].failure_threshold):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(client.get_quote("AAPL"))
+
+    assert client.circuits["quotes"].is_open
+    assert not client.circuits["dispatch"].is_open
+    assert asyncio.run(client.start_backtest({})) == "exec"
+
+
+def test_trial_is_released_when_the_request_raises_an_unexpected_error():
+    def handler(request):
+        raise RuntimeError("bug in a transport")
+
+    client = make_client(handler)
+    breaker = half_open(client.circuits["reads"])
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(client.get_status("exec"))
+
+    assert not breaker.is_open
+    assert breaker.allow_request()
+
+
+def test_trial_is_released_when_the_caller_is_cancelled():
+    async def handler(request):
+        await asyncio.sleep(60)
+
+    client = make_client(handler)
+    breaker = half_open(client.circuits["reads"])
+
+    async def cancel_mid_request():
+        task = asyncio.create_task(client.get_status("exec"))
+        await asyncio.sleep(0.01)
+        assert breaker.is_open
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_mid_request())
+
+    assert not breaker.is_open
+    assert breaker.allow_request()
+
+
+def test_quote_client_errors_keep_their_status_and_close_the_circuit():
+    def handler(request):
+        return httpx.Response(404, json={"error": "Quote not found"})
+
+    client = make_client(handler)
+    with pytest.raises(BacktestServicesRejected) as rejected:
+        asyncio.run(client.get_quote("NOPE"))
+
+    assert (rejected.value.status_code, rejected.value.detail) == (404, "Quote not found")
+    assert client.circuits["quotes"].state == "closed"
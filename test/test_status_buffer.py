@@ -0,0 +1,72 @@
+"""
+Write-behind buffering of execution status updates
+"""
+import asyncio
+
+import pytest
+
+from services.backtest.status_buffer import StatusWriteBuffer
+
+
+class FakeExecutions:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.fail:
+            raise RuntimeError("primary stepped down")
+        self.batches.append([(op._filter["id"], op._doc["$set"]) for op in operations])
+
+
+def test_updates_of_one_execution_are_coalesced_into_one_write():
+    collection = FakeExecutions()
+    buffer = StatusWriteBuffer(collection)
+    buffer.update("a", {"progress": 10, "status": "running"})
+    buffer.update("a", {"progress": 20})
+    buffer.update("b", {"progress": 5})
+
+    assert asyncio.run(buffer.flush()) == 2
+    assert collection.batches == [[("a", {"progress": 20, "status": "running"}), ("b", {"progress": 5})]]
+    assert asyncio.run(buffer.flush()) == 0
+
+
+def test_durable_writes_flush_immediately():
+    collection = FakeExecutions()
+    buffer = StatusWriteBuffer(collection, flush_interval=3600)
+
+    asyncio.run(buffer.write("a", {"status": "completed"}))
+
+    assert collection.batches == [[("a", {"status": "completed"})]]
+    assert buffer.peek("a") == {}
+
+
+def test_failed_flushes_keep_updates_without_overwriting_newer_ones():
+    collection = FakeExecutions(fail=True)
+    buffer = StatusWriteBuffer(collection)
+    buffer.update("a", {"progress": 10, "message": "fetching"})
+
+    async def fail_then_update():
+        with pytest.raises(RuntimeError):
+            await buffer.flush()
+        buffer.update("a", {"progress": 30})
+
+    asyncio.run(fail_then_update())
+
+    assert buffer.peek("a") == {"progress": 30, "message": "fetching"}
+
+
+def test_the_flush_loop_writes_in_the_background_and_stop_drains():
+    collection = FakeExecutions()
+    buffer = StatusWriteBuffer(collection, flush_interval=0.01)
+
+    async def scenario():
+        await buffer.start()
+        buffer.update("a", {"progress": 10})
+        await asyncio.sleep(0.05)
+        buffer.update("a", {"progress": 20})
+        await buffer.stop()
+
+    asyncio.run(scenario())
+
+    assert collection.batches == [[("a", {"progress": 10})], [("a", {"progress": 20})]]
@@ -0,0 +1,94 @@
+"""
+A strategy's backtest results, read from backend_services executions
+"""
+import asyncio
+from datetime import datetime
+
+from bson import ObjectId
+from gridfs.errors import NoFile
+
+from fake_mongo import FakeDatabase
+from src.crud.strategy import (
+    delete_backtest_results_by_strategy,
+    get_backtest_result_by_id,
+    get_backtest_results_by_strategy,
+)
+from src.routes.strategy import backtest_result_to_response
+
+USER_ID = ObjectId("507f1f77bcf86cd799439011")
+STRATEGY_ID = ObjectId("507f1f77bcf86cd799439022")
+
+RESULT = {
+    "total_return": 12.5, "sharpe_ratio": 1.1, "max_drawdown": -4.0, "win_rate": 55.0,
+    "total_trades": 20, "profit_factor": 1.4, "initial_capital": 10_000, "final_capital": 11_250,
+    "start_date": "2024-01-01", "end_date": "2024-06-30", "timeframe": "1d",
+}
+
+
+class FakeBucket:
+    """GridFS bucket of the stored result series"""
+
+    def __init__(self, file_ids):
+        self.files = set(file_ids)
+
+    async def delete(self, file_id):
+        if file_id not in self.files:
+            raise NoFile(file_id)
+        self.files.remove(file_id)
+
+
+def execution(execution_id, day, status="completed", user_id=USER_ID, strategy_id=STRATEGY_ID):
+    return {
+        "id": execution_id,
+        "user_id": str(user_id),
+        "strategy_id": str(strategy_id),
+        "status": status,
+        "start_time": datetime(2024, 7, day),
+        "result": RESULT if status == "completed" else None,
+    }
+
+
+def seeded_db():
+    db = FakeDatabase()
+    asyncio.run(db.backtest_executions.insert_many([
+        execution("older", 1),
+        execution("newer", 2),
+        execution("running", 3, status="running"),
+        execution("someone-else", 4, user_id=ObjectId()),
+        execution("other-strategy", 5, strategy_id=ObjectId()),
+    ]))
+    return db
+
+
+def test_completed_runs_of_the_users_strategy_are_listed_newest_first():
+    runs = asyncio.run(get_backtest_results_by_strategy(seeded_db(), STRATEGY_ID, str(USER_ID)))
+
+    assert [run["id"] for run in runs] == ["newer", "older"]
+    response = backtest_result_to_response(runs[0])
+    assert response.id == "newer"
+    assert response.strategy_id == str(STRATEGY_ID)
+    assert response.final_capital == 11_250
+    assert response.created_at == datetime(2024, 7, 2)
+
+
+def test_single_result_is_found_by_execution_id_and_owner():
+    db = seeded_db()
+
+    assert asyncio.run(get_backtest_result_by_id(db, "older", STRATEGY_ID, USER_ID))["id"] == "older"
+    assert asyncio.run(get_backtest_result_by_id(db, "someone-else", STRATEGY_ID, USER_ID)) is None
+
+
+def test_deleting_a_strategy_removes_its_executions_and_stored_series():
+    db = seeded_db()
+    trades, equity, zoom, missing, kept = (ObjectId() for _ in range(5))
+    db.backtest_executions.docs[0]["result"] = {**RESULT, "series": {
+        "trades": {"file_id": str(trades)},
+        "equity_curve": {"file_id": str(equity), "zoom": {"500": {"file_id": str(zoom)}}},
+    }}
+    db.backtest_executions.docs[1]["result"] = {**RESULT, "series": {"trades": {"file_id": str(missing)}}}
+    db.backtest_executions.docs[4]["result"] = {**RESULT, "series": {"trades": {"file_id": str(kept)}}}
+    bucket = FakeBucket([trades, equity, zoom, kept])
+
+    assert asyncio.run(delete_backtest_results_by_strategy(db, STRATEGY_ID, bucket))
+    assert [doc["id"] for doc in db.backtest_executions.docs] == ["other-strategy"]
+    assert bucket.files == {kept}
@@ -0,0 +1,67 @@
+"""
+Seeded synthetic market data
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.synthetic_data import SyntheticMarketGenerator, trading_calendar
+
+
+def test_calendar_skips_weekends_and_holidays():
+    days = trading_calendar("2024-07-01", "2024-07-07", "1d")
+
+    # July 4th is a holiday, the 6th and 7th a weekend
+    assert [day.day for day in days] == [1, 2, 3, 5]
+
+
+def test_hourly_sessions_include_the_partial_last_bar():
+    bars = trading_calendar("2024-07-01", "2024-07-01", "1h")
+
+    assert len(bars) == 7
+    assert bars[0].strftime("%H:%M") == "09:30"
+    assert bars[-1].strftime("%H:%M") == "15:30"
+
+
+def test_unknown_timeframe_is_rejected():
+    with pytest.raises(ValueError):
+        trading_calendar("2024-07-01", "2024-07-02", "7m")
+
+
+def test_series_are_reproducible_and_independent_of_the_universe():
+    generator = SyntheticMarketGenerator(seed=1)
+    alone = generator.generate_wide_frame(["AAPL"], "2024-01-01", "2024-03-01")
+    together = SyntheticMarketGenerator(seed=1).generate_wide_frame(["MSFT", "AAPL"], "2024-01-01", "2024-03-01")
+    reseeded = SyntheticMarketGenerator(seed=2).generate_wide_frame(["AAPL"], "2024-01-01", "2024-03-01")
+
+    pd.testing.assert_series_equal(alone["AAPL_Close"], together["AAPL_Close"])
+    assert not np.allclose(alone["AAPL_Close"], reseeded["AAPL_Close"])
+
+
+def test_bars_are_internally_consistent():
+    frame = SyntheticMarketGenerator().generate_frame("SPY", "2024-01-01", "2024-02-01", "15m")
+
+    assert (frame["high"] >= frame[["open", "close"]].max(axis=1)).all()
+    assert (frame["low"] <= frame[["open", "close"]].min(axis=1)).all()
+    assert (frame["volume"] >= 1).all()
+    assert (frame["open"].iloc[1:].to_numpy() == frame["close"].iloc[:-1].to_numpy()).all()
+
+
+def test_batches_are_bounded_by_symbols_per_batch():
+    symbols = [f"S{i}" for i in range(5)]
+    generator = SyntheticMarketGenerator()
+    days = len(trading_calendar("2024-01-01", "2024-01-31", "1d"))
+
+    batches = list(generator.generate_batches(symbols, "2024-01-01", "2024-01-31", symbols_per_batch=2))
+    table = generator.generate_table(symbols, "2024-01-01", "2024-01-31")
+
+    assert [batch.num_rows for batch in batches] == [2 * days, 2 * days, days]
+    assert table.num_rows == 5 * days
+    assert table.column("symbol").to_pylist()[::days] == symbols
+
+
+def test_empty_ranges_give_empty_frames():
+    generator = SyntheticMarketGenerator()
+
+    assert generator.generate_frame("AAPL", "2024-07-06", "2024-07-07").empty
+    assert generator.generate_wide_frame(["AAPL"], "2024-07-06", "2024-07-07").empty
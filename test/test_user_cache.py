@@ -0,0 +1,101 @@
+"""
+Cached users of the token dependency
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from src.crud.user import update_user
+from src.dependencies import get_current_user_from_token
+from src.models.user import User, UserInDB
+from src.services.user_cache import UserCache, user_cache
+from src.utils.security import create_access_token
+
+USER_ID = "507f1f77bcf86cd799439011"
+
+
+def make_user(**fields):
+    return UserInDB(_id=USER_ID, email="a@b.com", userName="usr", firstName="a", lastName="b",
+                    hashed_password="secret-hash", **fields)
+
+
+class FakeUsers:
+    """The db.user collection, holding a single user document"""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.finds = 0
+
+    async def find_one(self, query):
+        self.finds += 1
+        return self.doc
+
+    async def update_one(self, query, update):
+        self.doc = {key: value for key, value in self.doc.items() if key not in update.get("$unset", {})}
+        self.doc.update(update["$set"])
+        return SimpleNamespace(modified_count=1)
+
+
+@pytest.fixture
+def db():
+    return SimpleNamespace(user=FakeUsers(make_user().model_dump(by_alias=True)))
+
+
+@pytest.fixture(autouse=True)
+def empty_user_cache(mock_redis):
+    user_cache._local.clear()
+
+
+def authenticate(db):
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": USER_ID}))
+    return asyncio.run(get_current_user_from_token(credentials, db))
+
+
+def test_password_hash_is_never_cached(mock_redis):
+    cached = asyncio.run(user_cache.set(USER_ID, make_user()))
+
+    assert isinstance(cached, User)
+    assert "secret-hash" not in str(mock_redis.data)
+
+
+def test_other_replicas_read_the_user_from_redis():
+    asyncio.run(user_cache.set(USER_ID, make_user()))
+
+    user = asyncio.run(UserCache().get(USER_ID))
+
+    assert user.id == USER_ID
+    assert user.userName == "usr"
+
+
+def test_invalidate_clears_both_tiers(mock_redis):
+    asyncio.run(user_cache.set(USER_ID, make_user()))
+    asyncio.run(user_cache.invalidate(USER_ID))
+
+    assert asyncio.run(user_cache.get(USER_ID)) is None
+    assert not mock_redis.data
+
+
+def test_repeat_requests_are_served_from_the_cache(db):
+    authenticate(db)
+    authenticate(db)
+
+    assert db.user.finds == 1
+
+
+def test_profile_updates_are_seen_on_the_next_request(db):
+    authenticate(db)
+    asyncio.run(update_user(db, USER_ID, {"firstName": "renamed"}))
+
+    assert authenticate(db).firstName == "renamed"
+    assert db.user.finds == 3
+
+
+def test_inactive_users_are_rejected(db):
+    db.user.doc["is_active"] = False
+
+    with pytest.raises(HTTPException) as error:
+        authenticate(db)
+    assert error.value.status_code == 401
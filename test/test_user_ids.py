@@ -0,0 +1,80 @@
+"""
+Canonical ObjectId user ids in strategy CRUD and the online migration
+"""
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from fake_mongo import FakeDatabase
+from src.crud.strategy import (
+    create_strategy,
+    delete_strategy,
+    get_strategies_by_user_id,
+    get_strategy_by_id,
+    toggle_strategy_status,
+)
+from src.database.user_ids import canonical_user_id, migrate_user_ids
+from src.models.strategy import StrategyConfig, StrategyCreate
+
+USER_ID = ObjectId("507f1f77bcf86cd799439011")
+
+STRATEGY = StrategyCreate(
+    name="Crossover",
+    config=StrategyConfig(symbols=["SPY"], timeframe="1d", start_date="2024-01-01", end_date="2024-06-30"),
+)
+
+
+def test_canonical_user_id_accepts_both_forms():
+    assert canonical_user_id(USER_ID) is USER_ID
+    assert canonical_user_id(str(USER_ID)) == USER_ID
+    with pytest.raises(ValueError):
+        canonical_user_id("not-an-id")
+
+
+def test_strategies_are_stored_and_found_by_objectid_whatever_form_the_caller_has():
+    db = FakeDatabase()
+
+    async def scenario():
+        created = await create_strategy(db, STRATEGY, str(USER_ID))
+        by_string = await get_strategy_by_id(db, created.id, str(USER_ID))
+        by_objectid = await get_strategy_by_id(db, created.id, USER_ID)
+        listed = await get_strategies_by_user_id(db, str(USER_ID))
+        toggled = await toggle_strategy_status(db, created.id, str(USER_ID), True)
+        deleted = await delete_strategy(db, created.id, str(USER_ID))
+        return created, by_string, by_objectid, listed, toggled, deleted
+
+    created, by_string, by_objectid, listed, toggled, deleted = asyncio.run(scenario())
+
+    assert db.strategy.docs == []
+    assert by_string.id == by_objectid.id == created.id
+    assert by_string.user_id == USER_ID
+    assert [strategy.id for strategy in listed] == [created.id]
+    assert toggled.is_active is True
+    assert deleted is True
+
+
+def test_other_users_cannot_reach_a_strategy():
+    db = FakeDatabase()
+
+    async def scenario():
+        created = await create_strategy(db, STRATEGY, USER_ID)
+        return await get_strategy_by_id(db, created.id, str(ObjectId()))
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_migration_rewrites_string_ids_and_skips_invalid_ones():
+    db = FakeDatabase()
+    asyncio.run(db.strategy.insert_many([
+        {"name": "legacy", "user_id": str(USER_ID)},
+        {"name": "current", "user_id": USER_ID},
+        {"name": "broken", "user_id": "someone"},
+    ]))
+
+    first = asyncio.run(migrate_user_ids(db, collections=["strategy"], batch_size=1))
+    second = asyncio.run(migrate_user_ids(db, collections=["strategy"]))
+
+    assert first == {"strategy": {"migrated": 1, "skipped": 1}}
+    assert second == {"strategy": {"migrated": 0, "skipped": 1}}
+    assert [doc["user_id"] for doc in db.strategy.docs] == [USER_ID, USER_ID, "someone"]